@@ -0,0 +1,16 @@
+"""Общий движок перебора кодовых замков.
+
+Модули пакета не зависят от длины кода: длина и основание колеса
+(количество цифр на колесе) берутся из конфигурации.
+"""
+
+from .engine import (
+    DIGIT_HOLD,
+    RADIX,
+    RESET_TIMING,
+    RUN_TIMING,
+    Engine,
+    Timing,
+    format_time,
+    load_config,
+)
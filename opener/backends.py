@@ -0,0 +1,414 @@
+"""Бэкенды ввода: отправка нажатий, опрос клавиш и часы.
+
+Движок не обращается к ОС напрямую — всё идёт через объект бэкенда с
+методами ``key_down``, ``key_up``, ``is_key_down``, ``now``, ``sleep`` и
+``sleep_until``.
+Коды клавиш для нажатий — скан-коды набора 1 (как в ``keybd_event``),
+для опроса — виртуальные коды Windows.
+
+``listen_keys`` запускает слушатель горячих клавиш оператора в отдельном
+потоке: в Windows — низкоуровневый хук клавиатуры, в Linux — чтение
+событий evdev, в остальных бэкендах — частый опрос ``is_key_down``.
+"""
+
+import ctypes
+import glob
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+KEYEVENTF_SCANCODE = 0x0008
+KEYEVENTF_KEYUP = 0x0002
+
+# Последние SPIN_TIME секунд до дедлайна ждём активно: точность time.sleep
+# ограничена квантом системного таймера.
+SPIN_TIME = 0.002
+
+# Виртуальные коды Windows -> коды клавиш evdev для опроса состояния в Linux.
+VK_TO_EVDEV = {
+    0x08: 14,   # Backspace
+    0x0D: 28,   # Enter
+    0x1B: 1,    # Escape
+    0x20: 57,   # Space
+    0x70: 59,   # F1
+    0x71: 60,   # F2
+    0x72: 61,   # F3
+    0x73: 62,   # F4
+    0x74: 63,   # F5
+}
+EVDEV_TO_VK = {code: vk for vk, code in VK_TO_EVDEV.items()}
+
+# Период опроса клавиш там, где нет событийного ввода.
+KEY_POLL_INTERVAL = 0.02
+
+
+class PollingKeyListener:
+    """Опрашивает ``backend.is_key_down`` и сообщает об отпускании клавиш ``vks``."""
+
+    def __init__(self, backend, vks, on_release, interval=KEY_POLL_INTERVAL):
+        self.backend = backend
+        self.vks = tuple(vks)
+        self.on_release = on_release
+        self.interval = interval
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="opener-keys", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        pressed = set()
+        # Опрос идёт по реальному времени даже у бэкендов с виртуальными часами.
+        while not self._stopped.wait(self.interval):
+            for vk in self.vks:
+                if self.backend.is_key_down(vk):
+                    pressed.add(vk)
+                elif vk in pressed:
+                    pressed.discard(vk)
+                    self.on_release(vk)
+
+    def stop(self):
+        self._stopped.set()
+
+
+class ScriptedKeyListener:
+    """Сразу «нажимает и отпускает» клавиши ``keys`` по порядку — оператор виртуальных бэкендов."""
+
+    def __init__(self, keys, on_release):
+        for vk in keys:
+            on_release(vk)
+
+    def stop(self):
+        pass
+
+
+class Backend:
+    """Базовый бэкенд: часы на ``perf_counter`` и обычный ``time.sleep``."""
+
+    name = "base"
+
+    def key_down(self, sc):
+        raise NotImplementedError
+
+    def key_up(self, sc):
+        raise NotImplementedError
+
+    def is_key_down(self, vk):
+        return False
+
+    def now(self):
+        return time.perf_counter()
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def sleep_until(self, deadline, spin=SPIN_TIME):
+        """Ждёт момента ``deadline`` по ``now()``: грубый sleep и активное ожидание хвоста."""
+        remaining = deadline - self.now()
+        if remaining > spin:
+            self.sleep(remaining - spin)
+        while self.now() < deadline:
+            pass
+
+    def listen_keys(self, vks, on_release):
+        """Вызывает ``on_release(vk)`` из фонового потока при отпускании клавиши из ``vks``.
+
+        Возвращает слушатель с методом ``stop()``.
+        """
+        return PollingKeyListener(self, vks, on_release)
+
+    def close(self):
+        pass
+
+
+WH_KEYBOARD_LL = 13
+WM_QUIT = 0x0012
+WM_KEYUP = 0x0101
+WM_SYSKEYUP = 0x0105
+LLKHF_INJECTED = 0x10
+
+
+class Win32HookListener:
+    """Низкоуровневый хук клавиатуры (``WH_KEYBOARD_LL``) в собственном потоке.
+
+    Хук получает событие сразу при отпускании клавиши, без опроса.
+    Нажатия, отправленные программами (в том числе нашим движком),
+    пропускаются.
+    """
+
+    def __init__(self, vks, on_release):
+        self.vks = frozenset(vks)
+        self.on_release = on_release
+        self.thread_id = None
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="opener-hook", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    def _run(self):
+        from ctypes import wintypes
+
+        user32 = ctypes.WinDLL('user32', use_last_error=True)
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+
+        class KBDLLHOOKSTRUCT(ctypes.Structure):
+            _fields_ = [("vkCode", wintypes.DWORD), ("scanCode", wintypes.DWORD),
+                        ("flags", wintypes.DWORD), ("time", wintypes.DWORD),
+                        ("dwExtraInfo", ctypes.c_size_t)]
+
+        hook_proc_type = ctypes.WINFUNCTYPE(ctypes.c_ssize_t, ctypes.c_int,
+                                            wintypes.WPARAM, wintypes.LPARAM)
+        user32.CallNextHookEx.argtypes = [wintypes.HHOOK, ctypes.c_int,
+                                          wintypes.WPARAM, wintypes.LPARAM]
+        user32.CallNextHookEx.restype = ctypes.c_ssize_t
+        user32.SetWindowsHookExW.argtypes = [ctypes.c_int, hook_proc_type,
+                                             wintypes.HINSTANCE, wintypes.DWORD]
+        user32.SetWindowsHookExW.restype = wintypes.HHOOK
+
+        def hook(n_code, w_param, l_param):
+            if n_code == 0 and w_param in (WM_KEYUP, WM_SYSKEYUP):
+                info = ctypes.cast(l_param, ctypes.POINTER(KBDLLHOOKSTRUCT)).contents
+                if info.vkCode in self.vks and not info.flags & LLKHF_INJECTED:
+                    self.on_release(info.vkCode)
+            return user32.CallNextHookEx(None, n_code, w_param, l_param)
+
+        # Ссылка на колбэк должна жить, пока установлен хук.
+        self._proc = hook_proc_type(hook)
+        self.thread_id = kernel32.GetCurrentThreadId()
+        handle = user32.SetWindowsHookExW(WH_KEYBOARD_LL, self._proc, None, 0)
+        self._ready.set()
+        if not handle:
+            print(f"[Предупреждение] Хук клавиатуры не установлен "
+                  f"(ошибка {ctypes.get_last_error()}), горячие клавиши не работают.")
+            return
+        msg = wintypes.MSG()
+        while user32.GetMessageW(ctypes.byref(msg), None, 0, 0) > 0:
+            pass
+        user32.UnhookWindowsHookEx(handle)
+
+    def stop(self):
+        if self.thread_id is not None:
+            ctypes.WinDLL('user32').PostThreadMessageW(self.thread_id, WM_QUIT, 0, 0)
+
+
+class Win32Backend(Backend):
+    """Прежний способ ввода: ``keybd_event`` и ``GetAsyncKeyState`` из user32."""
+
+    name = "win32"
+
+    def __init__(self):
+        self.user32 = ctypes.WinDLL('user32', use_last_error=True)
+        self._keybd_event = self.user32.keybd_event
+        self._get_key_state = self.user32.GetAsyncKeyState
+        # Квант таймера 1 мс вместо 15,6 мс: грубый sleep не проскакивает
+        # окно активного ожидания.
+        self.winmm = ctypes.WinDLL('winmm')
+        self.winmm.timeBeginPeriod(1)
+
+    def key_down(self, sc):
+        self._keybd_event(0, sc, KEYEVENTF_SCANCODE, 0)
+
+    def key_up(self, sc):
+        self._keybd_event(0, sc, KEYEVENTF_SCANCODE | KEYEVENTF_KEYUP, 0)
+
+    def is_key_down(self, vk):
+        return bool(self._get_key_state(vk) & 0x8000)
+
+    def listen_keys(self, vks, on_release):
+        return Win32HookListener(vks, on_release)
+
+    def close(self):
+        if self.winmm is not None:
+            self.winmm.timeEndPeriod(1)
+            self.winmm = None
+
+
+def _ioc(direction, request_type, number, size):
+    return (direction << 30) | (size << 16) | (ord(request_type) << 8) | number
+
+
+UI_DEV_CREATE = _ioc(0, 'U', 1, 0)
+UI_DEV_DESTROY = _ioc(0, 'U', 2, 0)
+UI_SET_EVBIT = _ioc(1, 'U', 100, 4)
+UI_SET_KEYBIT = _ioc(1, 'U', 101, 4)
+EV_SYN = 0x00
+EV_KEY = 0x01
+SYN_REPORT = 0
+BUS_USB = 0x03
+KEY_MAX = 0x2ff
+INPUT_EVENT = struct.Struct('llHHi')
+UINPUT_USER_DEV = struct.Struct('80sHHHHi' + '64i' * 4)
+
+
+def _eviocgkey(length):
+    return _ioc(2, 'E', 0x18, length)
+
+
+class EvdevKeyListener:
+    """Читает события клавиатуры evdev в собственном потоке.
+
+    Используется отдельный дескриптор устройства, так что опрос
+    ``is_key_down`` и слушатель друг другу не мешают.
+    """
+
+    def __init__(self, keyboard, vks, on_release):
+        self.vks = frozenset(vks)
+        self.on_release = on_release
+        self.fd = os.open(keyboard, os.O_RDONLY | os.O_NONBLOCK)
+        self._wake_read, self._wake_write = os.pipe()
+        self._thread = threading.Thread(target=self._run, name="opener-evdev", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        size = INPUT_EVENT.size
+        try:
+            while True:
+                ready, _, _ = select.select([self.fd, self._wake_read], [], [])
+                if self._wake_read in ready:
+                    return
+                data = os.read(self.fd, size * 64)
+                for offset in range(0, len(data) - size + 1, size):
+                    _, _, event_type, code, value = INPUT_EVENT.unpack_from(data, offset)
+                    vk = EVDEV_TO_VK.get(code)
+                    if event_type == EV_KEY and value == 0 and vk in self.vks:
+                        self.on_release(vk)
+        finally:
+            os.close(self.fd)
+            os.close(self._wake_read)
+
+    def stop(self):
+        if self._wake_write is not None:
+            os.write(self._wake_write, b"x")
+            os.close(self._wake_write)
+            self._wake_write = None
+
+
+class UinputBackend(Backend):
+    """Виртуальная клавиатура Linux через ``/dev/uinput``.
+
+    Скан-коды набора 1 для основных клавиш совпадают с кодами evdev,
+    поэтому ``SCANCODE_F`` передаётся без пересчёта. Для опроса клавиш
+    нужна физическая клавиатура: по умолчанию берётся первое устройство
+    ``/dev/input/by-path/*-event-kbd``.
+    """
+
+    name = "uinput"
+
+    def __init__(self, device="/dev/uinput", keyboard=None, keys=range(1, 128)):
+        import fcntl
+
+        self._fcntl = fcntl
+        self.fd = os.open(device, os.O_WRONLY | os.O_NONBLOCK)
+        fcntl.ioctl(self.fd, UI_SET_EVBIT, EV_KEY)
+        for key in keys:
+            fcntl.ioctl(self.fd, UI_SET_KEYBIT, key)
+        os.write(self.fd, UINPUT_USER_DEV.pack(b"opener", BUS_USB, 0x1, 0x1, 1, 0,
+                                               *([0] * 256)))
+        fcntl.ioctl(self.fd, UI_DEV_CREATE)
+
+        if keyboard is None:
+            candidates = sorted(glob.glob("/dev/input/by-path/*-event-kbd"))
+            keyboard = candidates[0] if candidates else None
+        self.keyboard = keyboard
+        self.keyboard_fd = os.open(keyboard, os.O_RDONLY | os.O_NONBLOCK) if keyboard else None
+        self._key_state = bytearray(KEY_MAX // 8 + 1)
+
+    def _emit(self, event_type, code, value):
+        os.write(self.fd, INPUT_EVENT.pack(0, 0, event_type, code, value))
+
+    def key_down(self, sc):
+        self._emit(EV_KEY, sc, 1)
+        self._emit(EV_SYN, SYN_REPORT, 0)
+
+    def key_up(self, sc):
+        self._emit(EV_KEY, sc, 0)
+        self._emit(EV_SYN, SYN_REPORT, 0)
+
+    def is_key_down(self, vk):
+        code = VK_TO_EVDEV.get(vk)
+        if self.keyboard_fd is None or code is None:
+            return False
+        self._fcntl.ioctl(self.keyboard_fd, _eviocgkey(len(self._key_state)), self._key_state)
+        return bool(self._key_state[code // 8] & (1 << (code % 8)))
+
+    def listen_keys(self, vks, on_release):
+        if self.keyboard is None:
+            return super().listen_keys(vks, on_release)
+        return EvdevKeyListener(self.keyboard, vks, on_release)
+
+    def close(self):
+        if self.fd is not None:
+            self._fcntl.ioctl(self.fd, UI_DEV_DESTROY)
+            os.close(self.fd)
+            self.fd = None
+        if self.keyboard_fd is not None:
+            os.close(self.keyboard_fd)
+            self.keyboard_fd = None
+
+
+class RecordingBackend(Backend):
+    """Записывает все события ``(время, скан-код, нажата)``.
+
+    Работает на собственных виртуальных часах и ничего не ждёт — так
+    компилятор ленты узнаёт времена нажатий без настоящего ввода.
+    """
+
+    name = "recording"
+
+    def __init__(self, pressed_keys=(0x08,)):
+        self.events = []
+        self.pressed_keys = set(pressed_keys)
+        self._t = 0.0
+
+    def key_down(self, sc):
+        self.events.append((self._t, sc, True))
+
+    def key_up(self, sc):
+        self.events.append((self._t, sc, False))
+
+    def is_key_down(self, vk):
+        return vk in self.pressed_keys
+
+    def listen_keys(self, vks, on_release):
+        return ScriptedKeyListener([vk for vk in vks if vk in self.pressed_keys], on_release)
+
+    def now(self):
+        return self._t
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self._t += seconds
+
+    def sleep_until(self, deadline, spin=SPIN_TIME):
+        self._t = max(self._t, deadline)
+
+
+BACKENDS = {
+    "win32": Win32Backend,
+    "uinput": UinputBackend,
+    "recording": RecordingBackend,
+}
+
+
+def default_backend_name():
+    name = os.environ.get("OPENER_BACKEND")
+    if name:
+        return name
+    if sys.platform == "win32":
+        return "win32"
+    if sys.platform.startswith("linux"):
+        return "uinput"
+    return "recording"
+
+
+def create_backend(name=None):
+    """Создаёт бэкенд по имени (или по ``OPENER_BACKEND`` и платформе)."""
+    name = name or default_backend_name()
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Неизвестный бэкенд ввода: {name}") from None
+    return backend_class()
+
@@ -0,0 +1,246 @@
+"""Набор бенчмарков и проверка регрессий по сохранённой базе.
+
+Замеры:
+
+* ``plan.N`` — выбор слота перебора и генерация комбинаций для
+  N-значного кода (время на этой машине);
+* ``session.N.<вид>`` — расчётная длительность сброса и перебора на
+  виртуальных часах для каждого направления при текущем профиле
+  ``DIGIT_HOLD``/``SETTLE_TIME``. Это главная метрика: она не зависит от
+  машины, и любое её ухудшение — регрессия;
+* ``dispatch.event`` — накладные расходы Python на одно событие ленты в
+  цикле воспроизведения (бэкенд без ожиданий и нажатий).
+
+База хранится в ``benchmarks/baseline.json``. Длительности сессий
+сравниваются почти точно, времена на машине — с допуском ``--tolerance``.
+
+Запуск: ``py -m opener.benchmarks [--save] [--lengths 3 4 5 6]``.
+"""
+
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+
+from .backends import Backend
+from .combinations import choose_sweep_slot, run_start
+from .engine import RESET_TIMING, RUN_TIMING, timing_for_config
+from .scheduler import DeadlineScheduler
+from .simulator import simulate_session
+from .timeline import compile_timeline, replay
+
+BENCHMARKS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                              "benchmarks")
+BASELINE_PATH = os.path.join(BENCHMARKS_DIR, "baseline.json")
+
+DEFAULT_LENGTHS = (3, 4, 5, 6)
+SESSION_LENGTHS = (3, 4)
+DEFAULT_TOLERANCE = 0.5
+# Длительность сессии детерминирована: допуск только на округление.
+SESSION_TOLERANCE = 1e-6
+# Короткие замеры повторяются хотя бы MIN_MEASURE_TIME секунд, чтобы
+# лучший прогон не зависел от случайной паузы ОС; длинные — не дольше
+# MEASURE_BUDGET секунд (минимум один прогон).
+MIN_MEASURE_TIME = 0.5
+MEASURE_BUDGET = 2.0
+
+# Стартовое положение колёс и код, с которого продолжается перебор.
+CURRENT_CODE = (5, 2, 7, 1, 8, 3)
+CONTINUE_FROM = (4, 6, 2, 9, 1, 5)
+
+DIRECTIONS = {
+    "forward": {"direction": "С начала"},
+    "reverse": {"direction": "С конца"},
+    "continue_forward": {"direction": "Продолжить", "continue_direction": "increase"},
+    "continue_reverse": {"direction": "Продолжить", "continue_direction": "decrease"},
+}
+
+
+class NullBackend(Backend):
+    """Бэкенд без нажатий и ожиданий: остаётся только работа самого цикла."""
+
+    name = "null"
+
+    def key_down(self, sc):
+        pass
+
+    def key_up(self, sc):
+        pass
+
+    def sleep(self, seconds):
+        pass
+
+    def sleep_until(self, deadline, spin=0.0):
+        pass
+
+
+def bench_config(length, kind="forward"):
+    config = {
+        "length": length,
+        "radix": 10,
+        "current_code": list(CURRENT_CODE[:length]),
+        "slot": 0,
+    }
+    config.update(DIRECTIONS[kind])
+    if kind == "reverse":
+        config["start_code"] = [9] * length
+    elif kind.startswith("continue"):
+        config["start_code"] = list(CONTINUE_FROM[:length])
+    else:
+        config["start_code"] = [0] * length
+    return config
+
+
+def measure(action, repeat, min_time=MIN_MEASURE_TIME, budget=MEASURE_BUDGET):
+    """Лучшее время прогона ``action`` и результат последнего прогона.
+
+    Прогонов не меньше ``repeat``, пока на них ушло меньше ``min_time``
+    секунд, и не больше, чем укладывается в ``budget``.
+    """
+    best = None
+    result = None
+    spent = 0.0
+    runs = 0
+    while runs < repeat or spent < min_time:
+        started = time.perf_counter()
+        result = action()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+        spent += elapsed
+        runs += 1
+        if spent > budget:
+            break
+    return best, result
+
+
+def bench_plan(length, repeat):
+    config = bench_config(length)
+    elapsed, (_, _, combinations, _) = measure(lambda: choose_sweep_slot(config), repeat)
+    return {"value": elapsed, "unit": "s", "kind": "time", "note": f"{len(combinations)} комбинаций"}
+
+
+def bench_session(length, kind):
+    result = simulate_session(bench_config(length, kind))
+    return {"value": round(result.total_time, 3), "unit": "s", "kind": "session",
+            "note": f"сброс {result.reset_time:.1f}с, покрытие {result.coverage() * 100:.1f}%"}
+
+
+def bench_dispatch(repeat, length=4):
+    config = bench_config(length)
+    sweep_slot, _, combinations, _ = choose_sweep_slot(config)
+    start_code, start_slot = run_start(config, sweep_slot)
+    timeline = compile_timeline(combinations, timing_for_config(config, RUN_TIMING),
+                                start_code, start_slot, sweep_slot)
+    backend = NullBackend()
+
+    def run():
+        replay(timeline, backend, DeadlineScheduler(backend), on_step=lambda step: None)
+
+    elapsed, _ = measure(run, repeat)
+    return {"value": elapsed / len(timeline) * 1e6, "unit": "us", "kind": "time",
+            "note": f"{len(timeline)} событий"}
+
+
+def run_suite(lengths=DEFAULT_LENGTHS, repeat=3, report=print):
+    """Прогоняет все замеры; возвращает ``{имя: {"value", "unit", "kind", "note"}}``."""
+    results = {}
+    for length in lengths:
+        report(f"[Бенчмарк] План, {length} цифр...")
+        results[f"plan.{length}"] = bench_plan(length, repeat)
+    for length in SESSION_LENGTHS:
+        if length not in lengths:
+            continue
+        for kind in DIRECTIONS:
+            report(f"[Бенчмарк] Сессия, {length} цифр, {kind}...")
+            results[f"session.{length}.{kind}"] = bench_session(length, kind)
+    report("[Бенчмарк] Цикл воспроизведения...")
+    results["dispatch.event"] = bench_dispatch(repeat)
+    return results
+
+
+def suite_meta():
+    """Условия замера: версия Python и профиль задержек, от которого зависят сессии."""
+    return {
+        "python": platform.python_version(),
+        "platform": sys.platform,
+        "settle_time": RUN_TIMING.settle_time,
+        "reset_settle_time": RESET_TIMING.settle_time,
+        "digit_hold": {str(k): v for k, v in sorted(RUN_TIMING.digit_hold.items())},
+    }
+
+
+def save_baseline(results, path=BASELINE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({"meta": suite_meta(), "results": results}, f, ensure_ascii=False, indent=2)
+        f.write("\n")
+
+
+def load_baseline(path=BASELINE_PATH):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)["results"]
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Строки сравнения и список имён замеров, ухудшившихся сверх допуска."""
+    lines = []
+    regressions = []
+    for name, entry in results.items():
+        value = entry["value"]
+        base = baseline.get(name)
+        if base is None:
+            lines.append(f"  {name:<28} {value:12.3f} {entry['unit']:<2}  (нет в базе)")
+            continue
+        allowed = SESSION_TOLERANCE if entry["kind"] == "session" else tolerance
+        change = value / base["value"] - 1 if base["value"] else 0.0
+        mark = ""
+        if change > allowed:
+            mark = "  РЕГРЕССИЯ"
+            regressions.append(name)
+        lines.append(f"  {name:<28} {value:12.3f} {entry['unit']:<2}  "
+                     f"база {base['value']:.3f} ({change * 100:+.1f}%){mark}")
+    return lines, regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="opener.benchmarks",
+                                     description="Бенчмарки планирования, симуляции и цикла событий.")
+    parser.add_argument("--lengths", type=int, nargs="+", default=list(DEFAULT_LENGTHS),
+                        help="длины кода для замеров планирования")
+    parser.add_argument("--repeat", type=int, default=3, help="прогонов на замер (берётся лучший)")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="файл базы")
+    parser.add_argument("--save", action="store_true", help="записать результаты как новую базу")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="допустимое ухудшение времени на машине (0.5 = +50%%)")
+    parser.add_argument("--json", action="store_true", help="вывести результаты в JSON")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.lengths, args.repeat)
+    if args.json:
+        json.dump(results, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    if args.save:
+        save_baseline(results, args.baseline)
+        print(f"[Готово] База сохранена: {args.baseline}")
+        return 0
+    if not os.path.exists(args.baseline):
+        print(f"[Инфо] Базы {args.baseline} нет — сохраните её флагом --save.")
+        for name, entry in results.items():
+            print(f"  {name:<28} {entry['value']:12.3f} {entry['unit']:<2}  {entry['note']}")
+        return 0
+
+    lines, regressions = compare(results, load_baseline(args.baseline), args.tolerance)
+    print("[Бенчмарк] Результаты:")
+    for line in lines:
+        print(line)
+    if regressions:
+        print(f"[Ошибка] Регрессии: {', '.join(regressions)}")
+        return 1
+    print("[Готово] Регрессий нет.")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
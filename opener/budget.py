@@ -0,0 +1,250 @@
+"""Бюджет времени перебора: на что уходит каждая секунда.
+
+Расчётная часть раскладывается по ленте событий: промежуток до
+отпускания клавиши — удержание (поворот колеса) или короткое нажатие
+(переключение слота); промежуток после отпускания — ``SETTLE_TIME`` после
+поворота либо ``KEY_RELEASE_TIME`` и ``SLOT_SWITCH_DELAY`` после
+переключения. Фактическая часть берётся у планировщика: сколько отсчёт
+уехал из-за опозданий событий, сколько перебор простоял на паузе
+оператора и сколько времени цикл не ждал, а выполнял код Python (журнал,
+покрытие, вывод).
+
+Раскладка пишется в ``config_N.budget.json`` во время перебора и в
+конце; посмотреть её в любой момент: ``py -m opener.budget <файл>``.
+С ``--profile`` вокруг работы Python (без ожиданий) включается
+``cProfile``, результат — в ``config_N.prof``.
+"""
+
+import argparse
+import cProfile
+import io
+import json
+import os
+import pstats
+
+from .engine import SCANCODE_F
+
+BUDGET_SUFFIX = ".budget.json"
+PROFILE_SUFFIX = ".prof"
+PROFILE_LINES = 15
+
+# Как часто (в шагах) раскладка перезаписывается во время перебора.
+SAVE_EVERY = 25
+
+# (ключ, подпись); порядок — порядок строк в таблице.
+PLANNED_CATEGORIES = (
+    ("hold", "Удержание (поворот колеса)"),
+    ("settle", "SETTLE_TIME"),
+    ("press", "Нажатие при переключении слота"),
+    ("release", "KEY_RELEASE_TIME"),
+    ("switch", "SLOT_SWITCH_DELAY"),
+)
+
+
+def budget_path(config_path):
+    return os.path.splitext(config_path)[0] + BUDGET_SUFFIX
+
+
+def profile_path_for(config_path):
+    return os.path.splitext(config_path)[0] + PROFILE_SUFFIX
+
+
+def planned_budget(timeline, timing, events=None, scancode=SCANCODE_F):
+    """Расчётное время первых ``events`` событий ленты по категориям (в секундах).
+
+    Если лента пройдена целиком, учитывается и пауза после последнего события.
+    """
+    totals = {key: 0.0 for key, _ in PLANNED_CATEGORIES}
+    times = timeline.times
+    downs = timeline.downs
+    scancodes = timeline.scancodes
+    count = len(times) if events is None else events
+    tap_limit = min(timing.digit_hold.values()) / 2
+    last_press = None
+
+    def after_release(gap):
+        if last_press == "hold":
+            totals["settle"] += gap
+        elif last_press == "tap":
+            release = min(gap, timing.key_release_time)
+            totals["release"] += release
+            totals["switch"] += gap - release
+
+    previous = 0.0
+    for i in range(count):
+        gap = times[i] - previous
+        previous = times[i]
+        if scancodes[i] != scancode:
+            continue
+        if downs[i]:
+            after_release(gap)
+        elif gap < tap_limit:
+            totals["press"] += gap
+            last_press = "tap"
+        else:
+            totals["hold"] += gap
+            last_press = "hold"
+    if count == len(times):
+        after_release(timeline.duration - previous)
+    return totals
+
+
+class TimeBudget:
+    """Счётчики бюджета одного прогона ленты ``timeline`` движком ``engine``.
+
+    ``start()`` запоминает момент начала, ``snapshot(events)`` собирает
+    раскладку после ``events`` выполненных событий. С ``profile=True``
+    работа Python между ожиданиями профилируется через ``cProfile``.
+    Время пауз оператора берётся у ``control`` (``opener.control.Controller``).
+    """
+
+    def __init__(self, engine, timeline, path=None, profile=False, control=None):
+        self.engine = engine
+        self.control = control
+        self.timeline = timeline
+        self.path = path
+        self.profiler = cProfile.Profile() if profile else None
+        self.started = None
+        self.waited = 0.0
+        self.shifted = 0.0
+        self.paused = 0.0
+        # Пройденная часть прежних лент (после пропуска префикса лента меняется).
+        self.previous = {key: 0.0 for key, _ in PLANNED_CATEGORIES}
+        self.previous_elapsed = 0.0
+        self.previous_events = 0
+        self.previous_steps = 0
+
+    def start(self):
+        scheduler = self.engine.scheduler
+        if self.started is None:
+            self.started = self.engine.now()
+            self.waited = scheduler.waited
+            self.shifted = scheduler.shifted
+            self.paused = self.paused_total()
+        if self.profiler is not None:
+            scheduler.profiler = self.profiler
+            self.profiler.enable()
+
+    def stop(self):
+        if self.profiler is not None:
+            self.profiler.disable()
+            self.engine.scheduler.profiler = None
+
+    def paused_total(self):
+        return self.control.paused if self.control is not None else 0.0
+
+    def next_timeline(self, timeline, events):
+        """Переход на ``timeline``; из текущей ленты выполнены первые ``events`` событий."""
+        for key, value in planned_budget(self.timeline, self.engine.timing, events).items():
+            self.previous[key] += value
+        self.previous_elapsed += self.timeline.times[events - 1] if events else 0.0
+        self.previous_events += events
+        self.previous_steps += self.timeline.steps_done(events)
+        self.timeline = timeline
+
+    def snapshot(self, events=None):
+        """Раскладка после ``events`` событий ленты (по умолчанию — после всей ленты)."""
+        timeline = self.timeline
+        scheduler = self.engine.scheduler
+        count = len(timeline) if events is None else events
+        planned = planned_budget(timeline, self.engine.timing, count)
+        for key, value in self.previous.items():
+            planned[key] += value
+        if count == len(timeline):
+            planned_elapsed = timeline.duration
+        else:
+            planned_elapsed = timeline.times[count - 1] if count else 0.0
+        planned_elapsed += self.previous_elapsed
+        wall = self.engine.now() - self.started
+        shifted = scheduler.shifted - self.shifted
+        waited = scheduler.waited - self.waited
+        # Пауза оператора — не ожидание планировщика и не отставание от плана.
+        paused = self.paused_total() - self.paused
+        lateness = scheduler.lateness
+        return {
+            "events": self.previous_events + count,
+            "total_events": self.previous_events + len(timeline),
+            "steps": self.previous_steps + timeline.steps_done(count),
+            "planned": {key: round(value, 3) for key, value in planned.items()},
+            "planned_total": round(planned_elapsed, 3),
+            "wall": round(wall, 3),
+            "shifted": round(shifted, 3),
+            "paused": round(paused, 3),
+            "drift_other": round(wall - planned_elapsed - shifted - paused, 3),
+            "python": round(max(wall - waited - paused, 0.0), 3),
+            "lateness_ms": {
+                "mean": round(lateness.mean() * 1000, 3),
+                "p99": round(lateness.percentile(0.99) * 1000, 3),
+                "max": round(lateness.maximum() * 1000, 3),
+            },
+        }
+
+    def save(self, events=None):
+        """Снимок в файл ``path`` (если задан); возвращает снимок."""
+        data = self.snapshot(events)
+        if self.path is not None:
+            try:
+                save_budget(data, self.path)
+            except OSError as e:
+                print(f"[Предупреждение] Не удалось сохранить бюджет времени {self.path}: {e}")
+        return data
+
+    def profile_text(self, limit=PROFILE_LINES):
+        if self.profiler is None:
+            return ""
+        out = io.StringIO()
+        pstats.Stats(self.profiler, stream=out).sort_stats("cumulative").print_stats(limit)
+        return out.getvalue()
+
+    def dump_profile(self, path):
+        if self.profiler is not None:
+            self.profiler.dump_stats(path)
+
+
+def budget_table(data):
+    """Строки таблицы бюджета для лога."""
+    wall = data["wall"]
+    steps = max(data["steps"], 1)
+
+    def row(label, seconds):
+        share = seconds / wall * 100 if wall > 0 else 0.0
+        return f"  {label:<32} {seconds:10.1f}с {share:6.1f}% {seconds / steps:8.3f}с"
+
+    lines = [f"[Бюджет] Шагов: {data['steps']}, событий: {data['events']}/{data['total_events']}",
+             f"  {'Категория':<32} {'Время':>11} {'Доля':>7} {'На шаг':>9}"]
+    for key, label in PLANNED_CATEGORIES:
+        lines.append(row(label, data["planned"][key]))
+    lines.append(row("Перенос отсчёта из-за опозданий", data["shifted"]))
+    lines.append(row("Пауза оператора", data.get("paused", 0.0)))
+    lines.append(row("Прочее расхождение с планом", data["drift_other"]))
+    lines.append(row("Итого (фактически)", wall))
+    lines.append(row("в т.ч. работа Python в паузах", data["python"]))
+    late = data["lateness_ms"]
+    lines.append(f"[Бюджет] Опоздания событий: среднее {late['mean']:.2f} мс, "
+                 f"p99 {late['p99']:.2f} мс, макс {late['max']:.2f} мс")
+    return lines
+
+
+def save_budget(data, path):
+    tmp = path + ".tmp"
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=2)
+    os.replace(tmp, path)
+
+
+def load_budget(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="opener.budget",
+                                     description="Раскладка времени перебора по категориям.")
+    parser.add_argument("file", help="файл *.budget.json")
+    args = parser.parse_args(argv)
+    for line in budget_table(load_budget(args.file)):
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,253 @@
+"""Калибровка удержаний: подбор профиля ``DIGIT_HOLD`` под конкретную машину.
+
+Для каждого числа поворотов ``k`` ищется порог ``t_k`` — минимальное
+удержание, после которого колесо поворачивается ``k`` раз. Пороги
+ищутся бисекцией по результатам пробных удержаний, затем по ним
+строится линейная модель ``t_k = onset + (k - 1) * period`` и границы
+доверия. Рекомендуемое удержание — верхняя граница порога плюс запас
+``margin``. Профиль сохраняется в ``profiles/<имя>.json`` и подключается
+ключом ``"timing_profile"`` в конфиге.
+
+Результат каждого удержания сообщает наблюдатель: оператор вручную
+(``ManualObserver``) или симулятор (``SimulatorObserver``).
+
+Запуск: ``py -m opener.calibration <имя профиля> [--simulate] [--length N]``.
+"""
+
+import argparse
+import datetime
+import json
+import math
+import os
+
+from .backends import create_backend
+from .engine import (
+    PROFILES_DIR,
+    RADIX,
+    RESET_TIMING,
+    Engine,
+    profile_path,
+)
+
+MIN_HOLD = 0.5
+RESOLUTION = 0.02
+DEFAULT_MARGIN = 0.08
+Z_SCORE = 2.0
+
+
+class ManualObserver:
+    """Спрашивает у оператора, на сколько позиций повернулось колесо.
+
+    Ответ вводится в консоли, поэтому перед каждой пробой оператор
+    возвращается в игру и нажимает Backspace: иначе удержание F уйдёт в
+    консоль, а не в игру. ``ask`` и ``report`` заменяют ``input`` и ``print``.
+    """
+
+    def __init__(self, engine, radix=RADIX, ask=input, report=print):
+        self.engine = engine
+        self.radix = radix
+        self.ask = ask
+        self.report = report
+
+    def before_hold(self):
+        self.report("[Ожидание] Переключитесь в игру и нажмите Backspace для пробы...")
+        self.engine.wait_for_key()
+
+    def rotations(self):
+        while True:
+            answer = self.ask(f"Сколько позиций повернулось колесо (0-{self.radix})? ").strip()
+            if answer.isdigit() and 0 <= int(answer) <= self.radix:
+                return int(answer)
+            self.report("[Ошибка] Введите число.")
+
+
+class SimulatorObserver:
+    """Берёт результат удержания прямо из ``SimulatedLock``."""
+
+    def __init__(self, lock):
+        self.lock = lock
+
+    def before_hold(self):
+        self.lock.last_rotations = 0
+
+    def rotations(self):
+        return self.lock.last_rotations
+
+
+class Calibrator:
+    """Выполняет пробные удержания на текущем слоте и копит результаты."""
+
+    def __init__(self, engine, observer, resolution=RESOLUTION, report=print):
+        self.engine = engine
+        self.observer = observer
+        self.resolution = resolution
+        self.report = report
+        self.samples = []
+
+    def probe(self, duration):
+        engine = self.engine
+        self.observer.before_hold()
+        engine.press_key()
+        engine.sleep(duration)
+        engine.release_key()
+        engine.sleep(engine.timing.settle_time)
+        engine.flush()
+        rotations = self.observer.rotations()
+        engine.resync()
+        slot = engine.slot
+        engine.code[slot] = (engine.code[slot] + rotations) % engine.radix
+        self.samples.append((round(duration, 4), rotations))
+        self.report(f"[Калибровка] Удержание {duration:.3f}с -> {rotations} поз.")
+        return rotations
+
+    def find_threshold(self, rotations, lo, hi):
+        """Бисекция порога для ``rotations`` поворотов на отрезке ``[lo, hi]``."""
+        if self.probe(hi) < rotations:
+            return hi, hi
+        while hi - lo > self.resolution:
+            middle = (lo + hi) / 2
+            if self.probe(middle) >= rotations:
+                hi = middle
+            else:
+                lo = middle
+        return lo, hi
+
+    def run(self, reference_hold):
+        """Ищет пороги для 1…radix поворотов, начиная с границ из ``reference_hold``."""
+        radix = self.engine.radix
+        lo = MIN_HOLD
+        for rotations in range(1, radix + 1):
+            hi = reference_hold[rotations % radix]
+            # Удержание, давшее k-1 поворотов, — нижняя граница для порога k.
+            _, lo = self.find_threshold(rotations, min(lo, hi - self.resolution), hi)
+        return fit_profile(self.samples, radix)
+
+
+def threshold_brackets(samples, radix=RADIX):
+    """Для каждого ``k`` — отрезок ``(нижняя, верхняя)``, где лежит порог ``t_k``."""
+    brackets = {}
+    for rotations in range(1, radix + 1):
+        below = [d for d, observed in samples if observed < rotations]
+        above = [d for d, observed in samples if observed >= rotations]
+        if not above:
+            continue
+        upper = min(above)
+        lower = max([d for d in below if d <= upper], default=0.0)
+        brackets[rotations] = (lower, upper)
+    return brackets
+
+
+def fit_profile(samples, radix=RADIX, margin=DEFAULT_MARGIN):
+    """Строит модель порогов по пробам и рекомендованную таблицу удержаний."""
+    brackets = threshold_brackets(samples, radix)
+    points = [(k - 1, (lower + upper) / 2) for k, (lower, upper) in brackets.items()]
+    if len(points) < 2:
+        raise ValueError("Недостаточно данных для калибровки: нужно минимум два порога.")
+
+    n = len(points)
+    mean_x = sum(x for x, _ in points) / n
+    mean_y = sum(y for _, y in points) / n
+    sxx = sum((x - mean_x) ** 2 for x, _ in points)
+    period = sum((x - mean_x) * (y - mean_y) for x, y in points) / sxx
+    onset = mean_y - period * mean_x
+    residuals = [y - (onset + period * x) for x, y in points]
+    sigma = math.sqrt(sum(r * r for r in residuals) / max(n - 2, 1))
+
+    thresholds = {}
+    digit_hold = {}
+    for k in range(1, radix + 1):
+        predicted = onset + period * (k - 1)
+        if k in brackets:
+            lower, upper = brackets[k]
+            half_width = (upper - lower) / 2
+            estimate = (lower + upper) / 2
+        else:
+            half_width = 0.0
+            estimate = predicted
+        spread = Z_SCORE * sigma + half_width
+        thresholds[k] = (round(estimate - spread, 4), round(estimate, 4), round(estimate + spread, 4))
+
+    for k in range(1, radix + 1):
+        low, _, high = thresholds[k]
+        hold = high + margin
+        next_low = thresholds[k + 1][0] if k < radix else high + period
+        if hold >= next_low - margin / 2:
+            # Запаса не хватает с обеих сторон: держим посередине окна.
+            hold = (high + next_low) / 2
+        digit_hold[k % radix] = round(hold, 3)
+
+    return {
+        "radix": radix,
+        "onset": round(onset, 4),
+        "period": round(period, 4),
+        "sigma": round(sigma, 4),
+        "margin": margin,
+        "thresholds": {str(k): list(bounds) for k, bounds in thresholds.items()},
+        "digit_hold": {str(k): v for k, v in sorted(digit_hold.items())},
+        "samples": samples,
+    }
+
+
+def save_profile(name, profile):
+    os.makedirs(PROFILES_DIR, exist_ok=True)
+    profile = dict(profile, name=name, created=datetime.datetime.now().isoformat(timespec="seconds"))
+    path = profile_path(name)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(profile, f, indent=2, ensure_ascii=False)
+    return path
+
+
+def print_profile(profile, reference_hold, report=print):
+    report(f"[Калибровка] Модель: t_k = {profile['onset']:.3f} + (k-1) * {profile['period']:.3f}, "
+           f"σ = {profile['sigma']:.3f}с")
+    saved = 0.0
+    for k in range(1, profile["radix"] + 1):
+        key = str(k % profile["radix"])
+        hold = profile["digit_hold"][key]
+        old = reference_hold[k % profile["radix"]]
+        saved += old - hold
+        low, estimate, high = profile["thresholds"][str(k)]
+        report(f"[Калибровка] {k:2d} поз.: порог {estimate:.3f}с [{low:.3f}; {high:.3f}], "
+               f"удержание {hold:.3f}с (было {old:.2f}с)")
+    report(f"[Калибровка] Суммарная экономия на таблице: {saved:.2f}с")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="opener.calibration",
+                                     description="Калибровка удержаний клавиши F.")
+    parser.add_argument("name", help="имя профиля (profiles/<имя>.json)")
+    parser.add_argument("--length", type=int, default=4)
+    parser.add_argument("--radix", type=int, default=RADIX)
+    parser.add_argument("--simulate", action="store_true", help="калибровать на симуляторе")
+    parser.add_argument("--jitter", type=float, default=0.02,
+                        help="разброс начала поворота в симуляторе, с")
+    args = parser.parse_args(argv)
+
+    timing = RESET_TIMING.replace(radix=args.radix, digit_hold=None)
+    if args.simulate:
+        from .simulator import SimulatedLock, simulated_engine
+
+        lock = SimulatedLock(args.length, args.radix, jitter=args.jitter, seed=1)
+        engine, lock, _ = simulated_engine(args.length, args.radix, timing, lock=lock)
+        observer = SimulatorObserver(lock)
+    else:
+        try:
+            backend = create_backend()
+        except (OSError, ValueError) as e:
+            print(f"[Ошибка] Бэкенд ввода: {e}")
+            return
+        engine = Engine(args.length, args.radix, timing, backend)
+        observer = ManualObserver(engine, args.radix)
+
+    calibrator = Calibrator(engine, observer)
+    try:
+        profile = calibrator.run(timing.digit_hold)
+    finally:
+        engine.close()
+    print_profile(profile, timing.digit_hold)
+    path = save_profile(args.name, profile)
+    print(f"[Готово] Профиль сохранен: {path} ({len(calibrator.samples)} проб)")
+
+
+if __name__ == '__main__':
+    main()
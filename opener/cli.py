@@ -0,0 +1,268 @@
+"""Консольный запуск без GUI: ``py -m opener <команда>``.
+
+Команды: ``generate``, ``plan``, ``reset``, ``run``, ``simulate``, ``bench``.
+Конфиг берётся из файла (``-c config_4.json``), из stdin (``-c -``) или
+прямо из командной строки (``--set length=4 --set current_code=[1,2,3,4]``);
+``--set`` дополняет и переопределяет значения из файла; сам файл при
+этом не меняется — итоговый конфиг пишется в ``--dir``. Модуль не
+импортирует PyQt5, а тяжёлые части пакета загружаются только нужной
+команде, поэтому запуск укладывается в десятки миллисекунд.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from .engine import RADIX, format_time, normalize_config, save_config
+
+# Ключи конфига, значения которых — коды.
+CODE_KEYS = ("start_code", "current_code")
+
+
+class ConfigError(Exception):
+    pass
+
+
+def positive_int(config, key, minimum=1):
+    value = config[key]
+    # bool — тоже int, но length=true явно ошибка.
+    if isinstance(value, bool) or not isinstance(value, int) or value < minimum:
+        raise ConfigError(f"{key} должно быть целым числом не меньше {minimum}: {value!r}")
+    return value
+
+
+def parse_code(text):
+    if not text.isdigit():
+        raise ConfigError(f"Код должен состоять из цифр: {text}")
+    return [int(d) for d in text]
+
+
+def parse_setting(item):
+    """``ключ=значение``; значение читается как JSON, иначе остаётся строкой.
+
+    Коды из одних цифр (``current_code=0271``) остаются строками: как
+    JSON-число они потеряли бы ведущие нули.
+    """
+    key, sep, value = item.partition("=")
+    if not sep or not key:
+        raise ConfigError(f"Ожидалось ключ=значение: {item}")
+    if key in CODE_KEYS and value.isdigit():
+        return key, value
+    try:
+        return key, json.loads(value)
+    except ValueError:
+        return key, value
+
+
+def read_config(source, settings, stdin=None):
+    """Собирает конфиг из файла или stdin (``-``) и переопределений ``--set``."""
+    config = {}
+    if source == "-":
+        config = json.load(stdin if stdin is not None else sys.stdin)
+    elif source:
+        with open(source, 'r', encoding='utf-8') as f:
+            config = json.load(f)
+    for item in settings:
+        key, value = parse_setting(item)
+        config[key] = value
+    if "length" not in config:
+        raise ConfigError("В конфиге нет длины кода (length)")
+    length = positive_int(config, "length")
+    radix = positive_int(config, "radix", 2) if "radix" in config else RADIX
+    config.setdefault("direction", "С начала")
+    config.setdefault("slot", 0)
+    if "start_code" not in config:
+        config["start_code"] = [radix - 1 if config["direction"] == "С конца" else 0] * length
+    if "current_code" not in config:
+        raise ConfigError("В конфиге нет текущего кода (current_code)")
+    for key in CODE_KEYS:
+        if isinstance(config[key], str):
+            config[key] = parse_code(config[key])
+        if len(config[key]) != length:
+            raise ConfigError(f"Длина {key} не совпадает с length={length}")
+        if not all(isinstance(d, int) and 0 <= d < radix for d in config[key]):
+            raise ConfigError(f"Цифры {key} должны быть от 0 до {radix - 1}")
+    return normalize_config(config)
+
+
+def config_file(args, config):
+    """Путь к файлу конфига для команд, которые пишут рядом журнал и состояние колёс.
+
+    Файл из ``-c`` без ``--set`` используется как есть. Конфиг из stdin или
+    с переопределениями ``--set`` записывается в ``--dir``: файл из ``-c``
+    не перезаписывается.
+    """
+    source = config_source(args)
+    if source and not args.set:
+        return source
+    path = os.path.join(args.dir, f"config_{config['length']}.json")
+    if source and os.path.exists(path) and os.path.samefile(source, path):
+        raise ConfigError(f"Конфиг с --set перезаписал бы {source}: укажите другую папку в --dir")
+    os.makedirs(args.dir, exist_ok=True)
+    save_config(config, path)
+    print(f"[Инфо] Конфиг записан в {path}")
+    return path
+
+
+def no_pause(message):
+    pass
+
+
+def config_source(args):
+    """Файл конфига из ``-c`` или ``None``, если конфиг пришёл из stdin или ``--set``."""
+    return args.config if args.config and args.config != "-" else None
+
+
+def cmd_generate(args, config):
+    from .combinations import run_generate
+
+    return run_generate(config, config_source(args))
+
+
+def cmd_plan(args, config):
+    from .combinations import (
+        choose_sweep_slot,
+        estimate_session,
+        format_code,
+        generate_combinations,
+    )
+    from .priors import resolve_prior_files
+
+    config = resolve_prior_files(config, config_source(args))
+    if config.get("sweep_slot") is None:
+        sweep_slot, kind, combinations, estimate = choose_sweep_slot(config)
+    else:
+        sweep_slot = config["sweep_slot"]
+        kind, combinations = generate_combinations(config, sweep_slot)
+        estimate = estimate_session(config, combinations, sweep_slot) if kind else None
+    if kind is None:
+        print("[Ошибка] Неверное направление перебора в конфиге.")
+        return False
+    limit = len(combinations) if args.limit == 0 else min(args.limit, len(combinations))
+    codes = [format_code(code) for code in combinations[:limit]]
+    if args.json:
+        json.dump({"kind": kind, "sweep_slot": sweep_slot, "total": len(combinations),
+                   "reset": round(estimate[0], 2), "run": round(estimate[1], 2),
+                   "codes": codes}, sys.stdout, ensure_ascii=False)
+        sys.stdout.write("\n")
+        return True
+    print(f"[План] Вид: {kind}, слот перебора: {sweep_slot}, комбинаций: {len(combinations)}")
+    print(f"[План] Расчётное время: сброс {format_time(estimate[0])}, "
+          f"перебор {format_time(estimate[1])}")
+    for code in codes:
+        print(code)
+    if limit < len(combinations):
+        print(f"... ещё {len(combinations) - limit}")
+    return True
+
+
+def cmd_reset(args, config):
+    from .resetter import reset_code
+
+    engine = reset_code(config_file(args, config), pause=no_pause)
+    if engine is None:
+        return False
+    engine.close()
+    return True
+
+
+def cmd_run(args, config):
+    from .runner import brute_force_execute
+
+    path = config_file(args, config)
+    return brute_force_execute(path, os.path.dirname(os.path.abspath(path)),
+                               resume=args.resume, pause=no_pause, profile=args.profile)
+
+
+def cmd_simulate(args, config):
+    from .simulator import simulate_session
+
+    secret = parse_code(args.secret) if args.secret else None
+    result = simulate_session(config, secret=secret, detect=args.detect, jitter=args.jitter,
+                              seed=args.seed)
+    print(result.summary())
+    return result.model_matches
+
+
+def cmd_bench(args, config):
+    from .combinations import choose_sweep_slot, run_start
+    from .engine import RUN_TIMING, timing_for_config
+    from .simulator import simulate_session
+    from .timeline import compile_timeline
+
+    def measure(action):
+        best = None
+        for _ in range(args.repeat):
+            started = time.perf_counter()
+            result = action()
+            elapsed = time.perf_counter() - started
+            best = elapsed if best is None else min(best, elapsed)
+        return best, result
+
+    plan_time, (sweep_slot, _, combinations, _) = measure(lambda: choose_sweep_slot(config))
+    start_code, start_slot = run_start(config, sweep_slot)
+    compile_time, timeline = measure(lambda: compile_timeline(
+        combinations, timing_for_config(config, RUN_TIMING), start_code, start_slot,
+        sweep_slot, config["radix"]))
+    simulate_time, _ = measure(lambda: simulate_session(config))
+    print(f"[Бенчмарк] Лучшее из {args.repeat}:")
+    print(f"  план:       {plan_time * 1000:9.1f} мс ({len(combinations)} комбинаций)")
+    print(f"  лента:      {compile_time * 1000:9.1f} мс ({len(timeline)} событий)")
+    print(f"  симуляция:  {simulate_time * 1000:9.1f} мс")
+    return True
+
+
+HANDLERS = {
+    "generate": cmd_generate,
+    "plan": cmd_plan,
+    "reset": cmd_reset,
+    "run": cmd_run,
+    "simulate": cmd_simulate,
+    "bench": cmd_bench,
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="opener", description="Перебор кодового замка без GUI.")
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("-c", "--config", help="файл конфига или '-' для чтения из stdin")
+    common.add_argument("--set", action="append", default=[], metavar="КЛЮЧ=ЗНАЧЕНИЕ",
+                        help="значение конфига (JSON или строка), можно повторять")
+    common.add_argument("--dir", default=".",
+                        help="куда записать конфиг из stdin/--set для reset и run (файл из -c не меняется)")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("generate", parents=[common], help="выбрать слот перебора и оценить время")
+    plan = commands.add_parser("plan", parents=[common], help="показать план перебора")
+    plan.add_argument("--limit", type=int, default=20, help="сколько комбинаций вывести (0 — все)")
+    plan.add_argument("--json", action="store_true", help="вывод в JSON")
+    commands.add_parser("reset", parents=[common], help="сбросить колёса на стартовый код")
+    run = commands.add_parser("run", parents=[common], help="запустить перебор")
+    run.add_argument("--resume", action="store_true", help="продолжить по журналу")
+    run.add_argument("--profile", action="store_true",
+                     help="профилировать работу Python (cProfile) вне ожиданий")
+    simulate = commands.add_parser("simulate", parents=[common], help="прогнать сессию на симуляторе")
+    simulate.add_argument("--secret", help="код, который откроет замок")
+    simulate.add_argument("--jitter", type=float, default=0.0, help="разброс начала поворота, с")
+    simulate.add_argument("--seed", type=int, default=None)
+    simulate.add_argument("--detect", action="store_true",
+                          help="остановить перебор при открытии и определить код")
+    bench = commands.add_parser("bench", parents=[common], help="замерить план, ленту и симуляцию")
+    bench.add_argument("--repeat", type=int, default=3)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        config = read_config(args.config, args.set)
+    except (OSError, ValueError, ConfigError) as e:
+        print(f"[Ошибка] Конфиг: {e}")
+        return 2
+    try:
+        ok = HANDLERS[args.command](args, config)
+    except ConfigError as e:
+        print(f"[Ошибка] Конфиг: {e}")
+        return 2
+    return 0 if ok else 1
@@ -0,0 +1,359 @@
+"""Генерация последовательностей комбинаций для перебора.
+
+Каждая комбинация задаёт префикс — цифры всех слотов, кроме слота
+перебора (по умолчанию последнего). Цифру слота перебора проверяет полный
+круг, поэтому в числовых последовательностях она равна 0, а в
+спланированных — текущему положению колеса.
+
+Последовательности ленивые (см. ``opener.sequence``): коды вычисляются по
+номеру, а не хранятся списком, и перебор строит их прямо по конфигу.
+"""
+
+from .coverage import coverage_path, load_coverage
+from .engine import RADIX, RESET_TIMING, RUN_TIMING, format_time, save_config, timing_for_config
+from .planner import (
+    DESCENDING,
+    credit_visits,
+    expected_time,
+    intent_order,
+    plan_by_probability,
+    plan_cost,
+    plan_order,
+    reset_cost,
+)
+from .priors import CodePrior, resolve_prior_files
+from .sequence import CodeSequence, RangeSegment
+from .telemetry import telemetry_from_env
+
+CODES_SUBFOLDER = "codes"
+
+
+class GenerationCancelled(Exception):
+    """Генерацию отменили (см. параметр ``cancel`` у ``run_generate``)."""
+
+
+def check_cancel(cancel):
+    if cancel is not None and cancel.is_set():
+        raise GenerationCancelled()
+
+
+def prefix_to_code(value, length, radix=RADIX):
+    """Превращает номер префикса в комбинацию с нулём в последнем слоте."""
+    digits = [0] * length
+    for i in range(length - 2, -1, -1):
+        value, digits[i] = divmod(value, radix)
+    return digits
+
+
+def code_prefix_value(code, radix=RADIX):
+    """Номер префикса комбинации (все цифры кроме последней)."""
+    value = 0
+    for digit in code[:-1]:
+        value = value * radix + digit
+    return value
+
+
+def format_code(code):
+    return "".join(map(str, code))
+
+
+def numeric_sequence(start, count, step, length, radix=RADIX):
+    sweep_slot = length - 1
+    return CodeSequence([RangeSegment(start, count, step, length, sweep_slot, 0, radix)],
+                        sweep_slot)
+
+
+def generate_forward_combinations(length, radix=RADIX):
+    """Генерирует комбинации от 0…0 до 9…90 с шагом в один префикс."""
+    return numeric_sequence(0, radix ** (length - 1), 1, length, radix)
+
+
+def generate_reverse_combinations(length, radix=RADIX):
+    """Генерирует комбинации от 9…90 до 0…0."""
+    return numeric_sequence(radix ** (length - 1) - 1, radix ** (length - 1), -1, length, radix)
+
+
+def generate_continue_forward_combinations(start_code, radix=RADIX):
+    """Генерирует комбинации от префикса текущего кода до 9…90."""
+    length = len(start_code)
+    base_prefix_value = code_prefix_value(start_code, radix)
+    end_value = radix ** (length - 1) - 1
+    return numeric_sequence(base_prefix_value, end_value - base_prefix_value + 1, 1, length, radix)
+
+
+def generate_continue_reverse_combinations(start_code, radix=RADIX):
+    """Генерирует комбинации от префикса текущего кода до 0…0."""
+    length = len(start_code)
+    base_prefix_value = code_prefix_value(start_code, radix)
+    return numeric_sequence(base_prefix_value, base_prefix_value + 1, -1, length, radix)
+
+
+def combination_kind(direction, continue_direction=None):
+    """Определяет вид списка по настройкам направления из конфига."""
+    if direction == "С начала":
+        return "forward"
+    if direction == "С конца":
+        return "reverse"
+    if direction == "Продолжить":
+        if continue_direction == "decrease":
+            return "continue_reverse"
+        return "continue_forward"
+    return None
+
+
+def code_range(config):
+    """Диапазон значений полных кодов (включительно), которые покрывает перебор."""
+    length = config["length"]
+    radix = config.get("radix", RADIX)
+    kind = combination_kind(config.get("direction", "С начала"),
+                            config.get("continue_direction", "increase"))
+    last = radix ** length - 1
+    if kind == "continue_forward":
+        return code_prefix_value(config["start_code"], radix) * radix, last
+    if kind == "continue_reverse":
+        return 0, code_prefix_value(config["start_code"], radix) * radix + radix - 1
+    return 0, last
+
+
+def covering_prefixes(lo, hi, length, sweep_slot, radix=RADIX):
+    """Комбинации со слотом перебора ``sweep_slot``, покрывающие коды ``lo..hi``."""
+    weight = radix ** (length - 1 - sweep_slot)
+    if lo == 0 and hi == radix ** length - 1:
+        segment = RangeSegment(0, radix ** (length - 1), 1, length, sweep_slot, 0, radix)
+        return CodeSequence([segment], sweep_slot)
+    prefixes = sorted({value // (weight * radix) * weight + value % weight
+                       for value in range(lo, hi + 1)})
+    combinations = []
+    for prefix in prefixes:
+        value = prefix // weight * weight * radix + prefix % weight
+        code = [0] * length
+        for i in range(length - 1, -1, -1):
+            value, code[i] = divmod(value, radix)
+        combinations.append(code)
+    return CodeSequence.from_list(combinations, sweep_slot)
+
+
+def default_sweep_slot(config):
+    sweep_slot = config.get("sweep_slot")
+    return config["length"] - 1 if sweep_slot is None else sweep_slot
+
+
+def generate_combinations(config, sweep_slot=None, prior=None, covered=None):
+    """Строит последовательность комбинаций по конфигу; возвращает ``(kind, combinations)``.
+
+    Если в конфиге не отключён ``optimize_order``, порядок обхода строит
+    планировщик: старшие цифры (``priority_digits``) идут в выбранном
+    направлении, остальные — в порядке с минимумом поворотов. При заданном
+    разделе ``prior`` сначала идут вероятные префиксы. Затем план
+    пересчитывается с учётом кодов, показанных по пути (``credit_visits``).
+    Колёса перед первым шагом — ``run_start``. Префиксы, полностью
+    проверенные в прошлых сессиях (``covered``, см. ``opener.coverage``),
+    пропускаются.
+    """
+    if sweep_slot is None:
+        sweep_slot = default_sweep_slot(config)
+    length = config["length"]
+    radix = config.get("radix", RADIX)
+    if sweep_slot == length - 1:
+        kind, combinations = generate_numeric_combinations(config)
+    else:
+        kind = combination_kind(config.get("direction", "С начала"),
+                                config.get("continue_direction", "increase"))
+        lo, hi = code_range(config)
+        combinations = covering_prefixes(lo, hi, length, sweep_slot, radix)
+        if intent_order(config) == DESCENDING:
+            combinations = combinations.reversed()
+    # Полностью проверенные префиксы пропускает и credit_visits; планировщику
+    # они отфильтровываются потоком, без списка всех комбинаций.
+    untried = combinations
+    if combinations and covered:
+        untried = (code for code in combinations if not covered.covers_sweep(code, sweep_slot))
+    if prior is None:
+        prior = CodePrior.from_config(config)
+    start_code, start_slot = run_start(config, sweep_slot)
+    if combinations and prior is not None:
+        combinations = plan_by_probability(untried, start_code, prior,
+                                           timing_for_config(config, RUN_TIMING),
+                                           intent_order(config),
+                                           config.get("priority_digits", 1), sweep_slot,
+                                           start_slot=start_slot, radix=radix)
+    elif combinations and config.get("optimize_order", True):
+        combinations = plan_order(untried, start_code, intent_order(config),
+                                  config.get("priority_digits", 1), sweep_slot, radix)
+    if combinations:
+        combinations = credit_visits(combinations, start_code, covered, start_slot,
+                                     sweep_slot, radix)
+    return kind, combinations
+
+
+def reset_target(config, sweep_slot):
+    """Состояние колёс после сброса: ``start_code`` с нетронутым слотом перебора."""
+    target = list(config["start_code"])
+    target[sweep_slot] = config["current_code"][sweep_slot]
+    return target
+
+
+def run_start(config, sweep_slot):
+    """Состояние колёс ``(code, slot)`` перед первым шагом перебора.
+
+    С ``fused_reset`` в конфиге отдельного сброса нет: перебор начинается
+    прямо с ``current_code``/``slot``, а планировщик сам выбирает, с какого
+    префикса в него войти дешевле всего. Иначе колёса стоят так, как их
+    оставил сброс, — на слоте перебора: первый шаг начинается с его круга.
+    """
+    if config.get("fused_reset"):
+        return list(config["current_code"]), config["slot"]
+    return reset_target(config, sweep_slot), sweep_slot
+
+
+def estimate_session(config, combinations, sweep_slot, run_timing=None, reset_timing=None):
+    """Расчётная длительность ``(сброс, перебор)`` для выбранного слота перебора."""
+    run_timing = run_timing or timing_for_config(config, RUN_TIMING)
+    reset_timing = reset_timing or timing_for_config(config, RESET_TIMING)
+    radix = config.get("radix", RADIX)
+    if config.get("fused_reset"):
+        reset = 0.0
+    else:
+        reset = reset_cost(reset_timing, config["current_code"], config["slot"],
+                           config["start_code"], sweep_slot, radix, park_slot=sweep_slot)
+    start_code, start_slot = run_start(config, sweep_slot)
+    run = plan_cost(combinations, run_timing, start_code, start_slot, sweep_slot, radix)
+    return reset, run
+
+
+def choose_sweep_slot(config, run_timing=None, reset_timing=None, covered=None, progress=None,
+                      cancel=None):
+    """Выбирает слот перебора с минимальной расчётной длительностью сброса и перебора.
+
+    Слоты старших цифр (``priority_digits``) не рассматриваются: если
+    прокручивать их полным кругом, порядок «сначала старшие» теряет смысл.
+    С заданным ``prior`` вместо полной длительности сравнивается ожидаемое
+    время до открытия. ``progress(done, total)`` вызывается после оценки
+    каждого слота. Возвращает ``(sweep_slot, kind, combinations, (reset, run))``.
+    Если ``cancel`` (``threading.Event``) установлен, перед оценкой
+    очередного слота бросается ``GenerationCancelled``.
+    """
+    length = config["length"]
+    radix = config.get("radix", RADIX)
+    run_timing = run_timing or timing_for_config(config, RUN_TIMING)
+    reset_timing = reset_timing or timing_for_config(config, RESET_TIMING)
+    prior = CodePrior.from_config(config)
+    first = min(config.get("priority_digits", 1), length - 1)
+    best = None
+    best_score = None
+    candidates = range(first, length)
+    for done, sweep_slot in enumerate(candidates, 1):
+        check_cancel(cancel)
+        kind, combinations = generate_combinations(config, sweep_slot, prior, covered)
+        if kind is None:
+            return sweep_slot, None, None, (0.0, 0.0)
+        estimate = estimate_session(config, combinations, sweep_slot, run_timing, reset_timing)
+        score = sum(estimate)
+        if prior is not None:
+            score = estimate[0] + expected_time(combinations, prior, run_timing,
+                                                *run_start(config, sweep_slot), sweep_slot, radix)
+        if best is None or score < best_score:
+            best = (sweep_slot, kind, combinations, estimate)
+            best_score = score
+        if progress is not None:
+            progress(done, len(candidates))
+    return best
+
+
+def generate_numeric_combinations(config):
+    """Комбинации по конфигу в строгом числовом порядке."""
+    length = config["length"]
+    radix = config.get("radix", RADIX)
+    kind = combination_kind(config.get("direction", "С начала"),
+                            config.get("continue_direction", "increase"))
+    if kind == "forward":
+        return kind, generate_forward_combinations(length, radix)
+    if kind == "reverse":
+        return kind, generate_reverse_combinations(length, radix)
+    if kind == "continue_forward":
+        return kind, generate_continue_forward_combinations(config["start_code"], radix)
+    if kind == "continue_reverse":
+        return kind, generate_continue_reverse_combinations(config["start_code"], radix)
+    return None, None
+
+
+def run_generate(config, config_path=None, telemetry=None, report=print, cancel=None):
+    """Выбирает слот перебора и печатает сводку по последовательности комбинаций.
+
+    Сама последовательность не сохраняется: перебор строит её по конфигу.
+    Если передан ``config_path``, выбранный слот перебора записывается в
+    конфиг, чтобы его учли сброс и перебор. Ход оценки слотов передаётся
+    событиями ``progress`` в ``telemetry`` (см. ``opener.telemetry``),
+    текст — через ``report``. ``cancel`` (``threading.Event``) прерывает
+    генерацию между оценками слотов; тогда конфиг не меняется и
+    возвращается ``False``.
+    """
+    if telemetry is None:
+        telemetry = telemetry_from_env()
+    try:
+        return generate_and_report(config, config_path, telemetry, report, cancel)
+    except GenerationCancelled:
+        report("[Стоп] Генерация отменена.")
+        return False
+
+
+def generate_and_report(config, config_path, telemetry, report, cancel):
+    direction = config.get("direction", "С начала")
+    report(f"[Генерация] Направление: {direction}")
+
+    # Файлы вероятностей лежат рядом с конфигом; в сам конфиг пути не пишутся.
+    plan_config = resolve_prior_files(config, config_path)
+    covered = None
+    if config_path is not None:
+        covered = load_coverage(coverage_path(config_path), config["length"],
+                                config.get("radix", RADIX))
+        if covered:
+            report(f"[Генерация] Уже проверено в прошлых сессиях: {len(covered)} кодов")
+
+    def progress(done, total):
+        report(f"[Генерация] Оценено слотов перебора: {done}/{total}")
+        telemetry.emit("progress", stage="sweep_slot", done=done, total=total)
+
+    if config.get("sweep_slot") is None:
+        sweep_slot, kind, combinations, _ = choose_sweep_slot(plan_config, covered=covered,
+                                                              progress=progress, cancel=cancel)
+    else:
+        sweep_slot = config["sweep_slot"]
+        kind, combinations = generate_combinations(plan_config, sweep_slot, covered=covered)
+    if kind is None:
+        if direction == "Продолжить":
+            message = f"Неверное значение continue_direction: {config.get('continue_direction')}"
+        else:
+            message = f"Неверное значение direction: {direction}"
+        report(f"[Ошибка] {message}")
+        telemetry.emit("error", message=message)
+        return False
+
+    if combinations:
+        report(f"[Генерация] Последовательность комбинаций "
+               f"({format_code(combinations[0])} -> {format_code(combinations[-1])})...")
+    report(f"[Генерация] Всего комбинаций: {len(combinations)}")
+    reset_estimate, run_estimate = estimate_session(config, combinations, sweep_slot)
+    report(f"[Генерация] Слот перебора: {sweep_slot}")
+    if config.get("fused_reset"):
+        report(f"[Генерация] Расчётное время: перебор {format_time(run_estimate)} "
+               f"(без отдельного сброса, старт с {format_code(config['current_code'])})")
+    else:
+        report(f"[Генерация] Расчётное время: сброс {format_time(reset_estimate)}, "
+               f"перебор {format_time(run_estimate)}")
+    prior = CodePrior.from_config(plan_config)
+    if prior is not None:
+        check_cancel(cancel)
+        expected = expected_time(combinations, prior, timing_for_config(config, RUN_TIMING),
+                                 *run_start(config, sweep_slot), sweep_slot,
+                                 config.get("radix", RADIX))
+        report(f"[Генерация] Ожидаемое время до открытия: {format_time(reset_estimate + expected)}")
+    check_cancel(cancel)
+    if config_path is not None:
+        config["sweep_slot"] = sweep_slot
+        save_config(config, config_path)
+        report(f"[Готово] Слот перебора записан в конфиг: {config_path}")
+    report("[Готово] Генерация завершена.")
+    telemetry.emit("generated", total=len(combinations), sweep_slot=sweep_slot,
+                   duration=round(reset_estimate + run_estimate, 1))
+    return True
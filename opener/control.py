@@ -0,0 +1,174 @@
+"""Управление перебором горячими клавишами оператора.
+
+Бэкенд слушает клавиши событийно (см. ``Backend.listen_keys``) и кладёт
+команды в очередь ``Controller``; основной цикл забирает их на границах
+событий ленты — только когда клавиша F отпущена, поэтому модель колёс
+остаётся точной. Команда срабатывает при отпускании горячей клавиши,
+чтобы она не была зажата, когда движок начинает нажимать F.
+
+Команды:
+
+* ``start`` — старт (и продолжение после паузы);
+* ``pause`` — пауза перед следующим нажатием F, повторное нажатие
+  продолжает. Пауза после уже выдержанной паузы ленты, так что
+  продолжение не стоит ни одного лишнего поворота;
+* ``skip`` — пропустить текущий префикс и перейти к следующему;
+* ``abort`` — остановить перебор с записью журнала (как Ctrl+C).
+
+Время реакции ограничено самым длинным удержанием: во время удержания
+команда ждёт отпускания F.
+"""
+
+import threading
+import time
+from collections import deque
+
+START = "start"
+PAUSE = "pause"
+SKIP = "skip"
+ABORT = "abort"
+# Не команда оператора, а причина остановки: детектор увидел открытый замок.
+OPENED = "opened"
+
+KEY_NAMES = {
+    "Backspace": 0x08,
+    "Enter": 0x0D,
+    "Escape": 0x1B,
+    "Space": 0x20,
+    "F1": 0x70,
+    "F2": 0x71,
+    "F3": 0x72,
+    "F4": 0x73,
+    "F5": 0x74,
+}
+
+DEFAULT_HOTKEYS = {
+    START: "Backspace",
+    PAUSE: "F1",
+    SKIP: "F2",
+    ABORT: "F4",
+}
+
+# Ожидание команды делится на короткие отрезки, чтобы Ctrl+C срабатывал сразу.
+WAIT_SLICE = 0.05
+
+
+def hotkeys_for_config(config):
+    """Горячие клавиши ``{команда: имя клавиши}`` с переопределениями из ``"hotkeys"``."""
+    hotkeys = dict(DEFAULT_HOTKEYS)
+    hotkeys.update(config.get("hotkeys") or {})
+    for command, name in hotkeys.items():
+        if name not in KEY_NAMES:
+            raise ValueError(f"Неизвестная клавиша для '{command}': {name} "
+                             f"(доступны: {', '.join(KEY_NAMES)})")
+    if len(set(hotkeys.values())) != len(hotkeys):
+        by_key = {}
+        for command, name in hotkeys.items():
+            by_key.setdefault(name, []).append(command)
+        clashes = "; ".join(f"{name}: {', '.join(commands)}"
+                            for name, commands in by_key.items() if len(commands) > 1)
+        raise ValueError(f"Одна клавиша назначена нескольким командам ({clashes})")
+    return hotkeys
+
+
+class Controller:
+    """Очередь команд оператора.
+
+    ``post`` можно вызывать из любого потока (слушатель клавиш, GUI).
+    ``report`` и ``telemetry`` получают сообщения о паузе и продолжении.
+    ``paused`` — сколько секунд перебор простоял на паузе оператора (по
+    часам бэкенда из ``listen``).
+    """
+
+    def __init__(self, report=print, telemetry=None, hotkeys=None):
+        self.report = report
+        self.telemetry = telemetry
+        self.hotkeys = dict(hotkeys or DEFAULT_HOTKEYS)
+        self.commands = deque()
+        self._signal = threading.Event()
+        self._listener = None
+        self.clock = time.perf_counter
+        self.paused = 0.0
+
+    def key_name(self, command):
+        return self.hotkeys[command]
+
+    def listen(self, backend):
+        """Подключает горячие клавиши через слушатель ``backend``."""
+        by_vk = {KEY_NAMES[name]: command for command, name in self.hotkeys.items()}
+        self.clock = backend.now
+        self._listener = backend.listen_keys(by_vk, lambda vk: self.post(by_vk[vk]))
+
+    def close(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    def post(self, command):
+        self.commands.append(command)
+        self._signal.set()
+
+    def take(self):
+        """Следующая команда или ``None``, не блокируясь."""
+        try:
+            return self.commands.popleft()
+        except IndexError:
+            return None
+
+    def wait(self):
+        """Блокирующее ожидание следующей команды."""
+        while True:
+            command = self.take()
+            if command is not None:
+                return command
+            self._signal.wait(WAIT_SLICE)
+            self._signal.clear()
+
+    def wait_start(self):
+        """Ждёт команды старта; ``False``, если оператор отменил запуск."""
+        while True:
+            command = self.wait()
+            if command == START:
+                return True
+            if command == ABORT:
+                return False
+
+    def checkpoint(self):
+        """Обрабатывает накопившиеся команды на границе событий (F отпущена).
+
+        Пауза обслуживается здесь же. Возвращает ``SKIP`` или ``ABORT``,
+        если перебор нужно прервать, иначе ``None``.
+        """
+        command = self.take()
+        while command is not None:
+            if command == PAUSE:
+                command = self._pause()
+                if command is not None:
+                    return command
+            elif command in (SKIP, ABORT):
+                return command
+            command = self.take()
+        return None
+
+    def _emit(self, event, **fields):
+        if self.telemetry is not None:
+            self.telemetry.emit(event, **fields)
+
+    def _pause(self):
+        started = self.clock()
+        self.report(f"[Пауза] Перебор приостановлен. {self.key_name(PAUSE)} или "
+                    f"{self.key_name(START)} — продолжить, {self.key_name(SKIP)} — "
+                    f"пропустить префикс, {self.key_name(ABORT)} — остановить.")
+        self._emit("paused")
+        try:
+            while True:
+                command = self.wait()
+                if command in (PAUSE, START):
+                    self.report("[Пауза] Перебор продолжен.")
+                    self._emit("resumed")
+                    return None
+                if command in (SKIP, ABORT):
+                    self._emit("resumed")
+                    return command
+        finally:
+            self.paused += self.clock() - started
@@ -0,0 +1,162 @@
+"""Множество уже проверенных кодов, общее для всех сессий на одном замке.
+
+Хранится битовой картой: один бит на код, ``radix ** length`` бит
+(1,25 КБ для 4 цифр, 125 КБ для 6). Файл лежит рядом с конфигом
+(``config_4.tried``) и сохраняется перебором пачками — раз в
+``SAVE_EVERY`` шагов и при остановке; шаги после последнего сохранения
+восстанавливаются по журналу перебора.
+Генерация пропускает префиксы, все коды которых уже проверены.
+
+Файлы разных сессий можно объединять и вычитать:
+``py -m opener.coverage union a.tried b.tried -o c.tried``.
+"""
+
+import argparse
+import os
+
+from .engine import RADIX
+
+COVERAGE_SUFFIX = ".tried"
+# Раз во сколько шагов перебор сохраняет файл.
+SAVE_EVERY = 25
+MAGIC = b"OPNB"
+
+
+def coverage_path(config_path):
+    return os.path.splitext(config_path)[0] + COVERAGE_SUFFIX
+
+
+class CodeSet:
+    """Битовое множество кодов длины ``length``."""
+
+    def __init__(self, length, radix=RADIX, bits=None):
+        self.length = length
+        self.radix = radix
+        self.size = radix ** length
+        nbytes = (self.size + 7) // 8
+        self.bits = bytearray(nbytes) if bits is None else bytearray(bits)
+        if len(self.bits) != nbytes:
+            raise ValueError(f"Ожидалось {nbytes} байт битовой карты, получено {len(self.bits)}")
+
+    def copy(self):
+        return CodeSet(self.length, self.radix, self.bits)
+
+    def value(self, code):
+        value = 0
+        for digit in code:
+            value = value * self.radix + digit
+        return value
+
+    def add_value(self, value):
+        self.bits[value >> 3] |= 1 << (value & 7)
+
+    def add(self, code):
+        self.add_value(self.value(code))
+
+    def add_sweep(self, code, sweep_slot):
+        """Отмечает все коды, которые проверяет полный круг слота ``sweep_slot``."""
+        weight = self.radix ** (self.length - 1 - sweep_slot)
+        base = self.value(code) - code[sweep_slot] * weight
+        for digit in range(self.radix):
+            self.add_value(base + digit * weight)
+
+    def has_value(self, value):
+        return bool(self.bits[value >> 3] & (1 << (value & 7)))
+
+    def __contains__(self, code):
+        return self.has_value(self.value(code))
+
+    def covers_sweep(self, code, sweep_slot):
+        """Проверены ли уже все коды полного круга с префиксом ``code``."""
+        weight = self.radix ** (self.length - 1 - sweep_slot)
+        base = self.value(code) - code[sweep_slot] * weight
+        return all(self.has_value(base + digit * weight) for digit in range(self.radix))
+
+    def __len__(self):
+        return bin(int.from_bytes(self.bits, 'little')).count('1')
+
+    def __bool__(self):
+        return any(self.bits)
+
+    def _combine(self, other, operation):
+        if (self.length, self.radix) != (other.length, other.radix):
+            raise ValueError("Множества кодов разной длины или основания")
+        a = int.from_bytes(self.bits, 'little')
+        b = int.from_bytes(other.bits, 'little')
+        return CodeSet(self.length, self.radix, operation(a, b).to_bytes(len(self.bits), 'little'))
+
+    def __or__(self, other):
+        return self._combine(other, lambda a, b: a | b)
+
+    def __and__(self, other):
+        return self._combine(other, lambda a, b: a & b)
+
+    def __sub__(self, other):
+        return self._combine(other, lambda a, b: a & ~b)
+
+    def to_bytes(self):
+        return MAGIC + bytes([self.length, self.radix]) + bytes(self.bits)
+
+    @classmethod
+    def from_bytes(cls, data):
+        if data[:4] != MAGIC:
+            raise ValueError("Неверный формат файла проверенных кодов")
+        return cls(data[4], data[5], data[6:])
+
+    def save(self, path):
+        """Атомарно перезаписывает файл: при сбое остаётся прежняя версия."""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(self.to_bytes())
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            return cls.from_bytes(f.read())
+
+
+def load_coverage(path, length, radix=RADIX):
+    """Множество из файла ``path`` или пустое, если файла нет или он от другого замка."""
+    try:
+        covered = CodeSet.load(path)
+    except FileNotFoundError:
+        return CodeSet(length, radix)
+    except (OSError, ValueError) as e:
+        print(f"[Предупреждение] Файл проверенных кодов {path} не прочитан: {e}")
+        return CodeSet(length, radix)
+    if (covered.length, covered.radix) != (length, radix):
+        print(f"[Предупреждение] Файл {path} относится к кодам другой длины и не используется.")
+        return CodeSet(length, radix)
+    return covered
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="opener.coverage",
+                                     description="Операции с файлами проверенных кодов.")
+    parser.add_argument("operation", choices=["show", "union", "difference", "intersection"])
+    parser.add_argument("files", nargs="+", help="файлы *.tried")
+    parser.add_argument("-o", "--output", help="куда сохранить результат")
+    args = parser.parse_args(argv)
+
+    sets = [CodeSet.load(path) for path in args.files]
+    result = sets[0]
+    for other in sets[1:]:
+        if args.operation == "union":
+            result = result | other
+        elif args.operation == "difference":
+            result = result - other
+        elif args.operation == "intersection":
+            result = result & other
+
+    print(f"[Покрытие] Проверено {len(result)} из {result.size} кодов "
+          f"({len(result) / result.size * 100:.1f}%)")
+    if args.output:
+        result.save(args.output)
+        print(f"[Готово] Сохранено: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
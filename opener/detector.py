@@ -0,0 +1,220 @@
+"""Детекторы открытия замка и определение кода по времени открытия.
+
+Детектор выставляет ``detected_at`` — момент обнаружения по часам
+бэкенда движка. Исполнитель ленты проверяет его перед каждым нажатием F
+(клавиша отпущена, пауза ленты выдержана) и останавливает перебор, то
+есть не позже чем через одно событие после обнаружения.
+
+Детекторы:
+
+* ``ManualDetector`` — оператор нажимает горячую клавишу (по умолчанию
+  F3), увидев открытый замок;
+* ``ScreenRegionDetector`` — сравнивает область экрана с исходным
+  снимком (нужен Pillow);
+* ``SimulatorDetector`` — берёт момент открытия у модели замка.
+
+Полный круг слота перебора проверяет 10 кодов за одно удержание, поэтому
+момент открытия переводится в код по модели поворота: ``k``-й поворот
+удержания наступает через ``onset + (k - 1) * period`` после нажатия.
+``latency`` детектора — наименьшая и наибольшая задержка между
+открытием и обнаружением; коды, показанные в этом окне, — кандидаты.
+
+Выбор детектора — ключ ``"detector"`` конфига:
+``{"type": "manual", "key": "F3"}``,
+``{"type": "screen", "region": [x, y, ширина, высота], "threshold": 25}``
+или ``{"type": "none"}``.
+"""
+
+import os
+import threading
+
+from .control import KEY_NAMES
+from .engine import ROTATION_ONSET, ROTATION_PERIOD, load_profile
+
+DEFAULT_MANUAL_KEY = "F3"
+# Реакция человека: от нажатия до отпускания клавиши после того, как
+# замок открылся на экране.
+MANUAL_LATENCY = (0.2, 2.0)
+DEFAULT_SCREEN_THRESHOLD = 25.0
+DEFAULT_SCREEN_INTERVAL = 0.05
+# Задержка кадра игры и захвата экрана сверх интервала опроса.
+FRAME_LATENCY = 0.1
+# Запас на неточность модели поворота по обе стороны окна.
+SHOW_TOLERANCE = 0.1
+
+
+class Detector:
+    """Базовый детектор: ``detected_at`` выставляется один раз при обнаружении."""
+
+    name = "base"
+    latency = (0.0, 0.0)
+
+    def __init__(self):
+        self.detected_at = None
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+
+class ManualDetector(Detector):
+    """Оператор сообщает об открытии горячей клавишей ``key``."""
+
+    name = "manual"
+    latency = MANUAL_LATENCY
+
+    def __init__(self, backend, key=DEFAULT_MANUAL_KEY):
+        super().__init__()
+        if key not in KEY_NAMES:
+            raise ValueError(f"Неизвестная клавиша детектора: {key}")
+        self.backend = backend
+        self.key = key
+        self._listener = None
+
+    def _on_release(self, vk):
+        if self.detected_at is None:
+            self.detected_at = self.backend.now()
+
+    def start(self):
+        self._listener = self.backend.listen_keys([KEY_NAMES[self.key]], self._on_release)
+
+    def stop(self):
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+
+class ScreenRegionDetector(Detector):
+    """Следит за областью экрана ``region = (x, y, ширина, высота)``.
+
+    Первый снимок — исходный; открытием считается средняя разница
+    яркости больше ``threshold`` (0–255). Снимки делаются каждые
+    ``interval`` секунд в отдельном потоке.
+    """
+
+    name = "screen"
+
+    def __init__(self, backend, region, threshold=DEFAULT_SCREEN_THRESHOLD,
+                 interval=DEFAULT_SCREEN_INTERVAL):
+        super().__init__()
+        try:
+            from PIL import ImageChops, ImageGrab, ImageStat
+        except ImportError:
+            raise RuntimeError("Для детектора по экрану нужен Pillow: pip install pillow") from None
+        self._grab = ImageGrab.grab
+        self._difference = ImageChops.difference
+        self._stat = ImageStat.Stat
+        self.backend = backend
+        x, y, width, height = region
+        self.bbox = (x, y, x + width, y + height)
+        self.threshold = threshold
+        self.interval = interval
+        self.latency = (0.0, interval + FRAME_LATENCY)
+        self._stopped = threading.Event()
+        self._thread = None
+
+    def _snapshot(self):
+        return self._grab(bbox=self.bbox).convert("L")
+
+    def difference(self, baseline, image):
+        return self._stat(self._difference(baseline, image)).mean[0]
+
+    def _run(self):
+        baseline = self._snapshot()
+        while not self._stopped.wait(self.interval):
+            captured_at = self.backend.now()
+            if self.difference(baseline, self._snapshot()) > self.threshold:
+                self.detected_at = captured_at
+                return
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name="opener-screen", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+
+
+class SimulatorDetector(Detector):
+    """Момент открытия берётся у ``SimulatedLock`` — без задержки обнаружения."""
+
+    name = "simulator"
+
+    def __init__(self, lock):
+        self.lock = lock
+
+    @property
+    def detected_at(self):
+        return self.lock.opened_at
+
+
+def create_detector(config, backend):
+    """Детектор по разделу ``"detector"`` конфига или ``None``, если он выключен.
+
+    По умолчанию — ручной, а для симулятора — ``SimulatorDetector``.
+    """
+    spec = config.get("detector")
+    if isinstance(spec, str):
+        spec = {"type": spec}
+    spec = dict(spec or {})
+    kind = spec.get("type")
+    if kind is None:
+        kind = "simulator" if backend.name == "simulator" else "manual"
+    if kind == "none":
+        return None
+    if kind == "manual":
+        return ManualDetector(backend, spec.get("key", DEFAULT_MANUAL_KEY))
+    if kind == "screen":
+        return ScreenRegionDetector(backend, spec["region"],
+                                    spec.get("threshold", DEFAULT_SCREEN_THRESHOLD),
+                                    spec.get("interval", DEFAULT_SCREEN_INTERVAL))
+    if kind == "simulator":
+        return SimulatorDetector(backend.lock)
+    raise ValueError(f"Неизвестный детектор открытия: {kind}")
+
+
+def rotation_model(config):
+    """``(onset, period)`` модели поворота: из профиля калибровки или стандартные."""
+    name = config.get("timing_profile")
+    if name:
+        try:
+            profile = load_profile(name)
+            return profile["onset"], profile["period"]
+        except (OSError, ValueError, KeyError):
+            pass
+    return ROTATION_ONSET, ROTATION_PERIOD
+
+
+def opening_candidates(timeline, timing, events, anchor, detected_at, latency,
+                       onset=ROTATION_ONSET, period=ROTATION_PERIOD, tolerance=SHOW_TOLERANCE):
+    """Коды, которые могли открыть замок, — самый вероятный первым.
+
+    ``anchor = (время по ленте, время по часам)`` — последнее выполненное
+    событие ленты; через него момент обнаружения ``detected_at``
+    переводится во время ленты. Кандидаты — коды, показанные в окне
+    ``latency`` до обнаружения; если окно пусто — последний код перед ним.
+    """
+    detected = anchor[0] + (detected_at - anchor[1])
+    low = detected - latency[1] - tolerance
+    high = detected - latency[0] + tolerance
+    expected = detected - (latency[0] + latency[1]) / 2
+    shows = timeline.show_times(events, timing, onset, period)
+    candidates = [(t, code) for t, code in shows if low <= t <= high]
+    if not candidates:
+        earlier = [(t, code) for t, code in shows if t <= high]
+        candidates = earlier[-1:]
+    candidates.sort(key=lambda item: abs(item[0] - expected))
+    unique = []
+    for _, code in candidates:
+        if code not in unique:
+            unique.append(code)
+    return [list(code) for code in unique]
+
+
+def record_opened(code, path):
+    """Дописывает открытый код в файл истории (формат ``opener.priors``)."""
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write("".join(map(str, code)) + "\n")
@@ -0,0 +1,361 @@
+"""Движок ввода кода: тайминги, модель колёс и базовые операции с клавишей F.
+
+Замок управляется одной клавишей: короткое нажатие переключает слот,
+удержание вращает колесо текущего слота вперёд. Длительность удержания
+для заданного числа оборотов берётся из таблицы ``DIGIT_HOLD``; ключ 0
+соответствует полному кругу (``radix`` оборотов).
+"""
+
+import json
+import os
+
+from .backends import create_backend
+from .scheduler import DeadlineScheduler
+
+RADIX = 10
+
+PROFILES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "profiles")
+
+SCANCODE_F = 0x21
+VK_BACK = 0x08
+
+DIGIT_HOLD = {
+    0: 6.20,
+    1: 1.35,
+    2: 2.00,
+    3: 2.50,
+    4: 3.00,
+    5: 3.55,
+    6: 4.00,
+    7: 4.60,
+    8: 5.15,
+    9: 5.65,
+}
+
+# Модель поворота, согласованная с таблицей DIGIT_HOLD: первый поворот
+# происходит через ROTATION_ONSET секунд удержания, каждый следующий —
+# через ROTATION_PERIOD. Калибровка уточняет оба значения для машины.
+ROTATION_ONSET = 1.0
+ROTATION_PERIOD = 0.54
+
+
+def default_digit_hold(radix=RADIX):
+    """Возвращает таблицу удержаний для колеса с ``radix`` позициями.
+
+    Для десятичного колеса это ``DIGIT_HOLD``; для остальных таблица
+    линейно продолжается по шагу между соседними значениями ``DIGIT_HOLD``.
+    """
+    if radix == RADIX:
+        return dict(DIGIT_HOLD)
+    step = (DIGIT_HOLD[0] - DIGIT_HOLD[1]) / (RADIX - 1)
+    table = {k: round(DIGIT_HOLD[1] + (k - 1) * step, 3) for k in range(1, radix)}
+    table[0] = round(DIGIT_HOLD[1] + (radix - 1) * step, 3)
+    return table
+
+
+class Timing:
+    """Набор задержек, которыми оплачивается каждое действие с замком."""
+
+    def __init__(self, settle_time, slot_switch_delay, key_press_time=0.05,
+                 key_release_time=0.1, digit_hold=None, radix=RADIX):
+        self.settle_time = settle_time
+        self.slot_switch_delay = slot_switch_delay
+        self.key_press_time = key_press_time
+        self.key_release_time = key_release_time
+        self.radix = radix
+        self.digit_hold = dict(digit_hold) if digit_hold is not None else default_digit_hold(radix)
+
+    def replace(self, **changes):
+        """Копия набора задержек с заменёнными значениями."""
+        params = {
+            "settle_time": self.settle_time,
+            "slot_switch_delay": self.slot_switch_delay,
+            "key_press_time": self.key_press_time,
+            "key_release_time": self.key_release_time,
+            "digit_hold": self.digit_hold,
+            "radix": self.radix,
+        }
+        params.update(changes)
+        return Timing(**params)
+
+    def hold(self, rotations):
+        """Время удержания для ``rotations`` оборотов (``radix`` — полный круг)."""
+        return self.digit_hold[rotations % self.radix]
+
+    def rotate_cost(self, rotations):
+        """Полная стоимость поворота колеса, включая паузу после отпускания."""
+        if rotations % self.radix == 0:
+            return 0.0
+        return self.hold(rotations) + self.settle_time
+
+    def full_circle_cost(self):
+        return self.digit_hold[0] + self.settle_time
+
+    def switch_cost(self, count):
+        """Стоимость ``count`` нажатий переключения слота и паузы после них."""
+        if count == 0:
+            return 0.0
+        return count * (self.key_press_time + self.key_release_time) + self.slot_switch_delay
+
+
+# Тайминги перебора и сброса исторически различаются: сброс выполняется
+# один раз и может позволить себе больший запас.
+RUN_TIMING = Timing(settle_time=0.65, slot_switch_delay=0.1)
+RESET_TIMING = Timing(settle_time=1.00, slot_switch_delay=0.5)
+
+
+def profile_path(name):
+    return os.path.join(PROFILES_DIR, f"{name}.json")
+
+
+def load_profile(name):
+    """Загружает профиль удержаний, полученный калибровкой (см. ``opener.calibration``)."""
+    with open(profile_path(name), 'r', encoding='utf-8') as f:
+        profile = json.load(f)
+    profile["digit_hold"] = {int(k): v for k, v in profile["digit_hold"].items()}
+    return profile
+
+
+def timing_for_config(config, base):
+    """``base`` с удержаниями из профиля ``timing_profile`` конфига, если он задан."""
+    name = config.get("timing_profile")
+    if not name:
+        return base
+    try:
+        profile = load_profile(name)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"[Предупреждение] Профиль удержаний '{name}' не загружен ({e}), "
+              f"используются стандартные значения.")
+        return base
+    return base.replace(digit_hold=profile["digit_hold"], radix=profile.get("radix", base.radix))
+
+
+class Engine:
+    """Управляет колёсами замка длины ``length`` и отслеживает их состояние.
+
+    ``code`` и ``slot`` — модель того, что сейчас показывает замок в игре.
+    Все методы обновляют её сразу после отправки соответствующих нажатий.
+    Нажатия выполняет ``backend`` (см. ``opener.backends``) в моменты,
+    которые назначает ``scheduler``: ``sleep`` лишь сдвигает дедлайн
+    следующего события, поэтому ошибки пауз не накапливаются.
+    """
+
+    def __init__(self, length, radix=RADIX, timing=None, backend=None):
+        if length < 2:
+            raise ValueError(f"Длина кода должна быть не меньше 2, получено {length}")
+        self.length = length
+        self.radix = radix
+        self.timing = timing if timing is not None else RUN_TIMING
+        self.backend = backend if backend is not None else create_backend()
+        self.scheduler = DeadlineScheduler(self.backend)
+        self.code = [0] * length
+        self.slot = 0
+        # Необязательный обработчик каждого кода, который замок показывает при поворотах.
+        self.on_show = None
+
+    def press_key(self, sc=SCANCODE_F):
+        self.scheduler.fire(self.backend.key_down, sc)
+
+    def release_key(self, sc=SCANCODE_F):
+        self.scheduler.fire(self.backend.key_up, sc)
+
+    def is_key_down(self, vk):
+        return self.backend.is_key_down(vk)
+
+    def now(self):
+        return self.backend.now()
+
+    def sleep(self, seconds):
+        self.scheduler.delay(seconds)
+
+    def flush(self):
+        """Дожидается окончания всех назначенных пауз."""
+        self.scheduler.wait()
+
+    def resync(self):
+        """Отсчитывает следующие паузы от текущего момента (после ожидания вне движка)."""
+        self.scheduler.resync()
+
+    def close(self):
+        """Освобождает бэкенд: таймер Windows, устройство uinput."""
+        self.backend.close()
+
+    def switch_slot(self, count):
+        if count == 0:
+            return
+        for _ in range(count):
+            self.press_key(SCANCODE_F)
+            self.sleep(self.timing.key_press_time)
+            self.release_key(SCANCODE_F)
+            self.sleep(self.timing.key_release_time)
+        self.slot = (self.slot + count) % self.length
+
+    def move_to_slot(self, slot):
+        """Переходит на слот ``slot`` (только вперёд по кругу) и ждёт паузу переключения."""
+        delta = (slot - self.slot) % self.length
+        if delta == 0:
+            return
+        self.switch_slot(delta)
+        self.sleep(self.timing.slot_switch_delay)
+
+    def _show_rotations(self, rotations):
+        if self.on_show is None:
+            return
+        code = list(self.code)
+        for _ in range(rotations):
+            code[self.slot] = (code[self.slot] + 1) % self.radix
+            self.on_show(tuple(code))
+
+    def set_digit(self, rotations):
+        rotations %= self.radix
+        if rotations == 0:
+            return
+        self.press_key(SCANCODE_F)
+        self.sleep(self.timing.hold(rotations))
+        self.release_key(SCANCODE_F)
+        self.sleep(self.timing.settle_time)
+        self._show_rotations(rotations)
+        self.code[self.slot] = (self.code[self.slot] + rotations) % self.radix
+
+    def perform_full_circle(self):
+        """Прокручивает текущий слот на полный круг, проверяя все его цифры."""
+        self.press_key(SCANCODE_F)
+        self.sleep(self.timing.digit_hold[0])
+        self.release_key(SCANCODE_F)
+        self.sleep(self.timing.settle_time)
+        self._show_rotations(self.radix)
+
+    def rotations_to(self, slot, target_digit):
+        return (target_digit - self.code[slot]) % self.radix
+
+    def set_code_sequential(self, target_code, sweep_slot=None):
+        """Выставляет все цифры кроме слота перебора и прокручивает слот перебора.
+
+        Слоты обходятся только вперёд, начиная с текущего, и только те,
+        где цифра действительно меняется. Слот перебора поворачивается до
+        цифры ``target_code[sweep_slot]``, а если она совпадает с текущей —
+        на полный круг (см. ``sweep_rotations``). Движок остаётся на слоте
+        перебора.
+        """
+        if sweep_slot is None:
+            sweep_slot = self.length - 1
+        for slot in changed_slots(self.code, self.slot, target_code, sweep_slot, self.radix):
+            self.move_to_slot(slot)
+            self.set_digit(self.rotations_to(slot, target_code[slot]))
+        self.move_to_slot(sweep_slot)
+        rotations = sweep_rotations(self.code[sweep_slot], target_code[sweep_slot], self.radix)
+        if rotations == self.radix:
+            self.perform_full_circle()
+        else:
+            self.set_digit(rotations)
+        return list(self.code)
+
+    def estimate_set_code(self, target_code, sweep_slot=None):
+        """Расчётная длительность ``set_code_sequential`` без отправки нажатий."""
+        if sweep_slot is None:
+            sweep_slot = self.length - 1
+        return step_cost(self.timing, self.code, self.slot, target_code, sweep_slot, self.radix)
+
+    def wait_for_key(self, vk=VK_BACK, poll_interval=0.1, release_delay=0.5):
+        while not self.is_key_down(vk):
+            self.backend.sleep(poll_interval)
+        self.backend.sleep(release_delay)
+        self.resync()
+
+
+def changed_slots(code, slot, target_code, sweep_slot, radix=RADIX):
+    """Слоты, где ``target_code`` отличается от ``code``, в порядке обхода от ``slot``."""
+    length = len(code)
+    order = [(slot + i) % length for i in range(length)]
+    return [i for i in order
+            if i != sweep_slot and (target_code[i] - code[i]) % radix != 0]
+
+
+def sweep_rotations(digit, target_digit, radix=RADIX):
+    """Поворотов слота перебора на шаге: до ``target_digit``, полный круг — если цифра та же."""
+    return (target_digit - digit) % radix or radix
+
+
+def step_cost(timing, code, slot, target_code, sweep_slot, radix=RADIX):
+    """Длительность шага: выставить префикс ``target_code`` и прокрутить ``sweep_slot``."""
+    length = len(code)
+    total = 0.0
+    for i in changed_slots(code, slot, target_code, sweep_slot, radix):
+        total += timing.switch_cost((i - slot) % length)
+        total += timing.rotate_cost((target_code[i] - code[i]) % radix)
+        slot = i
+    total += timing.switch_cost((sweep_slot - slot) % length)
+    rotations = sweep_rotations(code[sweep_slot], target_code[sweep_slot], radix)
+    if rotations == radix:
+        total += timing.full_circle_cost()
+    else:
+        total += timing.rotate_cost(rotations)
+    return total
+
+
+def shown_codes(code, slot, target_code, sweep_slot, radix=RADIX, sweep=True):
+    """Коды, которые замок показывает за шаг к ``target_code``, включая промежуточные.
+
+    Каждый поворот колеса на одну позицию — отдельный показанный код. При
+    ``sweep=False`` учитывается только выставление префикса.
+    """
+    code = list(code)
+    for i in changed_slots(code, slot, target_code, sweep_slot, radix):
+        for _ in range((target_code[i] - code[i]) % radix):
+            code[i] = (code[i] + 1) % radix
+            yield tuple(code)
+    if sweep:
+        for _ in range(sweep_rotations(code[sweep_slot], target_code[sweep_slot], radix)):
+            code[sweep_slot] = (code[sweep_slot] + 1) % radix
+            yield tuple(code)
+
+
+def normalize_config(config):
+    """Приводит цифры кодов к числам и дополняет значения по умолчанию."""
+    config['start_code'] = [int(d) for d in config['start_code']]
+    config['current_code'] = [int(d) for d in config['current_code']]
+    config.setdefault('radix', RADIX)
+    return config
+
+
+def load_config(config_path):
+    try:
+        with open(config_path, 'r', encoding='utf-8') as f:
+            return normalize_config(json.load(f))
+    except FileNotFoundError:
+        print(f"[Ошибка] Конфигурационный файл не найден: {config_path}")
+        return None
+    except Exception as e:
+        print(f"[Ошибка] Загрузка конфига: {e}")
+        return None
+
+
+def save_config(config, config_path):
+    with open(config_path, 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=2, ensure_ascii=False)
+
+
+def save_wheel_state(config_path, code, slot):
+    """Записывает фактическое состояние колёс в конфиг: следующему запуску не нужен ввод кода."""
+    config = load_config(config_path)
+    if not config:
+        return
+    config["current_code"] = list(code)
+    config["slot"] = slot
+    save_config(config, config_path)
+
+
+def format_time(seconds):
+    if seconds < 0:
+        return "0с"
+    if seconds < 60:
+        return f"{int(seconds)}с"
+    elif seconds < 3600:
+        minutes = int(seconds // 60)
+        secs = int(seconds % 60)
+        return f"{minutes}м {secs}с"
+    else:
+        hours = int(seconds // 3600)
+        minutes = int((seconds % 3600) // 60)
+        secs = int(seconds % 60)
+        return f"{hours}ч {minutes}м {secs}с"
@@ -0,0 +1,67 @@
+"""Оценка оставшегося времени перебора по плану.
+
+Оставшаяся длительность берётся из скомпилированной ленты событий — это
+точная сумма расчётных стоимостей оставшихся шагов для любого
+направления и стартового кода. Фактическое время может отличаться от
+расчётного (опоздания событий, перенос отсчёта планировщиком), поэтому
+план умножается на сглаженное отношение «измерено / по плану», а
+разброс этого отношения даёт доверительный интервал.
+"""
+
+import math
+import time
+
+from .engine import format_time
+
+DEFAULT_ALPHA = 0.05
+DEFAULT_Z = 1.96
+
+
+class EtaEstimator:
+    """Экспоненциально сглаженное отношение фактической длительности шагов к расчётной.
+
+    ``alpha`` — вес последнего шага, ``z`` — ширина интервала в
+    стандартных отклонениях (1.96 — около 95%).
+    """
+
+    def __init__(self, alpha=DEFAULT_ALPHA, z=DEFAULT_Z):
+        self.alpha = alpha
+        self.z = z
+        self.ratio = 1.0
+        self.variance = 0.0
+        self.samples = 0
+
+    def update(self, planned, measured):
+        """Учитывает шаг с расчётной длительностью ``planned`` и фактической ``measured``."""
+        if planned <= 0:
+            return
+        sample = measured / planned
+        if self.samples == 0:
+            self.ratio = sample
+        else:
+            delta = sample - self.ratio
+            self.ratio += self.alpha * delta
+            self.variance = (1 - self.alpha) * (self.variance + self.alpha * delta * delta)
+        self.samples += 1
+
+    def effective_samples(self):
+        """Число шагов, которое фактически усредняет сглаживание."""
+        return min(self.samples, (2 - self.alpha) / self.alpha)
+
+    def remaining(self, planned_remaining):
+        """``(оценка, нижняя граница, верхняя граница)`` оставшегося времени в секундах."""
+        estimate = planned_remaining * self.ratio
+        if self.samples < 2:
+            return estimate, estimate, estimate
+        spread = self.z * math.sqrt(self.variance / self.effective_samples())
+        return (estimate, planned_remaining * max(self.ratio - spread, 0.0),
+                planned_remaining * (self.ratio + spread))
+
+    def describe(self, planned_remaining, now=None):
+        """Строка для лога: оставшееся время, интервал и ожидаемое время окончания."""
+        estimate, low, high = self.remaining(planned_remaining)
+        finish = time.localtime((time.time() if now is None else now) + estimate)
+        text = f"ETA: {format_time(estimate)}"
+        if format_time(high) != format_time(low):
+            text += f" ({format_time(low)}–{format_time(high)})"
+        return text + f", окончание ~{time.strftime('%H:%M', finish)}"
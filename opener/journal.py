@@ -0,0 +1,156 @@
+"""Журнал перебора для продолжения после сбоя или остановки.
+
+Журнал — файл JSON-строк рядом с конфигом (``config_4.journal``). Первая
+строка — заголовок с копией конфига, по которому построен план, кодами
+из файлов вероятностей (``prior``) на момент построения и состоянием
+колёс перед первым шагом, а также отпечаток плана (``plan_fingerprint``):
+продолжение сверяет с ним заново построенный план, ведь номера шагов в
+журнале указывают именно в него. Далее после каждого завершённого
+шага дописывается строка ``{"i": номер, "code": [...], "slot": слот}`` и
+сразу сбрасывается на диск (``fsync``), так что при падении процесса
+теряется не больше одного шага. Недописанная последняя строка при чтении
+пропускается.
+"""
+
+import base64
+import hashlib
+import json
+import os
+from itertools import islice
+
+from .coverage import CodeSet
+
+JOURNAL_SUFFIX = ".journal"
+# Сколько первых кодов плана входит в отпечаток.
+FINGERPRINT_CODES = 64
+
+
+def journal_path(config_path):
+    return os.path.splitext(config_path)[0] + JOURNAL_SUFFIX
+
+
+def plan_fingerprint(kind, combinations, count=FINGERPRINT_CODES):
+    """Отпечаток плана: вид, число шагов и хеш первых ``count`` кодов и последнего."""
+    digest = hashlib.sha1()
+    codes = list(islice(iter(combinations), count))
+    if combinations:
+        codes.append(combinations[len(combinations) - 1])
+    for code in codes:
+        digest.update(bytes(code))
+    return {"kind": kind, "total": len(combinations), "codes": digest.hexdigest()}
+
+
+class Journal:
+    def __init__(self, path, mode):
+        self.path = path
+        self.file = open(path, mode, encoding='utf-8')
+
+    @classmethod
+    def create(cls, path, config, code, slot, total, covered=None, prior_counts=None, plan=None):
+        """Начинает новый журнал, затирая старый.
+
+        ``covered`` — снимок проверенных кодов (``CodeSet``), по которому
+        генерация пропускала префиксы, ``prior_counts`` — прочитанные файлы
+        вероятностей (``opener.priors.prior_file_counts``): без них план
+        нельзя восстановить, если файлы с тех пор изменились. ``plan`` —
+        отпечаток плана (``plan_fingerprint``).
+        """
+        journal = cls(path, 'w')
+        header = {"config": config, "code": list(code), "slot": slot, "total": total}
+        if covered:
+            header["covered"] = base64.b64encode(covered.to_bytes()).decode('ascii')
+        if plan is not None:
+            header["plan"] = plan
+        if prior_counts is not None:
+            header["prior_counts"] = {name: sorted(counts.items())
+                                      for name, counts in prior_counts.items()}
+        journal._write(header)
+        return journal
+
+    @classmethod
+    def reopen(cls, path):
+        """Продолжает запись в существующий журнал."""
+        return cls(path, 'a')
+
+    def _write(self, entry):
+        self.file.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + "\n")
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+    def record(self, index, code, slot):
+        self._write({"i": index, "code": list(code), "slot": slot})
+
+    def skip(self, index, code, slot):
+        """Шаг ``index`` пропущен оператором; колёса остались в ``code``/``slot``."""
+        self._write({"i": index, "code": list(code), "slot": slot, "skipped": True})
+
+    def stop(self, index, code, slot):
+        """Остановка посреди шага ``index + 1``: колёса в точно известном состоянии."""
+        self._write({"i": index, "code": list(code), "slot": slot, "stopped": True})
+
+    def finish(self, index, code, slot):
+        self._write({"i": index, "code": list(code), "slot": slot, "done": True})
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def read_journal(path):
+    """Возвращает ``(заголовок, последняя запись)``; ``(None, None)``, если журнала нет."""
+    header = None
+    last = None
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue
+                if header is None:
+                    header = entry
+                else:
+                    last = entry
+    except FileNotFoundError:
+        return None, None
+    return header, last
+
+
+def journal_entries(path):
+    """Все записи журнала после заголовка, по порядку."""
+    entries = []
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            next(f, None)
+            for line in f:
+                try:
+                    entries.append(json.loads(line))
+                except ValueError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return entries
+
+
+def journal_coverage(header):
+    """Снимок проверенных кодов из заголовка журнала или ``None``."""
+    data = header.get("covered")
+    if not data:
+        return None
+    return CodeSet.from_bytes(base64.b64decode(data))
+
+
+def journal_prior_counts(header):
+    """Коды файлов вероятностей из заголовка журнала или ``None`` (старый журнал)."""
+    data = header.get("prior_counts")
+    if data is None:
+        return None
+    return {name: {value: count for value, count in pairs} for name, pairs in data.items()}
+
+
+def resume_point(header, last):
+    """Номер следующего шага и состояние колёс ``(index, code, slot)`` по журналу."""
+    if last is None:
+        return 0, list(header["code"]), header["slot"]
+    return last["i"] + 1, list(last["code"]), last["slot"]
@@ -0,0 +1,369 @@
+"""Планировщик порядка обхода префиксов по модели стоимости.
+
+Колёса вращаются только вперёд, поэтому строго убывающий порядок платит
+``radix - 1`` поворотов на каждом шаге, а возрастающий — лишние повороты
+при каждом переносе разряда. Планировщик сохраняет намерение пользователя
+на уровне старших цифр (``priority_digits``): корзины с одинаковыми
+старшими цифрами обходятся в заданном порядке, а внутри корзины префиксы
+обходятся модульным кодом Грея — каждый шаг поворачивает ровно одно
+колесо на одну позицию.
+"""
+
+from bisect import bisect_left
+from itertools import permutations
+
+from .coverage import CodeSet
+from .engine import RADIX, changed_slots, shown_codes, step_cost
+from .sequence import CodeSequence, GraySegment, ListSegment, RangeSegment, SweptGraySegment
+
+ASCENDING = "ascending"
+DESCENDING = "descending"
+
+
+def prefix_positions(length, sweep_slot):
+    return [i for i in range(length) if i != sweep_slot]
+
+
+def code_value(code, positions, radix=RADIX):
+    value = 0
+    for i in positions:
+        value = value * radix + code[i]
+    return value
+
+
+def prefix_values(combinations, positions, sweep_slot, radix=RADIX):
+    """Отсортированные номера префиксов ``combinations`` без повторов.
+
+    Числовые сегменты (``RangeSegment``) уже задают номера префиксов, и
+    коды из них не строятся.
+    """
+    segments = getattr(combinations, "segments", None)
+    if segments is not None and all(isinstance(segment, RangeSegment)
+                                    and segment.sweep_slot == sweep_slot
+                                    and segment.radix == radix for segment in segments):
+        values = set()
+        for segment in segments:
+            values.update(range(segment.start, segment.start + segment.count * segment.step,
+                                segment.step))
+        return sorted(values)
+    return sorted({code_value(code, positions, radix) for code in combinations})
+
+
+def gray_steps(width, radix=RADIX):
+    """Шаги модульного кода Грея на ``width`` разрядах.
+
+    Возвращает индексы разрядов (0 — старший), которые нужно повернуть
+    на +1, чтобы обойти все ``radix ** width`` сочетаний с любого старта.
+    """
+    counter = [0] * width
+    for _ in range(radix ** width - 1):
+        i = width - 1
+        while counter[i] == radix - 1:
+            counter[i] = 0
+            i -= 1
+        counter[i] += 1
+        yield i
+
+
+def plan_order(combinations, start_code, order=ASCENDING, priority_digits=1,
+               sweep_slot=None, radix=RADIX):
+    """Упорядочивает префиксы ``combinations`` для обхода с минимумом поворотов.
+
+    ``start_code`` — состояние колёс перед первым шагом. Возвращает
+    ``CodeSequence`` состояний колёс, которые нужно выставить перед каждым
+    полным кругом слота ``sweep_slot``; цифра самого слота перебора в них
+    не меняется. Полные корзины хранятся блоками кода Грея, а не списком.
+    """
+    length = len(start_code)
+    if sweep_slot is None:
+        sweep_slot = length - 1
+    positions = prefix_positions(length, sweep_slot)
+    width = len(positions)
+    values = prefix_values(combinations, positions, sweep_slot, radix)
+    state = list(start_code)
+    segments = []
+    singles = []
+
+    def set_fixed(depth, base):
+        for i in range(depth - 1, -1, -1):
+            base, state[positions[i]] = divmod(base, radix)
+
+    def visit(depth, base, lo, hi):
+        span = radix ** (width - depth)
+        if hi - lo == span and depth >= priority_digits:
+            set_fixed(depth, base)
+            if depth == width:
+                # Одиночные префиксы копятся в общий явный сегмент.
+                singles.append(list(state))
+                return
+            if singles:
+                segments.append(ListSegment(singles, sweep_slot))
+                singles.clear()
+            block = GraySegment(state, positions[depth:], sweep_slot, radix)
+            segments.append(block)
+            state[:] = block.nth(len(block) - 1)
+            return
+
+        child_span = span // radix
+        children = []
+        for digit in range(radix):
+            child = base * radix + digit
+            child_lo = bisect_left(values, child * child_span, lo, hi)
+            child_hi = bisect_left(values, (child + 1) * child_span, child_lo, hi)
+            if child_hi > child_lo:
+                children.append((digit, child_lo, child_hi))
+
+        if depth < priority_digits:
+            if order == DESCENDING:
+                children.reverse()
+        else:
+            # Порядок внутри корзины свободен: идём по кругу от текущей цифры.
+            current = state[positions[depth]]
+            children.sort(key=lambda child: (child[0] - current) % radix)
+
+        for digit, child_lo, child_hi in children:
+            visit(depth + 1, base * radix + digit, child_lo, child_hi)
+
+    if values:
+        visit(0, 0, 0, len(values))
+    if singles:
+        segments.append(ListSegment(singles, sweep_slot))
+    return CodeSequence(segments, sweep_slot)
+
+
+def plan_cost(plan, timing, start_code, start_slot=0, sweep_slot=None, radix=RADIX):
+    """Расчётная длительность обхода ``plan`` с учётом паузы между шагами."""
+    if sweep_slot is None:
+        sweep_slot = len(start_code) - 1
+    code = list(start_code)
+    slot = start_slot
+    total = 0.0
+    for target in plan:
+        total += step_cost(timing, code, slot, target, sweep_slot, radix)
+        code = target
+        slot = sweep_slot
+    if plan:
+        total += (len(plan) - 1) * timing.settle_time
+    return total
+
+
+def plan_by_probability(combinations, start_code, prior, timing, order=ASCENDING,
+                        priority_digits=1, sweep_slot=None, window=16, head_limit=1000,
+                        start_slot=0, radix=RADIX):
+    """Упорядочивает префиксы так, чтобы минимизировать ожидаемое время до успеха.
+
+    Префиксы с ненулевой «шаблонной» вероятностью идут первыми: на каждом
+    шаге из ``window`` самых вероятных оставшихся выбирается префикс с
+    наибольшим отношением вероятности к стоимости перехода из текущего
+    состояния колёс. После ``head_limit`` таких шагов оставшиеся вероятные
+    префиксы идут просто по убыванию вероятности. Остальные префиксы
+    равновероятны и обходятся обычным ``plan_order``.
+    """
+    length = len(start_code)
+    if sweep_slot is None:
+        sweep_slot = length - 1
+    positions = prefix_positions(length, sweep_slot)
+    covered = {}
+    for code in combinations:
+        code = list(code)
+        code[sweep_slot] = start_code[sweep_slot]
+        covered[code_value(code, positions, radix)] = code
+    masses = {prefix: mass for prefix, mass in prior.prefix_masses(positions).items()
+              if prefix in covered}
+    remaining = sorted(masses, key=masses.get, reverse=True)
+
+    state = list(start_code)
+    slot = start_slot
+    plan = []
+    while remaining:
+        if len(plan) >= head_limit:
+            window = 1
+        best_index = 0
+        best_ratio = -1.0
+        for index, prefix in enumerate(remaining[:window]):
+            target = covered[prefix]
+            cost = step_cost(timing, state, slot, target, sweep_slot, radix)
+            ratio = masses[prefix] / cost
+            if ratio > best_ratio:
+                best_index, best_ratio = index, ratio
+        target = covered[remaining.pop(best_index)]
+        state = [state[i] if i == sweep_slot else target[i] for i in range(length)]
+        slot = sweep_slot
+        plan.append(list(state))
+
+    tail = [code for prefix, code in covered.items() if prefix not in masses]
+    rest = plan_order(tail, state, order, priority_digits, sweep_slot, radix)
+    return CodeSequence([ListSegment(plan, sweep_slot)] + rest.segments, sweep_slot)
+
+
+def expected_time(plan, prior, timing, start_code, start_slot=0, sweep_slot=None, radix=RADIX):
+    """Ожидаемое время до открытия замка при обходе ``plan`` (код считается
+    проверенным к концу полного круга его префикса)."""
+    length = len(start_code)
+    if sweep_slot is None:
+        sweep_slot = length - 1
+    positions = prefix_positions(length, sweep_slot)
+    masses = prior.prefix_masses(positions)
+    uniform_mass = prior.uniform_weight() * radix
+    code = list(start_code)
+    slot = start_slot
+    elapsed = 0.0
+    expected = 0.0
+    covered_mass = 0.0
+    for step, target in enumerate(plan):
+        if step:
+            elapsed += timing.settle_time
+        elapsed += step_cost(timing, code, slot, target, sweep_slot, radix)
+        mass = uniform_mass + masses.get(code_value(target, positions, radix), 0.0)
+        expected += mass * elapsed
+        covered_mass += mass
+        code = target
+        slot = sweep_slot
+    return expected / covered_mass if covered_mass else 0.0
+
+
+def credit_visits(plan, start_code, covered=None, start_slot=0, sweep_slot=None, radix=RADIX):
+    """Пересчитывает план с учётом кодов, которые замок показывает по пути.
+
+    Каждый поворот колеса показывает код, и он считается проверенным (см.
+    ``engine.shown_codes``). Для каждого префикса плана слот перебора
+    поворачивается ровно настолько, чтобы пройти все ещё не проверенные
+    цифры: код, показанный при выставлении префикса, повторно не нужен, и
+    вместо полного круга обычно хватает ``radix - 1`` позиций. Префиксы,
+    все коды которых уже проверены (в том числе в прошлых сессиях —
+    ``covered``), пропускаются. Цифра слота перебора в ``plan`` не важна;
+    в результате она задаёт, где колесо остановится после шага.
+
+    Блоки кода Грея остаются ленивыми: внутри блока каждый шаг поворачивает
+    одно колесо префикса на одну позицию, и для префиксов без показанных
+    кодов результат известен заранее (``SweptGraySegment``). Явно
+    пересчитываются только первый шаг блока и префиксы, которые уже
+    задеты — прошлыми сессиями или промежуточными кодами переходов.
+    """
+    length = len(start_code)
+    if sweep_slot is None:
+        sweep_slot = length - 1
+    seen = CodeSet(length, radix)
+    if covered:
+        seen = seen | covered
+    weight = radix ** (length - 1 - sweep_slot)
+    code = list(start_code)
+    slot = start_slot
+    segments = []
+    states = []
+    # Префиксы (с нулём в слоте перебора), задетые промежуточными кодами переходов.
+    touched = set()
+
+    def credit(target):
+        nonlocal code, slot
+        target = list(target)
+        target[sweep_slot] = code[sweep_slot]
+        base = seen.value(target) - target[sweep_slot] * weight
+        untested = [d for d in range(radix) if not seen.has_value(base + d * weight)]
+        if not untested:
+            return False
+        for shown in shown_codes(code, slot, target, sweep_slot, radix, sweep=False):
+            value = seen.value(shown)
+            seen.add_value(value)
+            touched.add(value - shown[sweep_slot] * weight)
+        digit = code[sweep_slot]
+        untested = [d for d in untested if not seen.has_value(base + d * weight)]
+        # Пустой остаток значит, что последний код показало выставление префикса;
+        # шаг всё равно поворачивает колесо хотя бы на одну позицию.
+        rotations = max(((d - digit) % radix or radix for d in untested), default=1)
+        target[sweep_slot] = (digit + rotations) % radix
+        for step in range(1, rotations + 1):
+            seen.add_value(base + (digit + step) % radix * weight)
+        states.append(target)
+        code = target
+        slot = sweep_slot
+        return True
+
+    def untouched(prefix):
+        base = seen.value(prefix) - prefix[sweep_slot] * weight
+        return not any(seen.has_value(base + d * weight) for d in range(radix))
+
+    def clean_until(block, n):
+        """Номер первого префикса блока начиная с ``n``, у которого уже есть проверенные коды."""
+        if covered:
+            while n < len(block) and untouched(block.nth(n)):
+                n += 1
+            return n
+        ends = []
+        for base in touched:
+            prefix = [0] * length
+            for i in range(length - 1, -1, -1):
+                base, prefix[i] = divmod(base, radix)
+            index = block.index_of(prefix)
+            if index is not None and index >= n:
+                ends.append(index)
+        return min(ends, default=len(block))
+
+    for segment in plan.segments if isinstance(plan, CodeSequence) else [plan]:
+        if not isinstance(segment, GraySegment):
+            for target in segment:
+                credit(target)
+            continue
+        n = 0
+        while n < len(segment):
+            stepped = credit(segment.nth(n))
+            n += 1
+            if not stepped:
+                continue
+            end = clean_until(segment, n)
+            if end > n:
+                if states:
+                    segments.append(ListSegment(states, sweep_slot))
+                    states = []
+                digit = (code[sweep_slot] - 1) % radix
+                swept = SweptGraySegment(segment, n, end - n, sweep_slot, digit)
+                segments.append(swept)
+                code = swept.nth(len(swept) - 1)
+                n = end
+    if states:
+        segments.append(ListSegment(states, sweep_slot))
+    return CodeSequence(segments, sweep_slot)
+
+
+def reset_order(timing, code, slot, start_code, skip_slot=None, park_slot=0, radix=RADIX):
+    """Порядок обхода слотов при сбросе с минимальной расчётной длительностью.
+
+    Повороты стоят одинаково при любом порядке, поэтому сравниваются только
+    переключения: от ``slot`` через все слоты, где цифра отличается от
+    ``start_code`` (кроме ``skip_slot``), до слота парковки ``park_slot``.
+    Слотов не больше нескольких, так что перебираются все порядки; при
+    равной стоимости остаётся обход по кругу от текущего слота.
+    Возвращает ``(order, cost)``.
+    """
+    length = len(code)
+    target = list(start_code)
+    if skip_slot is not None:
+        target[skip_slot] = code[skip_slot]
+    changed = changed_slots(code, slot, target, skip_slot, radix)
+    rotations = sum(timing.rotate_cost((target[i] - code[i]) % radix) for i in changed)
+    best_order = changed
+    best_switches = None
+    for order in permutations(changed):
+        switches = 0.0
+        current = slot
+        for i in order + (park_slot,):
+            switches += timing.switch_cost((i - current) % length)
+            current = i
+        if best_switches is None or switches < best_switches:
+            best_order, best_switches = list(order), switches
+    return best_order, rotations + best_switches
+
+
+def reset_cost(timing, code, slot, start_code, skip_slot=None, radix=RADIX, park_slot=0):
+    """Расчётная длительность ``reset_wheels`` из состояния ``code``/``slot``."""
+    return reset_order(timing, code, slot, start_code, skip_slot, park_slot, radix)[1]
+
+
+def intent_order(config):
+    """Порядок старших цифр, который выбрал пользователь в конфиге."""
+    direction = config.get("direction", "С начала")
+    if direction == "С конца":
+        return DESCENDING
+    if direction == "Продолжить" and config.get("continue_direction") == "decrease":
+        return DESCENDING
+    return ASCENDING
@@ -0,0 +1,197 @@
+"""Априорные вероятности кодов для упорядочивания перебора.
+
+Источники: файл частот популярных кодов, эвристики шаблонов (повторы,
+последовательности, даты, круглые числа) и история ранее открытых кодов.
+Каждый источник нормируется к единице, затем источники смешиваются с
+весами ``SOURCE_SHARES``; небольшая доля ``floor`` равномерно
+распределяется по всем кодам, чтобы ни один код не получил нулевую
+вероятность.
+"""
+
+import os
+import string
+
+from .engine import RADIX
+
+SOURCE_SHARES = {
+    "history": 0.4,
+    "frequency": 0.4,
+    "patterns": 0.2,
+}
+DEFAULT_FLOOR = 0.05
+# Ключи раздела ``prior`` с путями к файлам кодов.
+PRIOR_FILE_KEYS = ("frequency_file", "history_file")
+# Цифры кода в файлах по порядку значений, как их понимает ``int(code, radix)``.
+CODE_DIGITS = string.digits + string.ascii_lowercase
+
+
+def digits_value(digits, radix=RADIX):
+    value = 0
+    for digit in digits:
+        value = value * radix + digit
+    return value
+
+
+def resolve_prior_files(config, config_path):
+    """Копия конфига, где относительные пути файлов раздела ``prior`` отсчитаны от папки конфига.
+
+    GUI пишет в конфиг голые имена (``opened_codes.txt``), а файлы лежат
+    рядом с конфигом; рабочая папка процесса при этом может быть любой.
+    Без ``config_path`` конфиг возвращается как есть.
+    """
+    settings = config.get("prior")
+    if not settings or config_path is None:
+        return config
+    base = os.path.dirname(os.path.abspath(config_path))
+    settings = dict(settings)
+    for key in PRIOR_FILE_KEYS:
+        path = settings.get(key)
+        if path and not os.path.isabs(path):
+            settings[key] = os.path.join(base, path)
+    return dict(config, prior=settings)
+
+
+def load_code_counts(path, length, radix=RADIX):
+    """Читает файл ``код [количество]`` по строке; пустые строки и ``#`` пропускаются.
+
+    Код записан цифрами основания ``radix``; строки с цифрами вне основания
+    пропускаются.
+    """
+    digits = CODE_DIGITS[:radix]
+    counts = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].replace(',', ' ').replace(';', ' ').strip()
+            if not line:
+                continue
+            parts = line.split()
+            code = parts[0]
+            if len(code) != length or not all(ch in digits for ch in code.lower()):
+                continue
+            count = float(parts[1]) if len(parts) > 1 else 1.0
+            value = int(code, radix)
+            counts[value] = counts.get(value, 0.0) + count
+    return counts
+
+
+def prior_file_counts(config):
+    """Коды из файлов раздела ``prior``: ``{"frequency"|"history": {номер кода: количество}}``.
+
+    Относительные пути файлов считаются от рабочей папки — конфиг из
+    файла сначала проходит через ``resolve_prior_files``.
+    """
+    settings = config.get("prior") or {}
+    counts = {}
+    for name, key in zip(("frequency", "history"), PRIOR_FILE_KEYS):
+        path = settings.get(key)
+        if not path:
+            continue
+        if not os.path.exists(path):
+            print(f"[Предупреждение] Файл кодов {path} ({key}) не найден, источник пропущен.")
+            continue
+        counts[name] = load_code_counts(path, config["length"], config.get("radix", RADIX))
+    return counts
+
+
+def pattern_scores(length, radix=RADIX):
+    """Оценки «человеческих» кодов: чем привычнее шаблон, тем выше оценка."""
+    scores = {}
+
+    def add(digits, score):
+        if len(digits) == length and all(0 <= d < radix for d in digits):
+            value = digits_value(digits, radix)
+            scores[value] = scores.get(value, 0.0) + score
+
+    for d in range(radix):
+        add([d] * length, 10.0)
+        add([d] + [0] * (length - 1), 3.0)
+        for e in range(radix):
+            if e != d:
+                add([d, e] * (length // 2) + [d] * (length % 2), 4.0)
+                add([d] * (length - 1) + [e], 2.0)
+                add([d] + [e] * (length - 1), 2.0)
+                half = [d] * (length // 2) + [e] * (length - length // 2)
+                add(half, 2.0)
+
+    for start in range(radix):
+        add([(start + i) % radix for i in range(length)], 6.0 if start + length <= radix else 3.0)
+        add([(start - i) % radix for i in range(length)], 4.0 if start - length + 1 >= 0 else 2.0)
+
+    if length == 4:
+        for year in range(1950, 2031):
+            add([int(c) for c in str(year)], 3.0)
+        for month in range(1, 13):
+            for day in range(1, 32):
+                add([day // 10, day % 10, month // 10, month % 10], 1.5)
+                add([month // 10, month % 10, day // 10, day % 10], 1.0)
+    elif length == 6:
+        for year in range(100):
+            for month in range(1, 13):
+                for day in range(1, 32):
+                    yy = [year // 10, year % 10]
+                    add([day // 10, day % 10, month // 10, month % 10] + yy, 0.5)
+    elif length == 3:
+        for number in range(0, 1000, 100):
+            add([int(c) for c in f"{number:03d}"], 1.0)
+    return scores
+
+
+def normalized(weights):
+    total = sum(weights.values())
+    if total <= 0:
+        return {}
+    return {value: weight / total for value, weight in weights.items()}
+
+
+class CodePrior:
+    """Вероятности кодов длины ``length``: явные веса плюс равномерная доля ``floor``."""
+
+    def __init__(self, length, radix=RADIX, sources=None, floor=DEFAULT_FLOOR):
+        self.length = length
+        self.radix = radix
+        self.floor = floor
+        self.weights = {}
+        sources = {name: normalized(weights) for name, weights in (sources or {}).items()}
+        sources = {name: weights for name, weights in sources.items() if weights}
+        if not sources:
+            self.floor = 1.0
+            return
+        total_share = sum(SOURCE_SHARES.get(name, 0.2) for name in sources)
+        for name, weights in sources.items():
+            share = (1.0 - self.floor) * SOURCE_SHARES.get(name, 0.2) / total_share
+            for value, weight in weights.items():
+                self.weights[value] = self.weights.get(value, 0.0) + share * weight
+
+    def uniform_weight(self):
+        return self.floor / self.radix ** self.length
+
+    def probability(self, code):
+        return self.uniform_weight() + self.weights.get(digits_value(code, self.radix), 0.0)
+
+    def prefix_masses(self, positions):
+        """Неравномерная часть вероятности, сгруппированная по префиксам ``positions``."""
+        masses = {}
+        for value, weight in self.weights.items():
+            digits = [0] * self.length
+            for i in range(self.length - 1, -1, -1):
+                value, digits[i] = divmod(value, self.radix)
+            prefix = digits_value([digits[i] for i in positions], self.radix)
+            masses[prefix] = masses.get(prefix, 0.0) + weight
+        return masses
+
+    @classmethod
+    def from_config(cls, config, counts=None):
+        """Собирает распределение по разделу ``prior`` конфига или возвращает ``None``.
+
+        ``counts`` — уже прочитанные файлы кодов (см. ``prior_file_counts``),
+        например из журнала перебора; без них файлы читаются заново.
+        """
+        settings = config.get("prior")
+        if not settings:
+            return None
+        length = config["length"]
+        radix = config.get("radix", RADIX)
+        sources = dict(prior_file_counts(config) if counts is None else counts)
+        if settings.get("patterns", True):
+            sources["patterns"] = pattern_scores(length, radix)
+        return cls(length, radix, sources, settings.get("floor", DEFAULT_FLOOR))
@@ -0,0 +1,144 @@
+"""Сброс колёс замка на стартовый код перед перебором."""
+
+from .backends import create_backend
+from .combinations import default_sweep_slot, format_code
+from .control import START, Controller, hotkeys_for_config
+from .coverage import coverage_path, load_coverage
+from .engine import (
+    RESET_TIMING,
+    Engine,
+    format_time,
+    load_config,
+    save_wheel_state,
+    timing_for_config,
+)
+from .planner import reset_order
+
+
+def reset_wheels(engine, start_code, report=print, skip_slot=None, park_slot=0):
+    """Выставляет ``start_code`` из текущего состояния ``engine`` и паркует слот ``park_slot``.
+
+    Цифру слота ``skip_slot`` не трогает: его всё равно прокрутит перебор.
+    Слоты обходятся в порядке с минимумом переключений (``reset_order``).
+    Возвращает ``(расчётная, фактическая)`` длительность.
+    """
+    length = engine.length
+    start_code = list(start_code)
+    if skip_slot is not None:
+        start_code[skip_slot] = engine.code[skip_slot]
+    order, planned = reset_order(engine.timing, engine.code, engine.slot, start_code,
+                                 skip_slot, park_slot, engine.radix)
+    started = engine.now()
+    if engine.code == start_code:
+        report("[Инфо] Код уже установлен.")
+        if engine.slot == park_slot:
+            report("[Готово] Система в начальном положении.")
+        else:
+            report(f"[Слот] Возврат на {park_slot}: {(park_slot - engine.slot) % length}x[F]")
+            engine.move_to_slot(park_slot)
+            engine.flush()
+            report("[Готово] Система возвращена в начальное положение.")
+        return planned, engine.now() - started
+
+    report(f"[Сброс] {format_code(engine.code)} -> {format_code(start_code)}, "
+           f"порядок слотов: {' -> '.join(map(str, order))}")
+    for i in order:
+        if engine.slot != i:
+            report(f"[Слот] {engine.slot} -> {i}: {(i - engine.slot) % length}x[F]")
+            engine.move_to_slot(i)
+        current_digit = engine.code[i]
+        rotations = engine.rotations_to(i, start_code[i])
+        report(f"[Цифра] Слот {i}: {current_digit} -> {start_code[i]} ({rotations} оборотов)")
+        engine.set_digit(rotations)
+
+    if engine.slot != park_slot:
+        report(f"[Слот] Парковка на {park_slot}: {(park_slot - engine.slot) % length}x[F]")
+        engine.move_to_slot(park_slot)
+
+    engine.flush()
+    report("[Готово] Код сброшен и система в начальном положении.")
+    return planned, engine.now() - started
+
+
+def reset_code(config_path, expected_length=None, report=print, pause=input, engine=None):
+    """Сброс колёс по конфигу ``config_path``; возвращает движок или ``None`` при ошибке.
+
+    ``engine`` — движок, созданный раньше в том же процессе; возвращённый
+    движок можно передать в ``brute_force_execute``. Закрыть его
+    (``engine.close()``) должен вызывающий.
+    """
+    report("[Инициализация] Загрузка конфигурации...")
+    config = load_config(config_path)
+    if not config:
+        report("[Ошибка] Конфигурация не загружена.")
+        pause("Нажмите Enter для выхода...")
+        return None
+
+    length = config["length"]
+    if expected_length is not None and length != expected_length:
+        report(f"[Ошибка] Этот скрипт поддерживает только {expected_length}-значные коды.")
+        pause("Нажмите Enter для выхода...")
+        return None
+
+    start_code = config["start_code"]
+    direction = config.get("direction", "С начала")
+
+    report(f"[Конфиг] Направление: {direction}")
+    report(f"[Конфиг] Целевой код: {format_code(start_code)}")
+    if config.get("fused_reset"):
+        report("[Инфо] В конфиге включен перебор без отдельного сброса: "
+               "этот шаг можно пропустить.")
+
+    # Созданный здесь движок закрывается при отказе; при успехе его забирает вызывающий.
+    owns_engine = engine is None
+    if engine is None:
+        try:
+            backend = create_backend(config.get("backend"))
+        except (OSError, ValueError) as e:
+            report(f"[Ошибка] Бэкенд ввода: {e}")
+            pause("Нажмите Enter для выхода...")
+            return None
+        engine = Engine(length, config["radix"], timing_for_config(config, RESET_TIMING), backend)
+        engine.code = list(config["current_code"])
+        engine.slot = config["slot"]
+    else:
+        engine.timing = timing_for_config(config, RESET_TIMING)
+
+    try:
+        control = Controller(report, hotkeys=hotkeys_for_config(config))
+    except ValueError as e:
+        report(f"[Ошибка] {e}")
+        pause("Нажмите Enter для выхода...")
+        if owns_engine:
+            engine.close()
+        return None
+    control.listen(engine.backend)
+    report(f"[Ожидание] Нажмите {control.key_name(START)} в игре для старта...")
+    started = control.wait_start()
+    control.close()
+    if not started:
+        report("[Стоп] Сброс отменён.")
+        if owns_engine:
+            engine.close()
+        return None
+    engine.resync()
+    report("[Старт] Сброс кода начат.")
+
+    # Коды, которые замок показывает по пути, тоже проверены.
+    tried_file = coverage_path(config_path)
+    tried = load_coverage(tried_file, length, config["radix"])
+    engine.on_show = tried.add
+
+    # Перебор начинается с полного круга слота перебора — там и паркуемся.
+    sweep_slot = default_sweep_slot(config)
+    planned, actual = reset_wheels(engine, start_code, report, sweep_slot, sweep_slot)
+    tried.save(tried_file)
+    # Перебор без отдельного сброса стартует с current_code — он должен
+    # совпадать с колёсами.
+    save_wheel_state(config_path, engine.code, engine.slot)
+
+    report(f"[Тайминг] Сброс: расчётно {format_time(planned)} ({planned:.2f}с), "
+           f"фактически {format_time(actual)} ({actual:.2f}с)")
+    report(f"[Тайминг] {engine.scheduler.lateness.summary()}")
+    report("[Завершено] Готов к следующему этапу.")
+    return engine
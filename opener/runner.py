@@ -0,0 +1,489 @@
+"""Перебор комбинаций: выставляет префиксы и прокручивает последний слот."""
+
+from .backends import create_backend
+from .budget import SAVE_EVERY, TimeBudget, budget_path, budget_table, profile_path_for
+from .combinations import default_sweep_slot, format_code, generate_combinations, run_start
+from .engine import (
+    RUN_TIMING,
+    Engine,
+    format_time,
+    load_config,
+    save_wheel_state,
+    shown_codes,
+    timing_for_config,
+)
+from .control import ABORT, OPENED, PAUSE, SKIP, START, Controller, hotkeys_for_config
+from .coverage import SAVE_EVERY as TRIED_SAVE_EVERY
+from .coverage import coverage_path, load_coverage
+from .detector import create_detector, opening_candidates, record_opened, rotation_model
+from .eta import EtaEstimator
+from .telemetry import Telemetry, telemetry_from_env
+from .journal import (
+    Journal,
+    journal_coverage,
+    journal_path,
+    journal_prior_counts,
+    journal_entries,
+    plan_fingerprint,
+    read_journal,
+    resume_point,
+)
+from .priors import CodePrior, prior_file_counts, resolve_prior_files
+from .timeline import (
+    ReplayInterrupted,
+    compile_timeline,
+    load_or_compile,
+    replay,
+    timeline_path,
+)
+
+
+def run_combinations(engine, combinations, sweep_slot=None, report=print, timeline=None,
+                     on_done=None, telemetry=None, budget=None, control=None, on_skip=None,
+                     detector=None):
+    """Проходит по списку комбинаций, начиная с текущего состояния ``engine``.
+
+    План заранее компилируется в ленту событий (см. ``opener.timeline``),
+    ``timeline`` — уже готовая лента для того же начального состояния.
+    ``on_done(i, code, slot, shown)`` вызывается после каждого завершённого
+    шага; ``shown`` — все коды, которые замок показал за этот шаг. ETA
+    считается по оставшейся части ленты с поправкой на фактический темп
+    (см. ``opener.eta``). События прогресса дублируются в ``telemetry``
+    (см. ``opener.telemetry``). ``budget`` — счётчики ``opener.budget.TimeBudget``
+    для этой ленты, их снимок сохраняется каждые ``SAVE_EVERY`` шагов.
+
+    ``control`` — команды оператора (``opener.control``). По команде
+    ``skip`` текущий шаг бросается, остаток плана перекомпилируется из
+    фактического положения колёс, и вызывается ``on_skip(i, code, slot)``.
+    ``detector`` (``opener.detector``) останавливает перебор, когда замок открылся.
+    При остановке (``ReplayInterrupted``) модель ``engine`` приводится к
+    фактическому состоянию колёс, в ``steps`` исключения записывается число
+    завершённых шагов, в ``timeline`` — исполнявшаяся лента, и исключение
+    передаётся дальше.
+    """
+    if sweep_slot is None:
+        sweep_slot = engine.length - 1
+    if timeline is None:
+        timeline = compile_timeline(combinations, engine.timing, engine.code, engine.slot,
+                                    sweep_slot, engine.radix)
+    total_combinations = len(combinations)
+    state = [list(engine.code), engine.slot]
+    eta = EtaEstimator()
+    if telemetry is None:
+        telemetry = Telemetry(enabled=False)
+    start_time = engine.now()
+    last = [start_time, 0.0]
+    lateness = engine.scheduler.lateness
+    # Номер комбинации, с которой начинается текущая лента (меняется после пропуска).
+    first = 0
+
+    def on_step(k):
+        i = first + k
+        target = list(combinations[i])
+        # Шаг засчитывается в момент последнего события, пауза после него ещё идёт.
+        now = engine.now()
+        planned_at = timeline.times[timeline.step_ends[k] - 1] if timeline.step_ends[k] else 0.0
+        eta.update(planned_at - last[1], now - last[0])
+        last[:] = [now, planned_at]
+        remaining = timeline.duration - planned_at
+        progress_percent = (i + 1) / total_combinations * 100
+        report(f"[{i + 1}/{total_combinations}] ({progress_percent:.1f}%) "
+               f"Код: {format_code(target)} | {eta.describe(remaining)}")
+        if telemetry.enabled:
+            estimate, low, high = eta.remaining(remaining)
+            telemetry.emit("step_end", i=i, total=total_combinations, code=target,
+                           wheels={"code": target, "slot": sweep_slot},
+                           progress=round(progress_percent, 2), eta=round(estimate, 1),
+                           eta_low=round(low, 1), eta_high=round(high, 1),
+                           lateness_ms=round(lateness.last * 1000, 3),
+                           lateness_max_ms=round(lateness.maximum() * 1000, 3))
+            if i + 1 < total_combinations:
+                telemetry.emit("step_start", i=i + 1, code=list(combinations[i + 1]))
+        if on_done is not None:
+            shown = list(shown_codes(state[0], state[1], target, sweep_slot, engine.radix))
+            on_done(i, target, sweep_slot, shown)
+        state[:] = [target, sweep_slot]
+        if budget is not None and (i + 1) % SAVE_EVERY == 0:
+            budget.save(timeline.step_ends[k])
+
+    telemetry.emit("start", total=total_combinations, duration=round(timeline.duration, 1),
+                   wheels={"code": list(engine.code), "slot": engine.slot})
+    if total_combinations:
+        telemetry.emit("step_start", i=0, code=list(combinations[0]))
+    if budget is not None:
+        budget.start()
+    try:
+        while True:
+            try:
+                replay(timeline, engine.backend, engine.scheduler, on_step, control, detector)
+                break
+            except ReplayInterrupted as e:
+                engine.code, engine.slot = timeline.state_after(e.done, engine.timing,
+                                                                on_show=engine.on_show)
+                done = e.done
+                skipped = first + timeline.steps_done(done)
+                if e.command != SKIP:
+                    e.steps = skipped
+                    e.timeline = timeline
+                    raise
+            report(f"[Пропуск] Префикс шага {skipped + 1} пропущен, колёса: "
+                   f"{format_code(engine.code)}, слот {engine.slot}")
+            telemetry.emit("skipped", i=skipped, total=total_combinations,
+                           wheels={"code": list(engine.code), "slot": engine.slot})
+            if on_skip is not None:
+                on_skip(skipped, engine.code, engine.slot)
+            state[:] = [list(engine.code), engine.slot]
+            first = skipped + 1
+            # Остаток плана — с фактического положения колёс; после последнего
+            # шага он пуст, и лента просто завершается.
+            timeline = compile_timeline(combinations[first:], engine.timing, engine.code,
+                                        engine.slot, sweep_slot, engine.radix)
+            if budget is not None:
+                budget.next_timeline(timeline, done)
+            last[:] = [engine.now(), 0.0]
+            engine.scheduler.resync()
+            if first < total_combinations:
+                telemetry.emit("step_start", i=first, code=list(combinations[first]))
+    finally:
+        if budget is not None:
+            budget.stop()
+    engine.code = list(timeline.final_code)
+    engine.slot = timeline.final_slot
+    return engine.now() - start_time
+
+
+def credit_journal(tried, header, entries, sweep_slot):
+    """Отмечает в ``tried`` коды, которые замок показал за шаги журнала ``entries``."""
+    code, slot = list(header["code"]), header["slot"]
+    for entry in entries:
+        if not (entry.get("skipped") or entry.get("stopped") or entry.get("done")):
+            for shown in shown_codes(code, slot, entry["code"], sweep_slot, tried.radix):
+                tried.add(shown)
+        code, slot = entry["code"], entry["slot"]
+
+
+def report_error(report, telemetry, message):
+    report(f"[Ошибка] {message}")
+    telemetry.emit("error", message=message)
+
+
+def confirmed(answer):
+    return (answer or "").strip().lower() in ("д", "да", "y", "yes")
+
+
+def report_opened(config, config_path, engine, detector, interrupted, report=print, pause=input):
+    """Сообщает, какой код открыл замок; однозначный код дописывает в историю.
+
+    Детектор может ошибиться, поэтому код попадает в историю только после
+    подтверждения оператора (ответ «д» на вопрос ``pause``). Файл истории —
+    тот же, из которого читает ``opener.priors``: относительный путь
+    считается от папки конфига ``config_path``. Продолжение перебора
+    строит план по файлам из журнала, так что запись его не сдвигает.
+
+    Возвращает кандидатов — самый вероятный первым (см. ``opener.detector``).
+    """
+    onset, period = rotation_model(config)
+    candidates = opening_candidates(interrupted.timeline, engine.timing, interrupted.done,
+                                    interrupted.anchor, detector.detected_at, detector.latency,
+                                    onset, period)
+    if len(candidates) == 1:
+        report(f"\n[Открыто] Замок открыт кодом {format_code(candidates[0])}.")
+        prior = resolve_prior_files(config, config_path).get("prior") or {}
+        history_file = prior.get("history_file")
+        if history_file and not confirmed(pause("Замок действительно открыт? Записать код "
+                                                "в историю (д/н): ")):
+            report(f"[Инфо] Код не записан в историю. Если замок открыт, добавьте его "
+                   f"строкой в {history_file}.")
+        elif history_file:
+            try:
+                record_opened(candidates[0], history_file)
+                report(f"[Открыто] Код добавлен в историю: {history_file}")
+            except OSError as e:
+                report(f"[Предупреждение] Не удалось записать историю {history_file}: {e}")
+    elif not candidates:
+        report("\n[Открыто] Замок открыт, но код по ленте определить не удалось.")
+    else:
+        report(f"\n[Открыто] Замок открыт. Кандидаты (проверьте по порядку): "
+               f"{', '.join(format_code(code) for code in candidates)}")
+    return candidates
+
+
+def brute_force_execute(config_path, combinations_folder, expected_length=None, resume=False,
+                        report=print, pause=input, telemetry=None, engine=None, profile=False,
+                        control=None):
+    """Перебор по конфигу ``config_path`` с журналом и учётом проверенных кодов.
+
+    ``report`` и ``pause`` заменяют вывод и ожидание Enter, ``telemetry`` —
+    канал событий (по умолчанию из окружения). ``engine`` — уже созданный
+    движок, например после ``reset_code`` в том же процессе: перебор
+    продолжает с его фактического состояния колёс. Раскладка времени по
+    категориям пишется в ``config_N.budget.json`` (см. ``opener.budget``),
+    ``profile`` добавляет профиль ``cProfile``. Старт, пауза, пропуск
+    префикса и остановка — горячими клавишами (см. ``opener.control``);
+    ``control`` — готовый ``Controller``, например с командами из GUI.
+    Возвращает ``True``,
+    если перебор завершён или остановлен штатно.
+    """
+    if telemetry is None:
+        telemetry = telemetry_from_env()
+    report("[Инициализация] Загрузка конфигурации...")
+    config = load_config(config_path)
+    if not config:
+        report_error(report, telemetry, "Конфигурация не загружена.")
+        pause("Нажмите Enter для выхода...")
+        return False
+
+    length = config["length"]
+    if expected_length is not None and length != expected_length:
+        report_error(report, telemetry, f"Поддерживаются только {expected_length}-значные коды.")
+        pause("Нажмите Enter для выхода...")
+        return False
+
+    journal_file = journal_path(config_path)
+    tried_file = coverage_path(config_path)
+    tried = load_coverage(tried_file, length, config["radix"])
+    start_index = 0
+    if resume:
+        header, last = read_journal(journal_file)
+        if header is None:
+            report_error(report, telemetry, f"Журнал перебора не найден: {journal_file}")
+            pause("Нажмите Enter для выхода...")
+            return False
+        if last is not None and last.get("done"):
+            report("[Инфо] Перебор по журналу уже завершен.")
+            pause("Нажмите Enter для выхода...")
+            return True
+        # План строится по тому конфигу, тем проверенным кодам и тем файлам
+        # вероятностей, с которыми перебор начинался.
+        plan_config = dict(header["config"])
+        covered = journal_coverage(header)
+        prior_counts = journal_prior_counts(header)
+        # Файл проверенных кодов сохраняется пачками: шаги после последнего
+        # сохранения восстанавливаются по журналу.
+        credit_journal(tried, header, journal_entries(journal_file),
+                       default_sweep_slot(plan_config))
+        start_index, resume_code, resume_slot = resume_point(header, last)
+        report(f"[Журнал] Продолжение с шага {start_index + 1}, "
+               f"колёса: {format_code(resume_code)}, слот {resume_slot}")
+    else:
+        plan_config = config
+        if engine is not None:
+            # Движок из того же процесса знает, где на самом деле стоят колёса:
+            # план строится от них, как при переборе без отдельного сброса.
+            plan_config = dict(config, current_code=list(engine.code), slot=engine.slot,
+                               fused_reset=True)
+        covered = tried.copy()
+        prior_counts = None
+        if covered:
+            report(f"[Покрытие] Уже проверено в прошлых сессиях: {len(covered)} кодов")
+
+    direction = plan_config.get("direction", "С начала")
+    continue_direction = plan_config.get("continue_direction", "increase")
+    report(f"[Конфиг] Направление: {direction}")
+    if direction == "Продолжить":
+        report(f"[Конфиг] Направление продолжения: {continue_direction}")
+
+    report("[Инициализация] Построение последовательности комбинаций...")
+    sweep_slot = default_sweep_slot(plan_config)
+    resolved_config = resolve_prior_files(plan_config, config_path)
+    if prior_counts is None:
+        prior_counts = prior_file_counts(resolved_config)
+    kind, combinations = generate_combinations(resolved_config, sweep_slot,
+                                               CodePrior.from_config(resolved_config, prior_counts),
+                                               covered)
+    if kind is None:
+        report_error(report, telemetry, "Неверное направление перебора в конфиге.")
+        pause("Нажмите Enter для выхода...")
+        return False
+    if not combinations:
+        report("[Инфо] Все коды диапазона уже проверены в прошлых сессиях.")
+        pause("Нажмите Enter для выхода...")
+        return True
+
+    plan = plan_fingerprint(kind, combinations)
+    if resume and header.get("plan") is None:
+        report("[Предупреждение] В журнале нет отпечатка плана: совпадение плана с журналом "
+               "не проверено.")
+    elif resume and header["plan"] != plan:
+        report_error(report, telemetry, "План перебора не совпадает с журналом: изменились "
+                                        "конфиг или файлы, по которым он строится. Номера шагов "
+                                        "журнала указывают в другой план — запустите перебор "
+                                        "заново, без --resume.")
+        pause("Нажмите Enter для выхода...")
+        return False
+
+    total_combinations = len(combinations)
+    report(f"[Готово] Комбинаций: {total_combinations}.")
+    report(f"[Конфиг] Слот перебора: {sweep_slot}")
+    report("[Важно] Переключитесь в игру!")
+
+    # Бэкенд закрывает тот, кто создал движок: общий движок GUI живёт дольше перебора.
+    owns_engine = engine is None
+    if engine is None:
+        try:
+            backend = create_backend(config.get("backend"))
+        except (OSError, ValueError) as e:
+            report_error(report, telemetry, f"Бэкенд ввода: {e}")
+            pause("Нажмите Enter для выхода...")
+            return False
+        engine = Engine(length, config["radix"], timing_for_config(config, RUN_TIMING), backend)
+    else:
+        engine.timing = timing_for_config(config, RUN_TIMING)
+    try:
+        if resume:
+            engine.code = resume_code
+            engine.slot = resume_slot
+            remaining = combinations[start_index:]
+            timeline = compile_timeline(remaining, engine.timing, engine.code, engine.slot,
+                                        sweep_slot, engine.radix)
+            report(f"[Готово] Лента событий скомпилирована: {len(timeline)} событий, "
+                   f"длительность {format_time(timeline.duration)}.")
+        else:
+            # После сброса колёса стоят на стартовом коде, активен слот перебора; без
+            # отдельного сброса перебор начинается прямо с текущего кода.
+            engine.code, engine.slot = run_start(plan_config, sweep_slot)
+            if config.get("fused_reset"):
+                report("[Конфиг] Без отдельного сброса: старт с текущего кода.")
+            elif plan_config is not config:
+                report(f"[Конфиг] Старт с положения колёс после прошлого шага: "
+                       f"{format_code(engine.code)}, слот {engine.slot}")
+            remaining = combinations
+            timeline, cached = load_or_compile(timeline_path(combinations_folder, kind), combinations,
+                                               engine.timing, engine.code, engine.slot, sweep_slot,
+                                               engine.radix)
+            source = "из кэша" if cached else "скомпилирована"
+            report(f"[Готово] Лента событий {source}: {len(timeline)} событий, "
+                   f"длительность {format_time(timeline.duration)}.")
+
+        try:
+            detector = create_detector(config, engine.backend)
+        except (ValueError, RuntimeError, KeyError) as e:
+            report_error(report, telemetry, f"Детектор открытия: {e}")
+            pause("Нажмите Enter для выхода...")
+            return False
+
+        if control is None:
+            try:
+                hotkeys = hotkeys_for_config(config)
+            except ValueError as e:
+                report_error(report, telemetry, str(e))
+                pause("Нажмите Enter для выхода...")
+                return False
+            control = Controller(report, telemetry, hotkeys)
+            control.listen(engine.backend)
+        detector_key = getattr(detector, "key", None)
+        if detector_key in control.hotkeys.values():
+            control.close()
+            report_error(report, telemetry, f"Клавиша {detector_key} занята и детектором открытия, "
+                                            f"и командой управления.")
+            pause("Нажмите Enter для выхода...")
+            return False
+
+        start_key = control.key_name(START)
+        report(f"[Ожидание] Нажмите {start_key} в игре для старта перебора...")
+        report(f"[Управление] {control.key_name(PAUSE)} — пауза/продолжение, "
+               f"{control.key_name(SKIP)} — пропустить префикс, "
+               f"{control.key_name(ABORT)} — остановить.")
+        if detector_key is not None:
+            report(f"[Управление] {detector_key} — замок открыт (остановить и определить код).")
+        telemetry.emit("waiting", key=start_key)
+        if not control.wait_start():
+            control.close()
+            report("[Стоп] Запуск отменён.")
+            pause("Нажмите Enter для выхода...")
+            return True
+        engine.resync()
+        if detector is not None:
+            detector.start()
+        report("[Старт] Перебор начат.")
+        report(f"[Старт] По плану {EtaEstimator().describe(timeline.duration)}")
+        report(f"[Старт] Предполагаемый код в игре: {format_code(engine.code)}")
+
+        if resume:
+            journal = Journal.reopen(journal_file)
+        else:
+            journal = Journal.create(journal_file, plan_config, engine.code, engine.slot,
+                                     total_combinations, covered, prior_counts, plan)
+
+        def on_done(i, code, slot, shown):
+            journal.record(start_index + i, code, slot)
+            for visited in shown:
+                tried.add(visited)
+            # Шаг уже в журнале; битовая карта пишется пачкой, а не в каждой паузе ленты.
+            if (i + 1) % TRIED_SAVE_EVERY == 0:
+                tried.save(tried_file)
+
+        skipped = []
+
+        def on_skip(i, code, slot):
+            journal.skip(start_index + i, code, slot)
+            skipped.append(start_index + i)
+
+        # При остановке посреди шага показанные до неё коды тоже засчитываются.
+        engine.on_show = tried.add
+
+        budget = TimeBudget(engine, timeline, budget_path(config_path), profile, control)
+
+        def report_budget(events=None):
+            for line in budget_table(budget.save(events)):
+                report(line)
+            report(f"[Бюджет] Записано: {budget.path}")
+            if profile:
+                profile_file = profile_path_for(config_path)
+                budget.dump_profile(profile_file)
+                report(f"[Профиль] Работа Python без ожиданий (сохранено в {profile_file}):")
+                report(budget.profile_text())
+
+        try:
+            total_time = run_combinations(engine, remaining, sweep_slot, report, timeline,
+                                          on_done, telemetry, budget, control, on_skip, detector)
+        except ReplayInterrupted as e:
+            last_done = start_index + e.steps - 1
+            journal.stop(last_done, engine.code, engine.slot)
+            journal.close()
+            save_wheel_state(config_path, engine.code, engine.slot)
+            candidates = None
+            if e.command == OPENED:
+                candidates = report_opened(config, config_path, engine, detector, e, report,
+                                           pause)
+            report(f"\n[Стоп] Перебор остановлен после шага {last_done + 1}/{total_combinations}.")
+            report(f"[Стоп] Колёса: {format_code(engine.code)}, слот {engine.slot} "
+                   f"(записано в журнал и конфиг).")
+            if e.command == OPENED:
+                report("[Стоп] Если срабатывание ложное, продолжите перебор с ключом --resume.")
+            else:
+                report("[Стоп] Для продолжения запустите перебор с ключом --resume.")
+            report_budget(e.done)
+            telemetry.emit("stopped", step=last_done + 1, total=total_combinations,
+                           wheels={"code": list(engine.code), "slot": engine.slot})
+            if candidates is not None:
+                telemetry.emit("opened", candidates=candidates)
+            return True
+        finally:
+            tried.save(tried_file)
+            control.close()
+            if detector is not None:
+                detector.stop()
+
+        journal.finish(total_combinations - 1, engine.code, engine.slot)
+        journal.close()
+        save_wheel_state(config_path, engine.code, engine.slot)
+
+        report(f"\n[Готово] Перебор завершен за {format_time(total_time)} "
+               f"(по плану {format_time(timeline.duration)}).")
+        report(f"[Инфо] Проверено {len(remaining) - len(skipped)} комбинаций.")
+        if skipped:
+            report(f"[Инфо] Пропущено префиксов: {len(skipped)} (шаги "
+                   f"{', '.join(str(i + 1) for i in skipped)}).")
+        report(f"[Инфо] Состояние колёс записано в конфиг: {format_code(engine.code)}, слот {engine.slot}")
+        report(f"[Покрытие] Всего проверено кодов: {len(tried)} из {tried.size}")
+        report(f"[Тайминг] {engine.scheduler.lateness.summary()}")
+        report_budget()
+        telemetry.emit("done", total=total_combinations, elapsed=round(total_time, 1),
+                       wheels={"code": list(engine.code), "slot": engine.slot},
+                       tried=len(tried), size=tried.size)
+        pause("Нажмите Enter для выхода...")
+        return True
+    finally:
+        if owns_engine:
+            engine.close()
@@ -0,0 +1,117 @@
+"""Планировщик событий клавиатуры по абсолютным дедлайнам.
+
+Вместо цепочки ``time.sleep`` движок сдвигает дедлайн на нужную паузу,
+а каждое нажатие или отпускание выполняется ровно в момент дедлайна:
+грубый ``sleep`` до момента чуть раньше и короткое активное ожидание
+остатка (см. ``Backend.sleep_until``). Ошибки отдельных пауз не
+накапливаются, а опоздание каждого события записывается.
+
+Если событие всё же опоздало больше ``tolerance`` (ОС не дала процессор),
+отсчёт переносится на фактический момент события, чтобы не укоротить
+следующее удержание: для замка важна длительность, а не абсолютное время.
+"""
+
+DEFAULT_TOLERANCE = 0.001
+
+# Гистограмма опозданий: корзины по 10 мкс до 50 мс, дальше — одна общая.
+LATENESS_BIN = 0.00001
+LATENESS_BINS = 5000
+
+
+class LatenessStats:
+    """Накопитель опозданий событий в секундах.
+
+    Отдельные значения не хранятся: многочасовой перебор — это миллионы
+    событий. Среднее, максимум и последнее значение точные, процентиль
+    берётся по гистограмме с точностью до ширины корзины ``LATENESS_BIN``
+    (в меньшую сторону).
+    """
+
+    def __init__(self):
+        self.bins = [0] * (LATENESS_BINS + 1)
+        self.total = 0.0
+        self.events = 0
+        self.worst = 0.0
+        self.last = 0.0
+
+    def add(self, lateness):
+        self.bins[min(int(lateness / LATENESS_BIN), LATENESS_BINS)] += 1
+        self.total += lateness
+        self.events += 1
+        self.last = lateness
+        if lateness > self.worst:
+            self.worst = lateness
+
+    def count(self):
+        return self.events
+
+    def mean(self):
+        return self.total / self.events if self.events else 0.0
+
+    def maximum(self):
+        return self.worst
+
+    def percentile(self, fraction):
+        if not self.events:
+            return 0.0
+        rank = min(self.events - 1, int(fraction * self.events))
+        seen = 0
+        for i, count in enumerate(self.bins):
+            seen += count
+            if seen > rank:
+                # Нижняя граница корзины; за пределами гистограммы — худшее опоздание.
+                if i == LATENESS_BINS:
+                    break
+                return i * LATENESS_BIN
+        return self.worst
+
+    def summary(self):
+        return (f"событий {self.count()}, среднее опоздание {self.mean() * 1000:.2f} мс, "
+                f"p99 {self.percentile(0.99) * 1000:.2f} мс, макс {self.maximum() * 1000:.2f} мс")
+
+
+class DeadlineScheduler:
+    def __init__(self, backend, tolerance=DEFAULT_TOLERANCE):
+        self.backend = backend
+        self.tolerance = tolerance
+        self.deadline = None
+        self.lateness = LatenessStats()
+        self.waited = 0.0
+        self.shifted = 0.0
+        self.profiler = None
+
+    def resync(self):
+        """Начинает отсчёт заново от текущего момента (после ожидания оператора и т.п.)."""
+        self.deadline = self.backend.now()
+
+    def delay(self, seconds):
+        if self.deadline is None:
+            self.resync()
+        if seconds > 0:
+            self.deadline += seconds
+
+    def wait(self):
+        """Дожидается текущего дедлайна."""
+        if self.deadline is None:
+            self.resync()
+            return
+        profiler = self.profiler
+        if profiler is not None:
+            profiler.disable()
+        started = self.backend.now()
+        self.backend.sleep_until(self.deadline)
+        self.waited += self.backend.now() - started
+        if profiler is not None:
+            profiler.enable()
+
+    def fire(self, action, *args):
+        """Выполняет ``action`` в момент дедлайна и записывает опоздание."""
+        self.wait()
+        action(*args)
+        fired_at = self.backend.now()
+        lateness = fired_at - self.deadline
+        self.lateness.add(max(lateness, 0.0))
+        if lateness > self.tolerance:
+            self.shifted += lateness
+            self.deadline = fired_at
+        return lateness
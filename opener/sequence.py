@@ -0,0 +1,313 @@
+"""Ленивые последовательности комбинаций с доступом по номеру.
+
+Последовательность не хранит список кодов: она состоит из сегментов,
+каждый из которых умеет вычислить свой ``n``-й код и номер кода по его
+цифрам. Поддерживаются ``len``, ``seq[i]``, срезы, ``index_of(code)`` и
+потоковый обход, поэтому продолжение с любого номера и работа с 6-значными
+кодами не требуют памяти под весь список.
+
+Номер кода ищется только по цифрам префикса — цифра слота перебора не
+учитывается, её проверяет полный круг.
+"""
+
+from bisect import bisect_right
+from itertools import islice
+
+from .engine import RADIX
+
+
+class RangeSegment:
+    """Префиксы с номерами ``start, start + step, …`` (``count`` штук) в числовом порядке.
+
+    Номер префикса — число из цифр всех слотов кроме ``sweep_slot``; в
+    кодах цифра слота перебора равна ``sweep_digit``.
+    """
+
+    def __init__(self, start, count, step, length, sweep_slot, sweep_digit=0, radix=RADIX):
+        self.start = start
+        self.count = count
+        self.step = step
+        self.length = length
+        self.sweep_slot = sweep_slot
+        self.sweep_digit = sweep_digit
+        self.radix = radix
+        self.positions = [i for i in range(length) if i != sweep_slot]
+
+    def __len__(self):
+        return self.count
+
+    def nth(self, n):
+        value = self.start + n * self.step
+        code = [self.sweep_digit] * self.length
+        for i in reversed(self.positions):
+            value, code[i] = divmod(value, self.radix)
+        return code
+
+    def index_of(self, code):
+        value = 0
+        for i in self.positions:
+            value = value * self.radix + code[i]
+        n, rest = divmod(value - self.start, self.step)
+        if rest or not 0 <= n < self.count:
+            return None
+        return n
+
+    def __iter__(self):
+        for n in range(self.count):
+            yield self.nth(n)
+
+    def reversed(self):
+        return RangeSegment(self.start + (self.count - 1) * self.step, self.count, -self.step,
+                            self.length, self.sweep_slot, self.sweep_digit, self.radix)
+
+
+class GraySegment:
+    """Блок модульного кода Грея: все сочетания цифр ``free`` от состояния ``start``.
+
+    Каждый следующий код отличается поворотом одного колеса на +1 (см.
+    ``planner.gray_steps``). После ``n`` шагов счётчика разряд с весом
+    ``radix ** k`` повернулся ``n // radix**k - n // radix**(k+1)`` раз —
+    отсюда прямая формула для ``nth`` и обратная для ``index_of``.
+    """
+
+    def __init__(self, start, free, sweep_slot=None, radix=RADIX):
+        self.start = list(start)
+        self.free = list(free)
+        self.radix = radix
+        self.fixed = [i for i in range(len(start)) if i not in self.free and i != sweep_slot]
+        self.count = radix ** len(self.free)
+
+    def __len__(self):
+        return self.count
+
+    def nth(self, n):
+        code = list(self.start)
+        radix = self.radix
+        width = len(self.free)
+        for j, slot in enumerate(self.free):
+            power = radix ** (width - 1 - j)
+            turns = n // power - n // (power * radix)
+            code[slot] = (code[slot] + turns) % radix
+        return code
+
+    def index_of(self, code):
+        for i in self.fixed:
+            if code[i] != self.start[i]:
+                return None
+        n = 0
+        for slot in self.free:
+            # Цифра счётчика c_k = (поворотов разряда + n // radix**(k+1)) mod radix,
+            # а n // radix**(k+1) — это уже восстановленные старшие цифры.
+            n = n * self.radix + (code[slot] - self.start[slot] + n) % self.radix
+        return n
+
+    def __iter__(self):
+        code = list(self.start)
+        yield list(code)
+        radix = self.radix
+        width = len(self.free)
+        counter = [0] * width
+        for _ in range(self.count - 1):
+            i = width - 1
+            while counter[i] == radix - 1:
+                counter[i] = 0
+                i -= 1
+            counter[i] += 1
+            slot = self.free[i]
+            code[slot] = (code[slot] + 1) % radix
+            yield list(code)
+
+
+class SweptGraySegment:
+    """Отрезок ``[first, first + count)`` блока ``GraySegment`` с кругом слота перебора.
+
+    Так выглядит план после ``planner.credit_visits`` для префиксов, коды
+    которых ещё не показывались: поворот префикса показывает код с
+    текущей цифрой слота перебора, и круг проходит остальные ``radix - 1``
+    позиций — цифра слота после каждого шага уменьшается на единицу. У
+    ``n``-го кода отрезка она равна ``sweep_digit - n``.
+    """
+
+    def __init__(self, block, first, count, sweep_slot, sweep_digit):
+        self.block = block
+        self.first = first
+        self.count = count
+        self.sweep_slot = sweep_slot
+        self.sweep_digit = sweep_digit
+
+    def __len__(self):
+        return self.count
+
+    def nth(self, n):
+        code = self.block.nth(self.first + n)
+        code[self.sweep_slot] = (self.sweep_digit - n) % self.block.radix
+        return code
+
+    def index_of(self, code):
+        n = self.block.index_of(code)
+        if n is None or not 0 <= n - self.first < self.count:
+            return None
+        return n - self.first
+
+    def __iter__(self):
+        radix = self.block.radix
+        codes = islice(iter(self.block), self.first, self.first + self.count)
+        for n, code in enumerate(codes):
+            code[self.sweep_slot] = (self.sweep_digit - n) % radix
+            yield code
+
+
+class ListSegment:
+    """Явный список кодов (например, «голова» плана по вероятностям)."""
+
+    def __init__(self, codes, sweep_slot=None):
+        self.codes = [list(code) for code in codes]
+        self.sweep_slot = sweep_slot
+        self._index = None
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _key(self, code):
+        return tuple(d for i, d in enumerate(code) if i != self.sweep_slot)
+
+    def nth(self, n):
+        return list(self.codes[n])
+
+    def index_of(self, code):
+        if self._index is None:
+            self._index = {}
+            for n, item in enumerate(self.codes):
+                self._index.setdefault(self._key(item), n)
+        return self._index.get(self._key(code))
+
+    def __iter__(self):
+        for code in self.codes:
+            yield list(code)
+
+    def reversed(self):
+        return ListSegment(self.codes[::-1], self.sweep_slot)
+
+
+class CodeSequence:
+    """Последовательность комбинаций из подряд идущих сегментов."""
+
+    def __init__(self, segments=(), sweep_slot=None):
+        self.segments = [segment for segment in segments if len(segment)]
+        self.sweep_slot = sweep_slot
+        self.offsets = []
+        total = 0
+        for segment in self.segments:
+            self.offsets.append(total)
+            total += len(segment)
+        self.total = total
+
+    @classmethod
+    def from_list(cls, codes, sweep_slot=None):
+        return cls([ListSegment(codes, sweep_slot)], sweep_slot)
+
+    def __len__(self):
+        return self.total
+
+    def __bool__(self):
+        return self.total > 0
+
+    def nth(self, n):
+        if n < 0:
+            n += self.total
+        if not 0 <= n < self.total:
+            raise IndexError("номер комбинации вне последовательности")
+        k = bisect_right(self.offsets, n) - 1
+        return self.segments[k].nth(n - self.offsets[k])
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(self.total)
+            if step != 1:
+                return [self.nth(n) for n in range(start, stop, step)]
+            return SequenceSlice(self, start, max(start, stop))
+        return self.nth(item)
+
+    def index_of(self, code):
+        """Номер комбинации с теми же цифрами префикса, что у ``code``."""
+        for offset, segment in zip(self.offsets, self.segments):
+            n = segment.index_of(code)
+            if n is not None:
+                return offset + n
+        raise ValueError(f"код {''.join(map(str, code))} не входит в последовательность")
+
+    def __contains__(self, code):
+        try:
+            self.index_of(code)
+        except ValueError:
+            return False
+        return True
+
+    def __iter__(self):
+        for segment in self.segments:
+            yield from segment
+
+    def reversed(self):
+        """Та же последовательность в обратном порядке (для числовых и явных сегментов)."""
+        return CodeSequence([segment.reversed() for segment in reversed(self.segments)],
+                            self.sweep_slot)
+
+    def iter_from(self, start):
+        """Потоковый обход с номера ``start``."""
+        if start >= self.total:
+            return iter(())
+        k = bisect_right(self.offsets, start) - 1
+        head = islice(iter(self.segments[k]), start - self.offsets[k], None)
+
+        def chained():
+            yield from head
+            for segment in self.segments[k + 1:]:
+                yield from segment
+        return chained()
+
+
+class SequenceSlice:
+    """Непрерывный отрезок ``[start, stop)`` другой последовательности без копирования."""
+
+    def __init__(self, sequence, start, stop):
+        self.sequence = sequence
+        self.start = start
+        self.stop = stop
+        self.sweep_slot = sequence.sweep_slot
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __bool__(self):
+        return self.stop > self.start
+
+    def nth(self, n):
+        if n < 0:
+            n += len(self)
+        if not 0 <= n < len(self):
+            raise IndexError("номер комбинации вне последовательности")
+        return self.sequence.nth(self.start + n)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            start, stop, step = item.indices(len(self))
+            if step != 1:
+                return [self.nth(n) for n in range(start, stop, step)]
+            return SequenceSlice(self.sequence, self.start + start, self.start + max(start, stop))
+        return self.nth(item)
+
+    def index_of(self, code):
+        n = self.sequence.index_of(code)
+        if not self.start <= n < self.stop:
+            raise ValueError(f"код {''.join(map(str, code))} не входит в отрезок")
+        return n - self.start
+
+    def __contains__(self, code):
+        try:
+            self.index_of(code)
+        except ValueError:
+            return False
+        return True
+
+    def __iter__(self):
+        return islice(self.sequence.iter_from(self.start), len(self))
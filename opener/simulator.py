@@ -0,0 +1,257 @@
+"""Симулятор замка с виртуальными часами.
+
+Позволяет прогнать полный сброс и перебор без Windows и без игры:
+все паузы движка мгновенно сдвигают виртуальное время, а модель замка
+по моментам нажатия и отпускания клавиши F решает, что произошло —
+переключение слота или поворот колеса на несколько позиций.
+"""
+
+import random
+
+from .backends import Backend, ScriptedKeyListener
+from .combinations import choose_sweep_slot, format_code, generate_combinations
+from .control import OPENED
+from .detector import SimulatorDetector, opening_candidates
+from .engine import (
+    RADIX,
+    RESET_TIMING,
+    ROTATION_ONSET,
+    ROTATION_PERIOD,
+    RUN_TIMING,
+    SCANCODE_F,
+    VK_BACK,
+    Engine,
+    timing_for_config,
+)
+from .resetter import reset_wheels
+from .runner import run_combinations
+from .timeline import ReplayInterrupted
+
+TAP_MAX = 0.5
+MIN_SETTLE = 0.3
+
+
+class VirtualClock:
+    def __init__(self, start=0.0):
+        self.t = start
+
+    def now(self):
+        return self.t
+
+    def sleep(self, seconds):
+        if seconds > 0:
+            self.t += seconds
+
+    def sleep_until(self, deadline):
+        self.t = max(self.t, deadline)
+
+
+class SimulatedLock:
+    """Модель замка: колёса, активный слот и история показанных кодов.
+
+    Удержание короче ``tap_max`` переключает слот. Удержание не короче
+    ``onset`` поворачивает колесо: первый шаг в момент ``onset``, далее
+    каждые ``period`` секунд. Нажатие раньше, чем через ``min_settle``
+    после окончания поворота, игра не принимает — такие нажатия
+    попадают в ``errors``. ``jitter`` — стандартное отклонение случайной
+    задержки начала поворота, чтобы моделировать нестабильность игры.
+    """
+
+    def __init__(self, length, radix=RADIX, code=None, slot=0, secret=None,
+                 onset=ROTATION_ONSET, period=ROTATION_PERIOD, tap_max=TAP_MAX,
+                 min_settle=MIN_SETTLE, jitter=0.0, seed=None):
+        self.length = length
+        self.radix = radix
+        self.code = list(code) if code is not None else [0] * length
+        self.slot = slot
+        self.secret = list(secret) if secret is not None else None
+        self.onset = onset
+        self.period = period
+        self.tap_max = tap_max
+        self.min_settle = min_settle
+        self.jitter = jitter
+        self.random = random.Random(seed)
+        self.last_rotations = 0
+        self.tested = {self.code_value()}
+        self.opened_at = None
+        self.errors = []
+        self.key_events = 0
+        self._down_at = None
+        self._busy_until = float("-inf")
+
+    def code_value(self):
+        value = 0
+        for digit in self.code:
+            value = value * self.radix + digit
+        return value
+
+    def rotations_for(self, duration, delay=0.0):
+        """Число поворотов колеса при удержании ``duration`` секунд."""
+        onset = self.onset + delay
+        if duration < onset:
+            return 0
+        return int((duration - onset) / self.period + 1e-9) + 1
+
+    def key_down(self, t):
+        self.key_events += 1
+        if self._down_at is not None:
+            return
+        if t < self._busy_until:
+            self.errors.append((t, "нажатие до окончания поворота"))
+            return
+        self._down_at = t
+
+    def key_up(self, t):
+        self.key_events += 1
+        if self._down_at is None:
+            return
+        down_at, self._down_at = self._down_at, None
+        duration = t - down_at
+        self.last_rotations = 0
+        if duration < self.tap_max:
+            self.slot = (self.slot + 1) % self.length
+            return
+        delay = abs(self.random.gauss(0.0, self.jitter)) if self.jitter else 0.0
+        rotations = self.rotations_for(duration, delay)
+        self.last_rotations = rotations
+        if rotations == 0:
+            self.errors.append((t, f"удержание {duration:.2f}с не дало поворота"))
+            return
+        for step in range(rotations):
+            self.code[self.slot] = (self.code[self.slot] + 1) % self.radix
+            self._show(down_at + self.onset + delay + step * self.period)
+        self._busy_until = t + self.min_settle
+
+    def _show(self, t):
+        self.tested.add(self.code_value())
+        if self.opened_at is None and self.secret is not None and self.code == self.secret:
+            self.opened_at = t
+
+
+class SimulatorBackend(Backend):
+    """Бэкенд ввода, который передаёт события клавиши F в ``SimulatedLock``."""
+
+    name = "simulator"
+
+    def __init__(self, lock, clock=None):
+        self.lock = lock
+        self.clock = clock if clock is not None else VirtualClock()
+
+    def key_down(self, sc):
+        if sc == SCANCODE_F:
+            self.lock.key_down(self.clock.now())
+
+    def key_up(self, sc):
+        if sc == SCANCODE_F:
+            self.lock.key_up(self.clock.now())
+
+    def is_key_down(self, vk):
+        # Оператор «нажимает» Backspace сразу.
+        return True
+
+    def listen_keys(self, vks, on_release):
+        return ScriptedKeyListener([vk for vk in vks if vk == VK_BACK], on_release)
+
+    def now(self):
+        return self.clock.now()
+
+    def sleep(self, seconds):
+        self.clock.sleep(seconds)
+
+    def sleep_until(self, deadline, spin=0.0):
+        self.clock.sleep_until(deadline)
+
+
+def simulated_engine(length, radix=RADIX, timing=RUN_TIMING, lock=None, clock=None):
+    clock = clock if clock is not None else VirtualClock()
+    lock = lock if lock is not None else SimulatedLock(length, radix)
+    engine = Engine(length, radix, timing, backend=SimulatorBackend(lock, clock))
+    engine.code = list(lock.code)
+    engine.slot = lock.slot
+    return engine, lock, clock
+
+
+class SimulationResult:
+    def __init__(self, reset_time, run_time, lock, engine, combinations, candidates=None):
+        self.reset_time = reset_time
+        self.run_time = run_time
+        self.total_time = reset_time + run_time
+        self.lock = lock
+        self.engine = engine
+        self.combinations = combinations
+        # Коды, которые детектор определил по моменту открытия (simulate_session(detect=True)).
+        self.candidates = candidates
+        self.model_matches = engine.code == lock.code and engine.slot == lock.slot
+
+    def coverage(self):
+        return len(self.lock.tested) / self.lock.radix ** self.lock.length
+
+    def summary(self):
+        lines = [
+            f"[Симуляция] Сброс: {self.reset_time:.1f}с, перебор: {self.run_time:.1f}с, "
+            f"всего: {self.total_time:.1f}с",
+            f"[Симуляция] Покрытие кодов: {self.coverage() * 100:.1f}%, "
+            f"ошибок ввода: {len(self.lock.errors)}",
+            f"[Симуляция] Замок: {format_code(self.lock.code)} слот {self.lock.slot}, "
+            f"модель движка: {format_code(self.engine.code)} слот {self.engine.slot}",
+        ]
+        if self.lock.opened_at is not None:
+            lines.append(f"[Симуляция] Замок открыт на {self.lock.opened_at:.1f}с")
+        if self.candidates is not None:
+            codes = ", ".join(format_code(code) for code in self.candidates) or "нет"
+            lines.append(f"[Симуляция] Детектор остановил перебор, кандидаты: {codes}")
+        return "\n".join(lines)
+
+
+def simulate_session(config, combinations=None, secret=None, run_timing=None,
+                     reset_timing=None, detect=False, **lock_options):
+    """Прогоняет сброс (если он не совмещён с перебором) и перебор на виртуальных часах.
+
+    С ``detect=True`` перебор останавливается, как только замок открылся,
+    а код определяется по моменту открытия (см. ``opener.detector``).
+    """
+    run_timing = run_timing or timing_for_config(config, RUN_TIMING)
+    reset_timing = reset_timing or timing_for_config(config, RESET_TIMING)
+    length = config["length"]
+    radix = config.get("radix", RADIX)
+    sweep_slot = config.get("sweep_slot")
+    if combinations is None:
+        if sweep_slot is None:
+            sweep_slot, _, combinations, _ = choose_sweep_slot(config, run_timing, reset_timing)
+        else:
+            _, combinations = generate_combinations(config, sweep_slot)
+
+    lock = SimulatedLock(length, radix, code=config["current_code"], slot=config["slot"],
+                         secret=secret, **lock_options)
+    engine, lock, clock = simulated_engine(length, radix, reset_timing, lock=lock)
+    if not config.get("fused_reset"):
+        reset_wheels(engine, config["start_code"], report=lambda message: None,
+                     skip_slot=sweep_slot, park_slot=sweep_slot)
+    reset_time = clock.now()
+
+    engine.timing = run_timing
+    # Если замок открылся ещё при сбросе, останавливать перебор незачем.
+    detector = SimulatorDetector(lock) if detect and lock.opened_at is None else None
+    candidates = None
+    try:
+        run_combinations(engine, combinations, sweep_slot, report=lambda message: None,
+                         detector=detector)
+    except ReplayInterrupted as e:
+        if e.command != OPENED:
+            raise
+        candidates = opening_candidates(e.timeline, run_timing, e.done, e.anchor,
+                                        detector.detected_at, detector.latency,
+                                        lock.onset, lock.period)
+    return SimulationResult(reset_time, clock.now() - reset_time, lock, engine, combinations,
+                            candidates)
+
+
+def check_timing(timing, **lock_options):
+    """Возвращает список удержаний, которые модель замка толкует иначе, чем движок."""
+    lock = SimulatedLock(2, timing.radix, **lock_options)
+    mismatches = []
+    for rotations in range(1, timing.radix + 1):
+        observed = lock.rotations_for(timing.hold(rotations))
+        if observed != rotations:
+            mismatches.append((rotations, timing.hold(rotations), observed))
+    return mismatches
@@ -0,0 +1,62 @@
+"""Машиночитаемый канал прогресса для GUI.
+
+Текстовый лог идёт в stdout для человека, а события прогресса — по
+одной JSON-строке в stderr, сразу со сбросом буфера:
+``{"event": "step_end", "t": ..., "i": 12, "total": 1000, ...}``.
+Канал включается переменной окружения ``OPENER_TELEMETRY=1`` (её ставит
+GUI), поэтому при запуске из консоли лишних строк нет.
+
+События перебора: ``waiting`` (ждём клавишу старта), ``start``,
+``step_start``, ``step_end``, ``paused``, ``resumed``, ``skipped``,
+``stopped``, ``opened`` (замок открыт, ``candidates`` — возможные коды,
+идёт после ``stopped``), ``done``; генерации:
+``progress``, ``generated``; общее — ``error``.
+"""
+
+import json
+import os
+import sys
+import time
+
+TELEMETRY_ENV = "OPENER_TELEMETRY"
+
+
+class Telemetry:
+    """Канал событий: JSON-строки в ``stream`` (по умолчанию stderr) или
+    словари в ``sink`` — так GUI получает события без отдельного процесса."""
+
+    def __init__(self, stream=None, enabled=True, sink=None):
+        self.stream = stream
+        self.enabled = enabled
+        self.sink = sink
+
+    def emit(self, event, **fields):
+        if not self.enabled:
+            return
+        entry = {"event": event, "t": round(time.time(), 3)}
+        entry.update(fields)
+        if self.sink is not None:
+            self.sink(entry)
+            return
+        stream = self.stream if self.stream is not None else sys.stderr
+        stream.write(json.dumps(entry, ensure_ascii=False, separators=(',', ':')) + "\n")
+        stream.flush()
+
+
+def telemetry_from_env():
+    """Канал, включённый, если задана переменная ``OPENER_TELEMETRY``."""
+    return Telemetry(enabled=os.environ.get(TELEMETRY_ENV, "") not in ("", "0"))
+
+
+def parse_event(line):
+    """Событие из строки канала или ``None``, если это не JSON-событие (например, traceback)."""
+    line = line.strip()
+    if not line.startswith("{"):
+        return None
+    try:
+        entry = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(entry, dict) or "event" not in entry:
+        return None
+    return entry
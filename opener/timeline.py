@@ -0,0 +1,304 @@
+"""Компиляция плана перебора в плоскую ленту событий клавиатуры.
+
+План (список комбинаций) вместе с таймингами и начальным состоянием колёс
+один раз прогоняется через движок на виртуальных часах. Получается лента
+событий ``(время, скан-код, нажата)`` и метки окончания каждого шага.
+Исполнитель ``replay`` только воспроизводит ленту по дедлайнам — вся
+логика планирования остаётся вне цикла, критичного по времени, а точная
+длительность перебора известна до старта.
+
+Скомпилированную ленту можно сохранить рядом с файлами комбинаций и
+использовать повторно, пока не изменились план, тайминги и начальное
+состояние (см. ``load_or_compile``).
+"""
+
+import hashlib
+import json
+import os
+from array import array
+from bisect import bisect_right
+
+from .backends import RecordingBackend
+from .combinations import CODES_SUBFOLDER
+from .control import OPENED
+from .engine import RADIX, SCANCODE_F, Engine
+
+TIMELINE_FILE = "timeline_{kind}.json"
+
+
+class ReplayInterrupted(Exception):
+    """Воспроизведение остановлено; ``done`` — число выполненных событий.
+
+    Остановка происходит только при отпущенной клавише, поэтому состояние
+    колёс после ``done`` событий известно точно (``Timeline.state_after``).
+    ``command`` — команда оператора (``opener.control``), вызвавшая
+    остановку, или ``None`` для Ctrl+C. ``anchor`` — ``(время по ленте,
+    время по часам)`` последнего выполненного события.
+    """
+
+    def __init__(self, done, command=None, anchor=None):
+        super().__init__(done)
+        self.done = done
+        self.command = command
+        self.anchor = anchor
+
+
+class Timeline:
+    """Лента событий и метки шагов.
+
+    ``times``, ``scancodes`` и ``downs`` — параллельные массивы событий;
+    время отсчитывается от начала перебора. ``step_ends[k]`` — число
+    событий, выполненных к концу шага ``k``, ``step_times[k]`` — момент
+    окончания шага вместе с паузой после него.
+    """
+
+    def __init__(self, times, scancodes, downs, step_ends, step_times, duration,
+                 start_code, start_slot, final_code, final_slot, key=None):
+        self.times = array('d', times)
+        self.scancodes = array('H', scancodes)
+        self.downs = array('b', downs)
+        self.step_ends = list(step_ends)
+        self.step_times = list(step_times)
+        self.duration = duration
+        self.start_code = list(start_code)
+        self.start_slot = start_slot
+        self.final_code = list(final_code)
+        self.final_slot = final_slot
+        self.key = key
+
+    def __len__(self):
+        return len(self.times)
+
+    def steps_done(self, events):
+        """Число шагов, полностью выполненных за первые ``events`` событий."""
+        return bisect_right(self.step_ends, events)
+
+    def presses(self, events, timing, scancode=SCANCODE_F):
+        """Завершённые нажатия F среди первых ``events`` событий.
+
+        Выдаёт ``(нажата, отпущена, поворотов)``; короткое нажатие
+        (переключение слота) — с нулём поворотов, удержание — с числом
+        поворотов из таблицы ``timing.digit_hold`` (ближайшее значение).
+        """
+        holds = sorted((hold, rotations) for rotations, hold in timing.digit_hold.items())
+        tap_limit = holds[0][0] / 2
+        down_at = None
+        for i in range(events):
+            if self.scancodes[i] != scancode:
+                continue
+            if self.downs[i]:
+                down_at = self.times[i]
+                continue
+            if down_at is None:
+                continue
+            duration = self.times[i] - down_at
+            if duration < tap_limit:
+                yield down_at, self.times[i], 0
+            else:
+                _, rotations = min(holds, key=lambda item: abs(item[0] - duration))
+                yield down_at, self.times[i], rotations or timing.radix
+            down_at = None
+
+    def state_after(self, events, timing, scancode=SCANCODE_F, on_show=None):
+        """Состояние колёс ``(code, slot)`` после первых ``events`` событий.
+
+        Короткое нажатие переключает слот, удержание поворачивает колесо на
+        число позиций из таблицы ``timing.digit_hold`` (ближайшее значение).
+        ``on_show`` получает каждый код, показанный по пути.
+        """
+        code = list(self.start_code)
+        slot = self.start_slot
+        length = len(code)
+        for _, _, rotations in self.presses(events, timing, scancode):
+            if not rotations:
+                slot = (slot + 1) % length
+                continue
+            for _ in range(rotations):
+                code[slot] = (code[slot] + 1) % timing.radix
+                if on_show is not None:
+                    on_show(tuple(code))
+        return code, slot
+
+    def show_times(self, events, timing, onset, period, scancode=SCANCODE_F):
+        """Коды, показанные за первые ``events`` событий, с моментами показа.
+
+        Возвращает список ``(время, код)``: ``k``-й поворот удержания
+        происходит через ``onset + (k - 1) * period`` после нажатия.
+        """
+        code = list(self.start_code)
+        slot = self.start_slot
+        length = len(code)
+        shows = []
+        for down_at, _, rotations in self.presses(events, timing, scancode):
+            if not rotations:
+                slot = (slot + 1) % length
+                continue
+            for k in range(rotations):
+                code[slot] = (code[slot] + 1) % timing.radix
+                shows.append((down_at + onset + k * period, tuple(code)))
+        return shows
+
+    def to_dict(self):
+        return {
+            "key": self.key,
+            "duration": self.duration,
+            "start_code": self.start_code,
+            "start_slot": self.start_slot,
+            "final_code": self.final_code,
+            "final_slot": self.final_slot,
+            "step_ends": self.step_ends,
+            "step_times": self.step_times,
+            "times": list(self.times),
+            "scancodes": list(self.scancodes),
+            "downs": list(self.downs),
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data["times"], data["scancodes"], data["downs"], data["step_ends"],
+                   data["step_times"], data["duration"], data["start_code"],
+                   data["start_slot"], data["final_code"], data["final_slot"], data.get("key"))
+
+
+def timeline_key(combinations, timing, start_code, start_slot, sweep_slot):
+    """Отпечаток всего, от чего зависит лента: план, тайминги, начальное состояние."""
+    digest = hashlib.sha1()
+    for code in combinations:
+        digest.update(bytes(code))
+    payload = json.dumps({
+        "timing": [timing.settle_time, timing.slot_switch_delay, timing.key_press_time,
+                   timing.key_release_time, sorted(timing.digit_hold.items()), timing.radix],
+        "start_code": list(start_code),
+        "start_slot": start_slot,
+        "sweep_slot": sweep_slot,
+    }, sort_keys=True)
+    digest.update(payload.encode('utf-8'))
+    return digest.hexdigest()
+
+
+def compile_timeline(combinations, timing, start_code, start_slot=0, sweep_slot=None,
+                     radix=RADIX):
+    """Прогоняет ``combinations`` через движок на виртуальных часах и собирает ленту."""
+    length = len(start_code)
+    if sweep_slot is None:
+        sweep_slot = length - 1
+    recorder = RecordingBackend()
+    engine = Engine(length, radix, timing, recorder)
+    engine.code = list(start_code)
+    engine.slot = start_slot
+    step_ends = []
+    step_times = []
+    for i, target in enumerate(combinations):
+        engine.set_code_sequential(target, sweep_slot)
+        if i < len(combinations) - 1:
+            engine.sleep(timing.settle_time)
+        engine.flush()
+        step_ends.append(len(recorder.events))
+        step_times.append(recorder.now())
+
+    times = [t for t, _, _ in recorder.events]
+    scancodes = [sc for _, sc, _ in recorder.events]
+    downs = [1 if down else 0 for _, _, down in recorder.events]
+    key = timeline_key(combinations, timing, start_code, start_slot, sweep_slot)
+    return Timeline(times, scancodes, downs, step_ends, step_times, recorder.now(),
+                    start_code, start_slot, engine.code, engine.slot, key)
+
+
+def timeline_path(folder, kind):
+    return os.path.join(folder, CODES_SUBFOLDER, TIMELINE_FILE.format(kind=kind))
+
+
+def save_timeline(timeline, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(timeline.to_dict(), f)
+
+
+def load_timeline(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return Timeline.from_dict(json.load(f))
+
+
+def load_or_compile(path, combinations, timing, start_code, start_slot=0, sweep_slot=None,
+                    radix=RADIX):
+    """Берёт ленту из кэша ``path``, если её отпечаток совпадает, иначе компилирует заново.
+
+    Возвращает ``(timeline, cached)``.
+    """
+    key = timeline_key(combinations, timing, start_code, start_slot,
+                       len(start_code) - 1 if sweep_slot is None else sweep_slot)
+    if os.path.exists(path):
+        try:
+            timeline = load_timeline(path)
+            if timeline.key == key:
+                return timeline, True
+        except (OSError, ValueError, KeyError):
+            pass
+    timeline = compile_timeline(combinations, timing, start_code, start_slot, sweep_slot, radix)
+    try:
+        save_timeline(timeline, path)
+    except OSError as e:
+        print(f"[Предупреждение] Не удалось сохранить ленту событий {path}: {e}")
+    return timeline, False
+
+
+def replay(timeline, backend, scheduler, on_step=None, control=None, detector=None):
+    """Воспроизводит ленту через ``backend`` по дедлайнам ``scheduler``.
+
+    ``on_step(k)`` вызывается сразу после последнего события шага ``k``,
+    то есть в паузе после отпускания клавиши. ``KeyboardInterrupt`` во
+    время удержания откладывается до запланированного отпускания, после
+    чего выбрасывается ``ReplayInterrupted``.
+
+    Команды ``control`` (``opener.control.Controller``) проверяются перед
+    каждым нажатием, когда пауза перед ним уже выдержана: пауза оператора
+    ничего не добавляет к плану, а прерывание (``skip``, ``abort``)
+    выбрасывает ``ReplayInterrupted`` с этой командой. Там же проверяется
+    ``detector`` (``opener.detector``): после обнаружения открытия
+    выбрасывается ``ReplayInterrupted`` с командой ``opened``.
+    """
+    times = timeline.times
+    scancodes = timeline.scancodes
+    downs = timeline.downs
+    step_ends = timeline.step_ends
+    key_down = backend.key_down
+    key_up = backend.key_up
+    fire = scheduler.fire
+    delay = scheduler.delay
+    commands = control.commands if control is not None else None
+
+    step = 0
+    done = 0
+    fired_at = scheduler.deadline
+    try:
+        for i in range(len(times)):
+            delay(times[i] - (times[i - 1] if i else 0.0))
+            if downs[i] and (commands or detector is not None):
+                scheduler.wait()
+                if detector is not None and detector.detected_at is not None:
+                    raise ReplayInterrupted(done, OPENED,
+                                            (times[done - 1] if done else 0.0, fired_at))
+                if commands:
+                    command = control.checkpoint()
+                    if command is not None:
+                        raise ReplayInterrupted(done, command)
+                    scheduler.resync()
+            fire(key_down if downs[i] else key_up, scancodes[i])
+            done = i + 1
+            fired_at = scheduler.deadline
+            if on_step is not None:
+                while step < len(step_ends) and step_ends[step] == done:
+                    on_step(step)
+                    step += 1
+        delay(timeline.duration - (times[-1] if len(times) else 0.0))
+        scheduler.wait()
+        if detector is not None and detector.detected_at is not None:
+            # Замок открылся на последнем шаге — код определяется так же.
+            raise ReplayInterrupted(done, OPENED, (times[done - 1] if done else 0.0, fired_at))
+    except KeyboardInterrupt:
+        if done and downs[done - 1]:
+            scheduler.deadline = fired_at
+            delay(times[done] - times[done - 1])
+            fire(key_up, scancodes[done])
+            done += 1
+        raise ReplayInterrupted(done) from None
@@ -1,15 +1,114 @@
 import sys
 import os
 import json
-import subprocess
+import codecs
+import threading
+import traceback
 from PyQt5.QtWidgets import (
     QApplication, QWidget, QTabWidget, QVBoxLayout, QHBoxLayout,
     QPushButton, QLabel, QLineEdit, QMessageBox, QRadioButton,
-    QButtonGroup, QProgressBar, QTextEdit
+    QButtonGroup, QProgressBar, QPlainTextEdit, QCheckBox, QFileDialog
 )
-from PyQt5.QtCore import Qt, QProcess
+from PyQt5.QtCore import Qt, QProcess, QProcessEnvironment, QThread, QTimer, pyqtSignal
+from opener.combinations import run_generate
+from opener.control import DEFAULT_HOTKEYS, START, hotkeys_for_config
+from opener.engine import format_time, load_config
+from opener.resetter import reset_code
+from opener.runner import brute_force_execute
+from opener.telemetry import TELEMETRY_ENV, Telemetry, parse_event
 os.system("chcp 65001 >nul")
 
+LOG_MAX_LINES = 5000
+LOG_FLUSH_INTERVAL_MS = 200
+
+CODE_LENGTHS = (3, 4, 5, 6)
+PROJECT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Скрипты шагов в папках "N-digit code". Для длин без своих скриптов шаг
+# запускается через CLI: py -m opener <команда> --config config_N.json.
+LENGTH_SCRIPTS = {
+    3: {"generate": "generate_3digit_combinations.py", "reset": "3-digit_code_resetter.py",
+        "run": "3-digit_brute_force_runner.py"},
+    4: {"generate": "generate_combinations.py", "reset": "4-digit code_resetter.py",
+        "run": "brute_force_runner.py"},
+}
+
+
+class LogView(QPlainTextEdit):
+    """Лог с ограничением числа строк: новые строки копятся и выводятся пачкой по таймеру.
+
+    В окне остаются последние ``max_lines`` строк, поэтому многочасовой
+    перебор не раздувает память и перерисовку. Полный лог можно писать в
+    файл (``set_log_file``).
+    """
+
+    def __init__(self, max_lines=LOG_MAX_LINES, flush_interval=LOG_FLUSH_INTERVAL_MS, parent=None):
+        super().__init__(parent)
+        self.setReadOnly(True)
+        self.setMaximumBlockCount(max_lines)
+        self.pending = []
+        self.log_file = None
+        self.timer = QTimer(self)
+        self.timer.setInterval(flush_interval)
+        self.timer.timeout.connect(self.flush)
+        self.timer.start()
+
+    def append(self, text):
+        lines = text.split("\n")
+        self.pending.extend(lines)
+        if self.log_file is not None:
+            self.log_file.write("\n".join(lines) + "\n")
+
+    def flush(self):
+        if not self.pending:
+            return
+        self.appendPlainText("\n".join(self.pending))
+        self.pending = []
+        if self.log_file is not None:
+            self.log_file.flush()
+
+    def set_log_file(self, path):
+        """Пишет в ``path`` строки, оставшиеся в окне, и все последующие."""
+        self.close_log_file()
+        self.flush()
+        self.log_file = open(path, 'a', encoding='utf-8')
+        self.log_file.write(self.toPlainText() + "\n")
+        self.log_file.flush()
+
+    def close_log_file(self):
+        if self.log_file is not None:
+            self.log_file.close()
+            self.log_file = None
+
+
+class EngineWorker(QThread):
+    """Выполняет шаг (генерация, сброс, перебор) в потоке внутри процесса GUI.
+
+    ``task(report, telemetry)`` получает функцию вывода строк и канал
+    событий; и то и другое приходит в GUI сигналами ``line`` и ``event``.
+    По окончании ``done`` передаёт код завершения, а результат задачи
+    остаётся в ``result``.
+    """
+
+    line = pyqtSignal(str)
+    event = pyqtSignal(dict)
+    done = pyqtSignal(int)
+
+    def __init__(self, task, parent=None):
+        super().__init__(parent)
+        self.task = task
+        self.result = None
+
+    def run(self):
+        try:
+            self.result = self.task(self.line.emit, Telemetry(sink=self.event.emit))
+        except Exception:
+            self.line.emit(traceback.format_exc())
+            self.done.emit(1)
+            return
+        self.done.emit(0 if self.result else 1)
+
+
 class CodeConfigurator(QWidget):
     def __init__(self):
         super().__init__()
@@ -21,6 +120,15 @@ class CodeConfigurator(QWidget):
         self.config_filename = ""
         self.scripts_base_dir = ""
         self.process = None
+        self.worker = None
+        self.engine = None
+        self.stdout_decoder = None
+        self.stdout_buffer = ""
+        self.telemetry_decoder = None
+        self.telemetry_buffer = ""
+        self.generate_cancelled = False
+        self.generate_cancel = threading.Event()
+        self.last_error = ""
 
         self.init_ui()
 
@@ -50,14 +158,10 @@ class CodeConfigurator(QWidget):
         title.setAlignment(Qt.AlignCenter)
         layout.addWidget(title)
 
-        btn3 = QPushButton("3-значный код")
-        btn4 = QPushButton("4-значный код")
-
-        btn3.clicked.connect(lambda: self.switch_to_code_tab(3))
-        btn4.clicked.connect(lambda: self.switch_to_code_tab(4))
-
-        layout.addWidget(btn3)
-        layout.addWidget(btn4)
+        for length in CODE_LENGTHS:
+            btn = QPushButton(f"{length}-значный код")
+            btn.clicked.connect(lambda checked, length=length: self.switch_to_code_tab(length))
+            layout.addWidget(btn)
         tab.setLayout(layout)
         return tab
 
@@ -132,8 +236,8 @@ class CodeConfigurator(QWidget):
         self.end_radio = QRadioButton("С конца (все девятки)")
         self.end_radio.setToolTip(
             f"Начать перебор с кода, состоящего из всех девяток (например, {'9' * self.length}).\n"
-            "Из-за специфики механизма ввода, этот режим может занимать на ~55% больше времени,\n"
-            "так как для установки цифры 9 требуется максимальное время удержания клавиши."
+            "Старшая цифра перебирается по убыванию, остальные — в порядке с минимумом\n"
+            "поворотов колёс, поэтому режим занимает почти столько же времени, сколько 'С начала'."
         )
         self.position_group.addButton(self.end_radio, 1)
         layout.addWidget(self.end_radio)
@@ -165,8 +269,8 @@ class CodeConfigurator(QWidget):
         )
         self.decrease_radio = QRadioButton("Отнять")
         self.decrease_radio.setToolTip(
-            "Из-за специфики механизма ввода, этот режим может занимать на ~55% больше времени.\n"
-            "Перебирать коды в порядке убывания, начиная с введенного кода.\n"
+            "Перебирать коды в порядке убывания старшей цифры, начиная с введенного кода.\n"
+            "Внутри одной старшей цифры порядок выбирается так, чтобы колёса крутились меньше.\n"
             f"Например: {'1' * (self.length - 1)}0 -> {'0' * (self.length - 1)}9 -> ..."
         )
         self.increase_radio.setEnabled(False)
@@ -196,6 +300,23 @@ class CodeConfigurator(QWidget):
 
         layout.addLayout(custom_group)
 
+        self.prior_checkbox = QCheckBox("Сначала вероятные коды")
+        self.prior_checkbox.setToolTip(
+            "Сначала проверять коды, которые чаще выбирают люди: повторы, последовательности,\n"
+            "даты, а также коды из файлов common_codes.txt (популярные) и opened_codes.txt\n"
+            "(ранее открытые) в папке скриптов. Уменьшает ожидаемое время до открытия."
+        )
+        layout.addWidget(self.prior_checkbox)
+
+        self.fused_checkbox = QCheckBox("Без отдельного сброса")
+        self.fused_checkbox.setToolTip(
+            "Перебор начинается прямо с текущего кода: отдельный сброс на стартовый код,\n"
+            "его ожидание клавиши старта и пауза между скриптами не нужны. С какого кода войти\n"
+            "в перебор, планировщик выбирает сам."
+        )
+        self.fused_checkbox.setChecked(True)
+        layout.addWidget(self.fused_checkbox)
+
         nav_layout = QHBoxLayout()
         back_btn = QPushButton("Назад")
         next_btn = QPushButton("Далее")
@@ -238,10 +359,11 @@ class CodeConfigurator(QWidget):
         info_label = QLabel(
             "Скрипты будут запущены в следующем порядке:\n"
             "1. Генерация комбинаций\n"
-            "2. Сброс кода\n"
+            "2. Сброс кода (не нужен в режиме без отдельного сброса)\n"
             "3. Перебор комбинаций\n"
             "ВАЖНО: Для запуска скриптов 'Сброс' и 'Перебор'\n"
-            "переключитесь в игру и нажмите Backspace!"
+            f"переключитесь в игру и нажмите {DEFAULT_HOTKEYS[START]}\n"
+            "(или клавишу старта из раздела \"hotkeys\" конфига)!"
         )
         info_label.setWordWrap(True)
         layout.addWidget(info_label)
@@ -249,26 +371,54 @@ class CodeConfigurator(QWidget):
         self.generate_btn = QPushButton("1. Генерировать комбинации")
         self.reset_btn = QPushButton("2. Сбросить код")
         self.brute_force_btn = QPushButton("3. Начать перебор")
+        self.resume_btn = QPushButton("Продолжить прерванный перебор")
+        self.resume_btn.setToolTip(
+            "Продолжает перебор по журналу с последнего завершенного шага.\n"
+            "Сброс и ввод кода не нужны: состояние колес записано в журнале."
+        )
+
+        self.cancel_generate_btn = QPushButton("Отменить генерацию")
+        self.cancel_generate_btn.setEnabled(False)
 
         self.generate_btn.clicked.connect(self.run_generate_script)
+        self.cancel_generate_btn.clicked.connect(self.cancel_generate_script)
         self.reset_btn.clicked.connect(self.run_reset_script)
-        self.brute_force_btn.clicked.connect(self.run_brute_force_script)
+        self.brute_force_btn.clicked.connect(lambda: self.run_brute_force_script())
+        self.resume_btn.clicked.connect(lambda: self.run_brute_force_script(resume=True))
 
         self.reset_btn.setEnabled(False)
         self.brute_force_btn.setEnabled(False)
 
         layout.addWidget(self.generate_btn)
+        layout.addWidget(self.cancel_generate_btn)
         layout.addWidget(self.reset_btn)
         layout.addWidget(self.brute_force_btn)
+        layout.addWidget(self.resume_btn)
+
+        self.in_process_checkbox = QCheckBox("Выполнять внутри GUI")
+        self.in_process_checkbox.setToolTip(
+            "Генерация, сброс и перебор выполняются в фоновом потоке этого окна, а не\n"
+            "отдельными скриптами: перебор продолжает с того состояния колёс, где их\n"
+            "оставил сброс. Без флажка каждый шаг запускается отдельным процессом."
+        )
+        layout.addWidget(self.in_process_checkbox)
 
         self.progress_bar = QProgressBar()
-        self.log_output = QTextEdit()
-        self.log_output.setReadOnly(True)
+        self.status_label = QLabel("")
+        self.log_output = LogView()
+        self.save_log_btn = QPushButton("Сохранять полный лог в файл...")
+        self.save_log_btn.setToolTip(
+            f"В окне остаются последние {LOG_MAX_LINES} строк. Выбранный файл получит\n"
+            "текущие строки окна и все последующие."
+        )
+        self.save_log_btn.clicked.connect(self.choose_log_file)
 
         layout.addWidget(QLabel("Прогресс:"))
         layout.addWidget(self.progress_bar)
+        layout.addWidget(self.status_label)
         layout.addWidget(QLabel("Лог:"))
         layout.addWidget(self.log_output)
+        layout.addWidget(self.save_log_btn)
 
         nav_layout = QHBoxLayout()
         back_btn = QPushButton("Назад")
@@ -282,6 +432,24 @@ class CodeConfigurator(QWidget):
         tab.setLayout(layout)
         return tab
 
+    def choose_log_file(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Полный лог", "opener.log",
+                                              "Лог (*.log *.txt);;Все файлы (*)")
+        if not path:
+            return
+        try:
+            self.log_output.set_log_file(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Ошибка", f"Не удалось открыть файл лога:\n{str(e)}")
+            return
+        self.save_log_btn.setText(f"Полный лог: {os.path.basename(path)}")
+
+    def closeEvent(self, event):
+        self.release_engine()
+        self.log_output.flush()
+        self.log_output.close_log_file()
+        super().closeEvent(event)
+
     def toggle_custom_code(self, checked):
         self.custom_code_input.setEnabled(checked)
         self.increase_radio.setEnabled(checked)
@@ -350,6 +518,16 @@ class CodeConfigurator(QWidget):
                     "increase" if self.direction_group.checkedId() == 0 else "decrease"
                 )
 
+            if self.prior_checkbox.isChecked():
+                config["prior"] = {
+                    "patterns": True,
+                    "frequency_file": "common_codes.txt",
+                    "history_file": "opened_codes.txt",
+                }
+
+            if self.fused_checkbox.isChecked():
+                config["fused_reset"] = True
+
             folder = f"{self.length}-digit code"
             os.makedirs(folder, exist_ok=True)
             self.config_filename = os.path.join(folder, f"config_{self.length}.json")
@@ -363,86 +541,250 @@ class CodeConfigurator(QWidget):
     def get_script_path(self, script_name):
         return os.path.join(self.scripts_base_dir, script_name)
 
+    def script_arguments(self, step, options=()):
+        """Аргументы интерпретатора для шага ``step`` (``generate``, ``reset``, ``run``)."""
+        scripts = LENGTH_SCRIPTS.get(self.length)
+        if scripts is None:
+            return ["-m", "opener", step, "--config", f"config_{self.length}.json", *options]
+        script_name = scripts[step]
+        if not os.path.exists(self.get_script_path(script_name)):
+            raise FileNotFoundError(f"Скрипт '{script_name}' не найден в '{self.scripts_base_dir}'.")
+        return [script_name, *options]
+
+    def start_key_name(self):
+        """Клавиша старта из конфига текущей длины (или по умолчанию)."""
+        config = load_config(self.in_process_config_path()) or {}
+        try:
+            return hotkeys_for_config(config)[START]
+        except ValueError:
+            return DEFAULT_HOTKEYS[START]
+
     def run_generate_script(self):
         try:
             self.log_output.append("[Генерация] Запуск...")
-            self.progress_bar.setValue(20)
+            self.progress_bar.setValue(0)
 
-            script_name = ""
-            if self.length == 3:
-                script_name = "generate_3digit_combinations.py"
-            else:
-                script_name = "generate_combinations.py"
-
-            script_path = self.get_script_path(script_name)
-            if not os.path.exists(script_path):
-                raise FileNotFoundError(f"Скрипт '{script_name}' не найден в '{self.scripts_base_dir}'.")
-
-            script_dir = self.scripts_base_dir
-            result = subprocess.run(
-                [sys.executable, script_name],
-                capture_output=True,
-                text=True,
-                cwd=script_dir
-            )
-
-            if result.returncode == 0:
-                self.log_output.append("[Генерация] Успешно завершена.")
-                self.progress_bar.setValue(40)
-                self.reset_btn.setEnabled(True)
-                QMessageBox.information(self, "Успех", "Комбинации сгенерированы успешно!")
+            arguments = self.script_arguments("generate")
+
+            self.generate_cancelled = False
+            self.generate_cancel.clear()
+            self.last_error = ""
+            if self.in_process_checkbox.isChecked():
+                self.start_worker(self.generate_task, self.on_generate_finished)
             else:
-                error_msg = result.stderr if result.stderr else result.stdout
-                self.log_output.append(f"[Ошибка] Генерация: {error_msg}")
-                QMessageBox.critical(self, "Ошибка", f"Ошибка генерации:\n{error_msg}")
+                self.process = self.create_process(self.on_generate_finished)
+                self.process.start(sys.executable, arguments)
+            self.cancel_generate_btn.setEnabled(True)
+
+            self.status_label.setText("Генерация...")
+            self.generate_btn.setEnabled(False)
 
         except Exception as e:
             self.log_output.append(f"[Ошибка] Генерация: {str(e)}")
             QMessageBox.critical(self, "Ошибка", f"Ошибка запуска генерации:\n{str(e)}")
 
+    def cancel_generate_script(self):
+        if self.worker is not None and self.worker.isRunning():
+            # Поток проверяет флаг между оценками слотов перебора.
+            self.generate_cancelled = True
+            self.generate_cancel.set()
+            self.cancel_generate_btn.setEnabled(False)
+        elif self.process and self.process.state() != QProcess.NotRunning:
+            self.generate_cancelled = True
+            self.process.kill()
+
+    def on_generate_finished(self, exit_code, exit_status):
+        self.process = None
+        self.worker = None
+        self.generate_btn.setEnabled(True)
+        self.cancel_generate_btn.setEnabled(False)
+        if self.generate_cancelled:
+            self.log_output.append("[Генерация] Отменена.")
+            self.status_label.setText("Генерация отменена")
+            self.progress_bar.setValue(0)
+        elif exit_code == 0 and exit_status == QProcess.NormalExit:
+            self.log_output.append("[Генерация] Успешно завершена.")
+            self.progress_bar.setValue(100)
+            self.reset_btn.setEnabled(True)
+            if self.fused_checkbox.isChecked():
+                self.brute_force_btn.setEnabled(True)
+            QMessageBox.information(self, "Успех", "Комбинации сгенерированы успешно!")
+        else:
+            error_msg = self.last_error or f"код завершения {exit_code}, подробности в логе"
+            self.log_output.append(f"[Ошибка] Генерация: {error_msg}")
+            QMessageBox.critical(self, "Ошибка", f"Ошибка генерации:\n{error_msg}")
+
     def run_reset_script(self):
         try:
             self.log_output.append("[Сброс] Запуск...")
             self.progress_bar.setValue(60)
 
-            if self.length == 3:
-                script_name = "3-digit_code_resetter.py"
-            else:
-                script_name = "4-digit code_resetter.py"
-
-            script_path = self.get_script_path(script_name)
-            if not os.path.exists(script_path):
-                raise FileNotFoundError(f"Скрипт '{script_name}' не найден в '{self.scripts_base_dir}'.")
+            arguments = self.script_arguments("reset")
 
-            self.process = QProcess(self)
-            self.process.setWorkingDirectory(self.scripts_base_dir)
-            self.process.setProcessChannelMode(QProcess.MergedChannels)
-            self.process.readyReadStandardOutput.connect(self.handle_process_output)
-            self.process.finished.connect(self.on_reset_finished)
-
-            self.process.start(sys.executable, [script_name])
+            if self.in_process_checkbox.isChecked():
+                self.start_worker(self.reset_task, self.on_reset_finished)
+            else:
+                self.process = self.create_process(self.on_reset_finished)
+                self.process.start(sys.executable, arguments)
 
-            self.log_output.append("[Сброс] Скрипт запущен. Переключитесь в игру и нажмите Backspace.")
+            self.log_output.append(f"[Сброс] Скрипт запущен. Переключитесь в игру и нажмите "
+                                   f"{self.start_key_name()}.")
             self.reset_btn.setEnabled(False)
 
         except Exception as e:
             self.log_output.append(f"[Ошибка] Сброс: {str(e)}")
             QMessageBox.critical(self, "Ошибка", f"Ошибка запуска сброса:\n{str(e)}")
 
+    def start_worker(self, task, on_finished):
+        """Запускает ``task`` в потоке; ``on_finished`` вызывается как у QProcess."""
+        self.worker = EngineWorker(task, self)
+        self.worker.line.connect(self.log_output.append)
+        self.worker.event.connect(self.handle_event)
+        self.worker.done.connect(lambda exit_code: on_finished(exit_code, QProcess.NormalExit))
+        self.worker.start()
+
+    def in_process_config_path(self):
+        return os.path.join(self.scripts_base_dir, f"config_{self.length}.json")
+
+    def generate_task(self, report, telemetry):
+        config_path = self.in_process_config_path()
+        config = load_config(config_path)
+        if not config:
+            telemetry.emit("error", message=f"Конфигурация не загружена: {config_path}")
+            return False
+        return run_generate(config, config_path, telemetry, report, self.generate_cancel)
+
+    def shared_engine(self):
+        """Движок прошлого шага в этом процессе: он знает фактическое состояние колёс."""
+        if self.engine is not None and self.engine.length == self.length:
+            return self.engine
+        return None
+
+    def release_engine(self):
+        """Закрывает бэкенд общего движка, который больше не понадобится."""
+        if self.engine is not None:
+            self.engine.close()
+            self.engine = None
+
+    def reset_task(self, report, telemetry):
+        engine = self.shared_engine()
+        if engine is None:
+            # Движок для другой длины кода: новый сброс создаст свой.
+            self.release_engine()
+        engine = reset_code(self.in_process_config_path(), self.length, report,
+                            pause=lambda message: None, engine=engine)
+        if engine is None:
+            self.release_engine()
+        self.engine = engine
+        return engine is not None
+
+    def brute_force_task(self, report, telemetry, resume=False):
+        return brute_force_execute(self.in_process_config_path(), self.scripts_base_dir,
+                                   self.length, resume, report, pause=lambda message: None,
+                                   telemetry=telemetry, engine=self.shared_engine())
+
+    def create_process(self, on_finished):
+        """QProcess для скрипта: лог в stdout, события прогресса JSON-строками в stderr."""
+        process = QProcess(self)
+        process.setWorkingDirectory(self.scripts_base_dir)
+        environment = QProcessEnvironment.systemEnvironment()
+        environment.insert("PYTHONUNBUFFERED", "1")
+        environment.insert("PYTHONIOENCODING", "utf-8")
+        environment.insert(TELEMETRY_ENV, "1")
+        # Для запуска через "-m opener" из папки "N-digit code".
+        python_path = environment.value("PYTHONPATH")
+        environment.insert("PYTHONPATH", os.pathsep.join(filter(None, [PROJECT_DIR, python_path])))
+        process.setProcessEnvironment(environment)
+        process.setProcessChannelMode(QProcess.SeparateChannels)
+        process.readyReadStandardOutput.connect(self.handle_process_output)
+        process.readyReadStandardError.connect(self.handle_telemetry)
+        process.finished.connect(on_finished)
+        self.stdout_decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.stdout_buffer = ""
+        self.telemetry_decoder = codecs.getincrementaldecoder('utf-8')(errors='replace')
+        self.telemetry_buffer = ""
+        return process
+
     def handle_process_output(self):
         if self.process:
             data = self.process.readAllStandardOutput()
-            try:
-                output = data.data().decode('utf-8')
-            except UnicodeDecodeError:
-                try:
-                    output = data.data().decode('cp1251')
-                except UnicodeDecodeError:
-                    output = data.data().decode('utf-8', errors='ignore')
-            self.log_output.append(output.strip())
+            self.stdout_buffer += self.stdout_decoder.decode(data.data())
+            lines = self.stdout_buffer.split("\n")
+            self.stdout_buffer = lines.pop()
+            for line in lines:
+                self.log_output.append(line.rstrip("\r"))
+
+    def handle_telemetry(self):
+        if self.process:
+            data = self.process.readAllStandardError()
+            self.telemetry_buffer += self.telemetry_decoder.decode(data.data())
+            lines = self.telemetry_buffer.split("\n")
+            self.telemetry_buffer = lines.pop()
+            for line in lines:
+                event = parse_event(line)
+                if event is None:
+                    # Не событие — например, traceback: показываем как есть.
+                    if line.strip():
+                        self.log_output.append(line.rstrip("\r"))
+                else:
+                    self.handle_event(event)
+
+    def handle_event(self, event):
+        kind = event["event"]
+        if kind == "waiting":
+            self.status_label.setText(f"Ожидание: нажмите {event.get('key', DEFAULT_HOTKEYS[START])} в игре")
+        elif kind == "start":
+            self.progress_bar.setValue(0)
+            self.status_label.setText(
+                f"Перебор: 0/{event['total']}, по плану {format_time(event['duration'])}")
+        elif kind == "step_end":
+            self.progress_bar.setValue(int(event["progress"]))
+            eta = format_time(event["eta"])
+            low, high = format_time(event["eta_low"]), format_time(event["eta_high"])
+            if low != high:
+                eta += f" ({low}–{high})"
+            self.status_label.setText(
+                f"Шаг {event['i'] + 1}/{event['total']} | "
+                f"код {''.join(map(str, event['code']))} | ETA {eta} | "
+                f"опоздание макс {event['lateness_max_ms']:.1f} мс")
+        elif kind == "paused":
+            self.status_label.setText("Пауза: повторное нажатие клавиши паузы продолжит перебор")
+        elif kind == "resumed":
+            self.status_label.setText("Перебор продолжен")
+        elif kind == "skipped":
+            self.status_label.setText(
+                f"Пропущен префикс шага {event['i'] + 1}/{event['total']}, "
+                f"колёса {''.join(map(str, event['wheels']['code']))}")
+        elif kind == "stopped":
+            self.status_label.setText(
+                f"Остановлено после шага {event['step']}/{event['total']}, "
+                f"колёса {''.join(map(str, event['wheels']['code']))}")
+        elif kind == "opened":
+            codes = ", ".join("".join(map(str, code)) for code in event["candidates"])
+            if len(event["candidates"]) == 1:
+                self.status_label.setText(f"Замок открыт кодом {codes}")
+            else:
+                self.status_label.setText(f"Замок открыт, кандидаты по порядку: {codes}")
+        elif kind == "done":
+            self.progress_bar.setValue(100)
+            self.status_label.setText(
+                f"Готово за {format_time(event['elapsed'])}, "
+                f"проверено {event['tried']} из {event['size']} кодов")
+        elif kind == "progress":
+            self.progress_bar.setValue(int(event["done"] / event["total"] * 100))
+            self.status_label.setText(
+                f"Генерация: оценено слотов перебора {event['done']}/{event['total']}")
+        elif kind == "generated":
+            self.status_label.setText(
+                f"Сгенерировано комбинаций: {event['total']}, слот перебора {event['sweep_slot']}, "
+                f"расчётно {format_time(event['duration'])}")
+        elif kind == "error":
+            self.last_error = event["message"]
+            self.status_label.setText(f"Ошибка: {event['message']}")
 
     def on_reset_finished(self, exit_code, exit_status):
         self.process = None
+        self.worker = None
         if exit_code == 0:
             self.log_output.append("[Сброс] Успешно завершен.")
             self.progress_bar.setValue(80)
@@ -452,30 +794,25 @@ class CodeConfigurator(QWidget):
             self.log_output.append(f"[Ошибка] Сброс завершен с кодом {exit_code}.")
             QMessageBox.critical(self, "Ошибка", f"Сброс кода завершен с ошибкой (код {exit_code}).")
 
-    def run_brute_force_script(self):
+    def run_brute_force_script(self, resume=False):
         try:
-            self.log_output.append("[Перебор] Запуск...")
-            self.progress_bar.setValue(90)
-
-            if self.length == 3:
-                script_name = "3-digit_brute_force_runner.py"
-            else:
-                script_name = "brute_force_runner.py"
+            self.log_output.append("[Перебор] Продолжение по журналу..." if resume else "[Перебор] Запуск...")
+            self.progress_bar.setValue(0)
 
-            script_path = self.get_script_path(script_name)
-            if not os.path.exists(script_path):
-                raise FileNotFoundError(f"Скрипт '{script_name}' не найден в '{self.scripts_base_dir}'.")
+            arguments = self.script_arguments("run", ["--resume"] if resume else [])
 
-            self.process = QProcess(self)
-            self.process.setWorkingDirectory(self.scripts_base_dir)
-            self.process.setProcessChannelMode(QProcess.MergedChannels)
-            self.process.readyReadStandardOutput.connect(self.handle_process_output)
-            self.process.finished.connect(self.on_brute_force_finished)
-
-            self.process.start(sys.executable, [script_name])
+            if self.in_process_checkbox.isChecked():
+                def task(report, telemetry):
+                    return self.brute_force_task(report, telemetry, resume)
+                self.start_worker(task, self.on_brute_force_finished)
+            else:
+                self.process = self.create_process(self.on_brute_force_finished)
+                self.process.start(sys.executable, arguments)
 
-            self.log_output.append("[Перебор] Скрипт запущен. Переключитесь в игру и нажмите Backspace.")
+            self.log_output.append(f"[Перебор] Скрипт запущен. Переключитесь в игру и нажмите "
+                                   f"{self.start_key_name()}.")
             self.brute_force_btn.setEnabled(False)
+            self.resume_btn.setEnabled(False)
 
         except Exception as e:
             self.log_output.append(f"[Ошибка] Перебор: {str(e)}")
@@ -483,6 +820,8 @@ class CodeConfigurator(QWidget):
 
     def on_brute_force_finished(self, exit_code, exit_status):
         self.process = None
+        self.worker = None
+        self.resume_btn.setEnabled(True)
         if exit_code == 0:
             self.log_output.append("[Перебор] Успешно завершен.")
             self.progress_bar.setValue(100)
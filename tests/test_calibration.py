@@ -0,0 +1,25 @@
+from opener.calibration import Calibrator, ManualObserver
+from opener.engine import RESET_TIMING
+from opener.simulator import SimulatedLock, simulated_engine
+
+
+def test_manual_calibration_waits_for_the_game_before_every_probe():
+    timing = RESET_TIMING.replace(digit_hold=None)
+    lock = SimulatedLock(3, seed=1)
+    engine, lock, _ = simulated_engine(3, timing=timing, lock=lock)
+    waits = []
+    wait_for_key = engine.wait_for_key
+
+    def counting_wait(*args, **kwargs):
+        waits.append(len(calibrator.samples))
+        lock.last_rotations = 0
+        wait_for_key(*args, **kwargs)
+
+    engine.wait_for_key = counting_wait
+    # Оператор отвечает тем, что показал замок.
+    observer = ManualObserver(engine, ask=lambda prompt: str(lock.last_rotations),
+                              report=lambda line: None)
+    calibrator = Calibrator(engine, observer, report=lambda line: None)
+    calibrator.run(timing.digit_hold)
+    assert calibrator.samples
+    assert waits == list(range(len(calibrator.samples)))
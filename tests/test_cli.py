@@ -0,0 +1,112 @@
+import io
+import json
+
+import pytest
+
+from opener.cli import ConfigError, main, parse_setting, read_config
+
+
+def test_parse_setting_reads_json_values():
+    assert parse_setting("length=4") == ("length", 4)
+    assert parse_setting("hotkeys={\"pause\": \"F5\"}") == ("hotkeys", {"pause": "F5"})
+    assert parse_setting("direction=С конца") == ("direction", "С конца")
+
+
+def test_parse_setting_keeps_codes_as_strings():
+    assert parse_setting("current_code=5271") == ("current_code", "5271")
+    assert parse_setting("start_code=0000") == ("start_code", "0000")
+
+
+def test_parse_setting_requires_key_and_value():
+    with pytest.raises(ConfigError):
+        parse_setting("length")
+
+
+def test_read_config_from_settings():
+    config = read_config(None, ["length=4", "current_code=0271"])
+    assert config["current_code"] == [0, 2, 7, 1]
+    assert config["start_code"] == [0, 0, 0, 0]
+    assert config["slot"] == 0
+    assert config["radix"] == 10
+
+
+def test_read_config_reverse_direction_starts_from_nines():
+    config = read_config(None, ["length=3", "current_code=123", "direction=С конца"])
+    assert config["start_code"] == [9, 9, 9]
+
+
+def test_read_config_from_stdin_with_overrides():
+    stdin = io.StringIO(json.dumps({"length": 3, "current_code": [1, 2, 3], "slot": 2}))
+    config = read_config("-", ["slot=1"], stdin)
+    assert config["current_code"] == [1, 2, 3]
+    assert config["slot"] == 1
+
+
+@pytest.mark.parametrize("settings", [
+    ["current_code=123"],
+    ["length=3"],
+    ["length=4", "current_code=123"],
+    ["length=3", "current_code=12a"],
+    ['length="3"', "current_code=123"],
+    ["length=3.5", "current_code=123"],
+    ["length=0", "current_code=123"],
+    ["length=true", "current_code=1"],
+    ["length=3", "radix=0", "current_code=000"],
+    ["length=3", "radix=8", "current_code=189"],
+])
+def test_read_config_rejects_bad_configs(settings):
+    with pytest.raises(ConfigError):
+        read_config(None, settings)
+
+
+def test_config_error_exit_code(capsys):
+    assert main(["plan", "--set", "current_code=123"]) == 2
+
+
+def test_non_integer_length_exit_code(capsys):
+    assert main(["plan", "--set", "length=4.5", "--set", "current_code=1234"]) == 2
+    assert "[Ошибка] Конфиг: length" in capsys.readouterr().out
+
+
+def test_set_does_not_overwrite_config_file(tmp_path, monkeypatch):
+    source = tmp_path / "mine.json"
+    source.write_text(json.dumps({"length": 3, "current_code": [5, 2, 8]}), encoding="utf-8")
+    before = source.read_text(encoding="utf-8")
+    out = tmp_path / "out"
+    assert main(["reset", "-c", str(source), "--dir", str(out), "--set", "slot=2",
+                 "--set", "backend=recording"]) == 0
+    assert source.read_text(encoding="utf-8") == before
+    assert json.loads((out / "config_3.json").read_text(encoding="utf-8"))["slot"] == 2
+
+
+def test_set_refuses_to_overwrite_config_file_in_dir(tmp_path, capsys):
+    source = tmp_path / "config_3.json"
+    source.write_text(json.dumps({"length": 3, "current_code": [5, 2, 8]}), encoding="utf-8")
+    before = source.read_text(encoding="utf-8")
+    assert main(["reset", "-c", str(source), "--dir", str(tmp_path), "--set", "slot=2"]) == 2
+    assert source.read_text(encoding="utf-8") == before
+    assert "укажите другую папку" in capsys.readouterr().out
+
+
+def test_plan_command(capsys):
+    assert main(["plan", "--set", "length=3", "--set", "current_code=528", "--limit", "2"]) == 0
+    assert "[План]" in capsys.readouterr().out
+
+
+def test_reset_command_closes_its_engine(tmp_path, monkeypatch):
+    closed = []
+    monkeypatch.setattr("opener.backends.RecordingBackend.close", lambda self: closed.append(self),
+                        raising=False)
+    assert main(["reset", "--dir", str(tmp_path), "--set", "length=3", "--set", "current_code=528",
+                 "--set", "backend=recording"]) == 0
+    assert len(closed) == 1
+
+
+def test_run_reports_a_backend_that_cannot_start(tmp_path, monkeypatch, capsys):
+    def no_uinput(name=None):
+        raise PermissionError("нет доступа к /dev/uinput")
+
+    monkeypatch.setattr("opener.runner.create_backend", no_uinput)
+    assert main(["run", "--dir", str(tmp_path), "--set", "length=3",
+                 "--set", "current_code=528"]) == 1
+    assert "[Ошибка] Бэкенд ввода: нет доступа к /dev/uinput" in capsys.readouterr().out
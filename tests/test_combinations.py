@@ -0,0 +1,27 @@
+import json
+import threading
+
+from opener.combinations import run_generate
+from opener.telemetry import Telemetry
+
+
+def test_generation_stops_between_sweep_slots_when_cancelled(tmp_path):
+    config = {"length": 4, "radix": 10, "current_code": [5, 2, 8, 1], "slot": 0,
+              "start_code": [0, 0, 0, 0], "direction": "С начала"}
+    config_path = tmp_path / "config_4.json"
+    config_path.write_text(json.dumps(config), encoding="utf-8")
+    cancel = threading.Event()
+    events = []
+
+    def on_event(event):
+        events.append(event)
+        if event["event"] == "progress":
+            cancel.set()
+
+    lines = []
+    ok = run_generate(dict(config), str(config_path), Telemetry(sink=on_event), lines.append,
+                      cancel)
+    assert not ok
+    assert lines[-1] == "[Стоп] Генерация отменена."
+    assert [event["done"] for event in events if event["event"] == "progress"] == [1]
+    assert "sweep_slot" not in json.loads(config_path.read_text(encoding="utf-8"))
@@ -0,0 +1,22 @@
+import pytest
+
+from opener.control import DEFAULT_HOTKEYS, hotkeys_for_config
+
+
+def test_hotkeys_override_defaults():
+    hotkeys = hotkeys_for_config({"hotkeys": {"pause": "F5", "abort": "Escape"}})
+    assert hotkeys == dict(DEFAULT_HOTKEYS, pause="F5", abort="Escape")
+
+
+def test_unknown_hotkey_is_rejected():
+    with pytest.raises(ValueError, match="Неизвестная клавиша"):
+        hotkeys_for_config({"hotkeys": {"pause": "F12"}})
+
+
+@pytest.mark.parametrize("override, clash", [
+    ({"pause": "F4"}, "F4: pause, abort"),
+    ({"skip": "Backspace"}, "Backspace: start, skip"),
+])
+def test_one_key_for_two_commands_is_rejected(override, clash):
+    with pytest.raises(ValueError, match=clash):
+        hotkeys_for_config({"hotkeys": override})
@@ -0,0 +1,31 @@
+import pytest
+
+from opener.eta import EtaEstimator
+
+
+def test_without_samples_estimate_is_the_plan():
+    assert EtaEstimator().remaining(100.0) == (100.0, 100.0, 100.0)
+
+
+def test_steady_pace_scales_the_plan():
+    eta = EtaEstimator()
+    for _ in range(50):
+        eta.update(2.0, 2.2)
+    estimate, low, high = eta.remaining(100.0)
+    assert estimate == pytest.approx(110.0)
+    assert low == pytest.approx(110.0)
+    assert high == pytest.approx(110.0)
+
+
+def test_noisy_pace_gives_an_interval():
+    eta = EtaEstimator()
+    for measured in [1.9, 2.1] * 20:
+        eta.update(2.0, measured)
+    estimate, low, high = eta.remaining(100.0)
+    assert low < estimate < high
+
+
+def test_zero_planned_step_is_ignored():
+    eta = EtaEstimator()
+    eta.update(0.0, 5.0)
+    assert eta.samples == 0
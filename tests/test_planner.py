@@ -0,0 +1,122 @@
+from itertools import product
+
+import pytest
+
+from opener.benchmarks import bench_config
+from opener.combinations import generate_combinations
+from opener.coverage import CodeSet
+from opener.engine import shown_codes
+from opener.planner import ASCENDING, DESCENDING, credit_visits, plan_order
+from opener.sequence import SweptGraySegment
+
+RADIX = 4
+LENGTH = 3
+SWEEP = LENGTH - 1
+START = [2, 3, 1]
+
+
+def all_prefixes():
+    return [[a, b, 0] for a, b in product(range(RADIX), repeat=LENGTH - 1)]
+
+
+def prefix(code):
+    return tuple(d for i, d in enumerate(code) if i != SWEEP)
+
+
+def visited(plan, covered=None):
+    """Коды, которые замок показывает при обходе ``plan`` от ``START``."""
+    seen = set()
+    if covered is not None:
+        seen.update(tuple(code) for code in product(range(RADIX), repeat=LENGTH)
+                    if code in covered)
+    code, slot = START, 0
+    for target in plan:
+        seen.update(shown_codes(code, slot, target, SWEEP, RADIX))
+        code, slot = target, SWEEP
+    return seen
+
+
+@pytest.mark.parametrize("order", [ASCENDING, DESCENDING])
+def test_plan_order_visits_every_prefix_once(order):
+    plan = list(plan_order(all_prefixes(), START, order, 1, SWEEP, RADIX))
+    assert sorted(prefix(code) for code in plan) == sorted(prefix(code) for code in all_prefixes())
+
+
+@pytest.mark.parametrize("order", [ASCENDING, DESCENDING])
+def test_plan_order_turns_one_wheel_one_position_per_step(order):
+    plan = list(plan_order(all_prefixes(), START, order, 1, SWEEP, RADIX))
+    for previous, current in zip(plan, plan[1:]):
+        if previous[0] != current[0]:
+            continue
+        turns = [(b - a) % RADIX for a, b in zip(prefix(previous), prefix(current))]
+        assert sorted(turns) == [0, 1]
+
+
+def test_plan_order_keeps_priority_digit_direction():
+    ascending = [code[0] for code in plan_order(all_prefixes(), START, ASCENDING, 1, SWEEP, RADIX)]
+    descending = [code[0] for code in plan_order(all_prefixes(), START, DESCENDING, 1, SWEEP, RADIX)]
+    assert ascending == sorted(ascending)
+    assert descending == sorted(descending, reverse=True)
+
+
+def test_credit_visits_tests_every_code():
+    plan = plan_order(all_prefixes(), START, ASCENDING, 1, SWEEP, RADIX)
+    credited = list(credit_visits(plan, START, None, 0, SWEEP, RADIX))
+    assert len(credited) == RADIX ** (LENGTH - 1)
+    assert visited(credited) == set(product(range(RADIX), repeat=LENGTH))
+
+
+def test_credit_visits_shortens_the_sweep():
+    plan = plan_order(all_prefixes(), START, ASCENDING, 1, SWEEP, RADIX)
+    credited = list(credit_visits(plan, START, None, 0, SWEEP, RADIX))
+    code, slot = START, 0
+    full_circles = 0
+    for target in credited:
+        sweep = list(shown_codes(code, slot, target, SWEEP, RADIX))
+        full_circles += sum(1 for shown in sweep if shown[SWEEP] == code[SWEEP]) > 1
+        code, slot = target, SWEEP
+    assert full_circles < len(credited)
+
+
+def test_credit_visits_skips_covered_prefixes():
+    covered = CodeSet(LENGTH, RADIX)
+    for digit in range(RADIX):
+        covered.add([1, 2, digit])
+    covered.add([3, 3, 0])
+    plan = plan_order(all_prefixes(), START, ASCENDING, 1, SWEEP, RADIX)
+    credited = list(credit_visits(plan, START, covered, 0, SWEEP, RADIX))
+    assert (1, 2) not in [prefix(code) for code in credited]
+    assert len(credited) == RADIX ** (LENGTH - 1) - 1
+    assert visited(credited, covered) == set(product(range(RADIX), repeat=LENGTH))
+
+
+@pytest.mark.parametrize("covered_codes", [[], [[0, 1, 2], [3, 0, 0], [2, 2, 1]]])
+def test_credit_visits_matches_for_list_and_lazy_plan(covered_codes):
+    covered = CodeSet(LENGTH, RADIX)
+    for code in covered_codes:
+        covered.add(code)
+    plan = plan_order(all_prefixes(), START, DESCENDING, 1, SWEEP, RADIX)
+    lazy = list(credit_visits(plan, START, covered, 0, SWEEP, RADIX))
+    explicit = list(credit_visits(list(plan), START, covered, 0, SWEEP, RADIX))
+    assert lazy == explicit
+
+
+def test_six_digit_plan_keeps_gray_blocks():
+    _, combinations = generate_combinations(bench_config(6))
+    kinds = {type(segment).__name__ for segment in combinations.segments}
+    assert "SweptGraySegment" in kinds
+    lazy = sum(len(segment) for segment in combinations.segments
+               if isinstance(segment, SweptGraySegment))
+    assert lazy > len(combinations) * 0.99
+    assert combinations.index_of(combinations.nth(54321)) == 54321
+
+
+def test_partially_covered_plan_stays_lazy():
+    covered = CodeSet(5, 10)
+    for value in range(0, 10 ** 5, 37):
+        covered.add_value(value)
+    for digit in range(10):
+        covered.add([1, 2, 3, 4, digit])
+    _, combinations = generate_combinations(bench_config(5), covered=covered)
+    assert any(isinstance(segment, SweptGraySegment) for segment in combinations.segments)
+    assert [1, 2, 3, 4, 0] not in combinations
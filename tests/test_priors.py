@@ -0,0 +1,38 @@
+import os
+
+from opener.priors import CodePrior, load_code_counts, resolve_prior_files
+
+
+def test_relative_prior_files_follow_the_config(tmp_path):
+    config = {"length": 4, "prior": {"history_file": "opened_codes.txt",
+                                     "frequency_file": str(tmp_path / "abs.txt")}}
+    resolved = resolve_prior_files(config, str(tmp_path / "config_4.json"))
+    assert resolved["prior"]["history_file"] == str(tmp_path / "opened_codes.txt")
+    assert resolved["prior"]["frequency_file"] == str(tmp_path / "abs.txt")
+    assert config["prior"]["history_file"] == "opened_codes.txt"
+
+
+def test_without_config_path_paths_stay_as_is():
+    config = {"length": 4, "prior": {"history_file": "opened_codes.txt"}}
+    assert resolve_prior_files(config, None) is config
+
+
+def test_history_is_read_from_the_config_folder(tmp_path, monkeypatch):
+    (tmp_path / "opened_codes.txt").write_text("1234\n", encoding="utf-8")
+    config = {"length": 4, "prior": {"patterns": False, "history_file": "opened_codes.txt"}}
+    monkeypatch.chdir(os.path.dirname(os.path.abspath(__file__)))
+    prior = CodePrior.from_config(resolve_prior_files(config, str(tmp_path / "config_4.json")))
+    assert prior.probability([1, 2, 3, 4]) > prior.probability([4, 3, 2, 1])
+
+
+def test_missing_prior_file_is_reported(tmp_path, capsys):
+    config = {"length": 4, "prior": {"history_file": str(tmp_path / "missing.txt")}}
+    CodePrior.from_config(config)
+    assert "missing.txt" in capsys.readouterr().out
+
+
+def test_code_counts_follow_the_radix(tmp_path):
+    path = tmp_path / "codes.txt"
+    path.write_text("17 2\n19\n07\n", encoding="utf-8")
+    assert load_code_counts(str(path), 2, radix=8) == {0o17: 2.0, 0o07: 1.0}
+    assert load_code_counts(str(path), 2) == {17: 2.0, 19: 1.0, 7: 1.0}
@@ -0,0 +1,182 @@
+import json
+
+from opener.control import PAUSE, START, Controller
+from opener.coverage import CodeSet
+from opener.runner import brute_force_execute
+from opener.simulator import SimulatedLock, simulated_engine
+from opener.telemetry import Telemetry
+
+
+def run_on_simulator(tmp_path, monkeypatch, config, secret=None, wheels=None, control=None,
+                     answer=None, resume=False):
+    folder = tmp_path / "3-digit code"
+    config_path = folder / "config_3.json"
+    if not resume:
+        folder.mkdir()
+        config_path.write_text(json.dumps(config), encoding="utf-8")
+    monkeypatch.chdir(tmp_path)
+    code, slot = wheels or (config["current_code"], config["slot"])
+    lock = SimulatedLock(3, code=code, slot=slot, secret=secret)
+    engine, lock, _ = simulated_engine(3, lock=lock)
+    if control is not None:
+        control.listen(engine.backend)
+    events = []
+    ok = brute_force_execute(str(config_path), str(folder), 3, resume, report=lambda line: None,
+                             pause=lambda prompt: answer, telemetry=Telemetry(sink=events.append),
+                             engine=engine, control=control)
+    return ok, engine, lock, events, folder
+
+
+def base_config():
+    return {"length": 3, "radix": 10, "current_code": [5, 2, 8], "slot": 0,
+            "start_code": [0, 0, 0], "direction": "С начала", "fused_reset": True}
+
+
+def test_run_keeps_engine_in_sync_with_lock(tmp_path, monkeypatch):
+    ok, engine, lock, events, _ = run_on_simulator(tmp_path, monkeypatch, base_config())
+    assert ok
+    assert lock.errors == []
+    assert len(lock.tested) == 1000
+    assert (engine.code, engine.slot) == (lock.code, lock.slot)
+    assert events[-1]["event"] == "done"
+
+
+def test_run_starts_from_passed_engine_state(tmp_path, monkeypatch):
+    # Колёса стоят не там, где их оставил бы сброс, и не на current_code конфига.
+    config = dict(base_config(), fused_reset=False)
+    ok, engine, lock, events, folder = run_on_simulator(tmp_path, monkeypatch, config,
+                                                        wheels=([3, 7, 1], 1))
+    assert ok
+    assert lock.errors == []
+    assert len(lock.tested) == 1000
+    assert (engine.code, engine.slot) == (lock.code, lock.slot)
+    saved = json.loads((folder / "config_3.json").read_text(encoding="utf-8"))
+    assert saved.get("fused_reset") is False
+
+
+def history_config():
+    return dict(base_config(), prior={"patterns": False, "history_file": "opened_codes.txt"})
+
+
+def test_opened_code_goes_to_history_next_to_config(tmp_path, monkeypatch):
+    ok, engine, lock, events, folder = run_on_simulator(tmp_path, monkeypatch, history_config(),
+                                                        [4, 1, 7], answer="д")
+    assert ok
+    assert events[-1] == dict(events[-1], event="opened", candidates=[[4, 1, 7]])
+    assert (folder / "opened_codes.txt").read_text(encoding="utf-8") == "417\n"
+    assert not (tmp_path / "opened_codes.txt").exists()
+    assert (engine.code, engine.slot) == (lock.code, lock.slot)
+
+
+def test_unconfirmed_opening_stays_out_of_history(tmp_path, monkeypatch):
+    ok, _, _, events, folder = run_on_simulator(tmp_path, monkeypatch, history_config(), [4, 1, 7])
+    assert ok
+    assert events[-1]["event"] == "opened"
+    assert not (folder / "opened_codes.txt").exists()
+
+
+def test_resume_after_recorded_opening_covers_every_step_once(tmp_path, monkeypatch):
+    ok, engine, first, _, folder = run_on_simulator(tmp_path, monkeypatch, history_config(),
+                                                    [4, 1, 7], answer="д")
+    assert ok
+    assert (folder / "opened_codes.txt").read_text(encoding="utf-8") == "417\n"
+    # Срабатывание оказалось ложным: продолжаем по журналу.
+    ok, engine, second, events, _ = run_on_simulator(tmp_path, monkeypatch, None,
+                                                     wheels=(engine.code, engine.slot),
+                                                     resume=True)
+    assert ok
+    assert second.errors == []
+    assert events[-1]["event"] == "done"
+    lines = (folder / "config_3.journal").read_text(encoding="utf-8").splitlines()
+    header, *entries = [json.loads(line) for line in lines]
+    steps = [entry for entry in entries if not (entry.get("stopped") or entry.get("done"))]
+    assert sorted(entry["i"] for entry in steps) == list(range(header["total"]))
+    prefixes = {tuple(entry["code"][:2]) for entry in steps}
+    assert len(prefixes) == header["total"] == 100
+    assert len(first.tested | second.tested) == 1000
+
+
+def test_run_leaves_passed_engine_open(tmp_path, monkeypatch):
+    closed = []
+    monkeypatch.setattr("opener.simulator.SimulatorBackend.close", lambda self: closed.append(self),
+                        raising=False)
+    ok, engine, *_ = run_on_simulator(tmp_path, monkeypatch, base_config())
+    assert ok
+    assert closed == []
+    engine.close()
+    assert closed == [engine.backend]
+
+
+class PausingController(Controller):
+    """Оператор ставит паузу в начале перебора и продолжает через 30 с."""
+
+    def __init__(self):
+        super().__init__(report=self.on_report)
+        self.backend = None
+
+    def listen(self, backend):
+        # Виртуальный оператор симулятора сразу нажимает старт.
+        super().listen(backend)
+        self.backend = backend
+
+    def wait_start(self):
+        started = super().wait_start()
+        self.post(PAUSE)
+        return started
+
+    def on_report(self, line):
+        if line.startswith("[Пауза] Перебор приостановлен"):
+            self.backend.sleep(30.0)
+            self.post(START)
+
+
+def test_operator_pause_is_kept_out_of_python_and_drift(tmp_path, monkeypatch):
+    control = PausingController()
+    ok, engine, lock, events, folder = run_on_simulator(tmp_path, monkeypatch, base_config(),
+                                                        control=control)
+    assert ok
+    assert lock.errors == []
+    budget = json.loads((folder / "config_3.budget.json").read_text(encoding="utf-8"))
+    assert budget["paused"] == 30.0
+    assert budget["python"] < 1.0
+    assert abs(budget["drift_other"]) < 1.0
+
+
+def test_resume_refuses_a_plan_that_no_longer_matches_the_journal(tmp_path, monkeypatch):
+    ok, engine, *_, folder = run_on_simulator(tmp_path, monkeypatch, history_config(), [4, 1, 7])
+    assert ok
+    # Журнал без сохранённых файлов вероятностей, а история с тех пор изменилась.
+    journal = folder / "config_3.journal"
+    header, *entries = journal.read_text(encoding="utf-8").splitlines()
+    header = json.loads(header)
+    del header["prior_counts"]
+    journal.write_text("\n".join([json.dumps(header), *entries]) + "\n", encoding="utf-8")
+    (folder / "opened_codes.txt").write_text("417\n", encoding="utf-8")
+    ok, _, lock, events, _ = run_on_simulator(tmp_path, monkeypatch, None,
+                                              wheels=(engine.code, engine.slot), resume=True)
+    assert not ok
+    assert events[-1]["event"] == "error"
+    assert "не совпадает с журналом" in events[-1]["message"]
+    assert len(lock.tested) == 1
+
+
+def test_tried_file_is_saved_in_batches(tmp_path, monkeypatch):
+    saves = []
+    save = CodeSet.save
+    monkeypatch.setattr(CodeSet, "save", lambda self, path: (saves.append(path), save(self, path)))
+    ok, *_, folder = run_on_simulator(tmp_path, monkeypatch, base_config())
+    assert ok
+    # 100 шагов: каждые 25 шагов и в конце.
+    assert len(saves) == 100 // 25 + 1
+    assert len(CodeSet.load(folder / "config_3.tried")) == 1000
+
+
+def test_resume_rebuilds_unsaved_coverage_from_the_journal(tmp_path, monkeypatch):
+    ok, engine, *_, folder = run_on_simulator(tmp_path, monkeypatch, base_config(), [4, 1, 7])
+    assert ok
+    # Процесс упал до очередного сохранения: файла проверенных кодов нет.
+    (folder / "config_3.tried").unlink()
+    ok, *_ = run_on_simulator(tmp_path, monkeypatch, None, wheels=(engine.code, engine.slot),
+                              resume=True)
+    assert ok
+    assert len(CodeSet.load(folder / "config_3.tried")) == 1000
@@ -0,0 +1,31 @@
+import random
+
+from opener.scheduler import LATENESS_BIN, LatenessStats
+
+
+def test_lateness_percentile_matches_sorted_values_within_a_bin():
+    rng = random.Random(7)
+    values = [rng.expovariate(1 / 0.0004) for _ in range(20000)]
+    stats = LatenessStats()
+    for value in values:
+        stats.add(value)
+    ordered = sorted(values)
+    for fraction in (0.5, 0.9, 0.99, 0.999):
+        exact = ordered[int(fraction * len(ordered))]
+        assert exact - LATENESS_BIN <= stats.percentile(fraction) <= exact
+    assert stats.count() == len(values)
+    assert abs(stats.mean() - sum(values) / len(values)) < 1e-12
+    assert stats.maximum() == max(values)
+    assert stats.last == values[-1]
+
+
+def test_lateness_storage_does_not_grow_and_long_tail_reports_worst():
+    stats = LatenessStats()
+    size = len(stats.bins)
+    for _ in range(100000):
+        stats.add(0.0)
+    stats.add(0.5)
+    assert len(stats.bins) == size
+    assert stats.percentile(0.5) == 0.0
+    assert stats.percentile(1.0) == 0.5
+    assert LatenessStats().percentile(0.99) == 0.0
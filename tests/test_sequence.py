@@ -0,0 +1,74 @@
+import pytest
+
+from opener.combinations import generate_combinations
+from opener.benchmarks import DIRECTIONS, bench_config
+from opener.sequence import CodeSequence, GraySegment, ListSegment, RangeSegment
+
+
+def sample_sequence():
+    return CodeSequence([
+        ListSegment([[9, 9, 9, 0], [8, 8, 8, 0]], 3),
+        RangeSegment(200, 40, 3, 4, 3),
+        GraySegment([1, 2, 3, 0], [1, 2], 3),
+    ], 3)
+
+
+def assert_round_trip(sequence):
+    codes = list(sequence)
+    assert len(codes) == len(sequence)
+    for n, code in enumerate(codes):
+        assert sequence.nth(n) == code
+        assert sequence.index_of(code) == n
+
+
+def test_segments_round_trip():
+    assert_round_trip(RangeSegment(7, 50, 2, 4, 1, radix=10))
+    assert_round_trip(RangeSegment(0, 25, 1, 3, 2, radix=5).reversed())
+    assert_round_trip(GraySegment([3, 1, 4, 1], [0, 2], 3))
+    assert_round_trip(ListSegment([[1, 2, 3], [3, 2, 1]], 2))
+
+
+def test_gray_segment_turns_one_wheel_per_step():
+    block = list(GraySegment([3, 1, 4, 0], [0, 1, 2], 3))
+    assert len({tuple(code) for code in block}) == 1000
+    for previous, current in zip(block, block[1:]):
+        assert sorted((b - a) % 10 for a, b in zip(previous, current)) == [0, 0, 0, 1]
+
+
+def test_code_sequence_round_trip():
+    sequence = sample_sequence()
+    assert_round_trip(sequence)
+    assert sequence[-1] == list(sequence)[-1]
+    with pytest.raises(IndexError):
+        sequence.nth(len(sequence))
+
+
+def test_index_of_ignores_sweep_digit():
+    sequence = sample_sequence()
+    code = sequence.nth(10)
+    code[3] = (code[3] + 5) % 10
+    assert sequence.index_of(code) == 10
+
+
+def test_unknown_code_is_rejected():
+    sequence = CodeSequence([RangeSegment(0, 10, 1, 3, 2)], 2)
+    assert [5, 5, 0] not in sequence
+    with pytest.raises(ValueError):
+        sequence.index_of([5, 5, 0])
+
+
+def test_slices_and_iter_from():
+    sequence = sample_sequence()
+    codes = list(sequence)
+    part = sequence[3:30]
+    assert list(part) == codes[3:30]
+    assert part.nth(4) == codes[7]
+    assert part.index_of(codes[10]) == 7
+    assert list(part[5:9]) == codes[8:12]
+    assert list(sequence.iter_from(41)) == codes[41:]
+
+
+@pytest.mark.parametrize("kind", sorted(DIRECTIONS))
+def test_generated_plans_round_trip(kind):
+    _, combinations = generate_combinations(bench_config(4, kind))
+    assert_round_trip(combinations)
@@ -0,0 +1,59 @@
+import pytest
+
+from opener.benchmarks import DIRECTIONS, bench_config
+from opener.combinations import choose_sweep_slot, run_start
+from opener.engine import RESET_TIMING, RUN_TIMING
+from opener.simulator import check_timing, simulate_session
+from opener.timeline import compile_timeline
+
+
+@pytest.mark.parametrize("length", [3, 4, 5])
+def test_full_session_covers_every_code(length):
+    result = simulate_session(bench_config(length))
+    assert result.coverage() == 1.0
+    assert result.lock.errors == []
+    assert result.model_matches
+
+
+@pytest.mark.parametrize("kind", sorted(DIRECTIONS))
+def test_engine_model_matches_lock(kind):
+    result = simulate_session(bench_config(4, kind))
+    assert result.lock.errors == []
+    assert result.engine.code == result.lock.code
+    assert result.engine.slot == result.lock.slot
+
+
+def test_fused_reset_session():
+    config = bench_config(4)
+    config["fused_reset"] = True
+    result = simulate_session(config)
+    assert result.reset_time == 0.0
+    assert result.coverage() == 1.0
+    assert result.model_matches
+
+
+def test_secret_opens_lock():
+    result = simulate_session(bench_config(3), secret=[4, 1, 7])
+    assert result.lock.opened_at is not None
+
+
+def test_detector_localises_secret():
+    result = simulate_session(bench_config(4), secret=[8, 0, 7, 1], detect=True)
+    assert result.candidates == [[8, 0, 7, 1]]
+    assert result.model_matches
+
+
+@pytest.mark.parametrize("timing", [RUN_TIMING, RESET_TIMING])
+def test_timing_tables_match_lock_model(timing):
+    assert check_timing(timing) == []
+
+
+def test_planned_duration_matches_simulated_run():
+    config = bench_config(4)
+    config["fused_reset"] = True
+    sweep_slot, _, combinations, _ = choose_sweep_slot(config)
+    config["sweep_slot"] = sweep_slot
+    start_code, start_slot = run_start(config, sweep_slot)
+    timeline = compile_timeline(combinations, RUN_TIMING, start_code, start_slot, sweep_slot)
+    result = simulate_session(config, combinations)
+    assert result.run_time == pytest.approx(timeline.duration)